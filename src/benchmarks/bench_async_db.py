@@ -0,0 +1,136 @@
+# bench_async_db.py
+"""
+Event-loop lag with 100 concurrent /ficha lookups, blocking vs. run_db.
+
+Every statement gets an artificial delay to stand in for a MySQL round trip.
+
+    python src/benchmarks/bench_async_db.py --calls 100 --latency-ms 5
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCH_DIR = tempfile.mkdtemp(prefix="ggm-bench-")
+os.environ.setdefault("LOG_DIR", BENCH_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+
+import asyncio  # noqa: E402
+import time  # noqa: E402
+
+import click  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from config.database import engine, run_db  # noqa: E402
+from models.character import Character  # noqa: E402
+from models.mana import ManaNature  # noqa: E402
+from models.race import Race  # noqa: E402
+from models.region import Region  # noqa: E402
+from models.user import User  # noqa: E402
+from repositories.character_repository import get_character_by_player_id  # noqa: E402
+from repositories.user_repository import get_or_create_user  # noqa: E402
+
+
+def seed_players(count: int) -> None:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        race = Race(
+            name="Humano",
+            base_hp=10,
+            hp_per_level=2,
+            base_mp=5,
+            mp_per_level=1,
+            base_resistance=1,
+            base_strength=1,
+            strength_per_level=1,
+            base_speed=2,
+            speed_per_level=1,
+            description="",
+        )
+        region = Region(name="Jardim", icon_url="")
+        mana = ManaNature(name="Neutra", description="", color="808080")
+        session.add_all([race, region, mana])
+        session.flush()
+        for discord_id in range(count):
+            user = User(discord_id=str(discord_id), player_name=f"p{discord_id}")
+            session.add(user)
+            session.flush()
+            session.add(
+                Character(
+                    name=f"Personagem {discord_id}",
+                    age=20,
+                    user_id=user.id,
+                    race_id=race.id,
+                    region_id=region.id,
+                    mana_nature_id=mana.id,
+                )
+            )
+        session.commit()
+
+
+def ficha_blocking(discord_id: int):
+    user = get_or_create_user(discord_id)
+    return get_character_by_player_id(user.id)
+
+
+async def ficha_awaited(discord_id: int):
+    user = await run_db(get_or_create_user, discord_id)
+    return await run_db(get_character_by_player_id, user.id)
+
+
+async def measure(calls: int, blocking: bool) -> dict:
+    """
+    Run the lookups concurrently while a ticker records how late it wakes up.
+    """
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker(interval: float = 0.005):
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    async def ficha(discord_id: int):
+        # Yield once so every call is scheduled before any of them runs
+        await asyncio.sleep(0)
+        if blocking:
+            return ficha_blocking(discord_id)
+        return await ficha_awaited(discord_id)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await asyncio.gather(*(ficha(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+
+    return {"elapsed": elapsed, "max_lag": max(lags), "ticks": len(lags)}
+
+
+@click.command()
+@click.option("--calls", default=100, help="Concurrent /ficha calls")
+@click.option("--latency-ms", default=5.0, help="Simulated latency per statement")
+def main(calls: int, latency_ms: float):
+    seed_players(calls)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def simulate_latency(*args):
+        time.sleep(latency_ms / 1000)
+
+    for label, blocking in (("before (blocking)", True), ("after (run_db)", False)):
+        result = asyncio.run(measure(calls, blocking))
+        click.echo(
+            f"{label:<18} total {result['elapsed'] * 1000:8.1f} ms  "
+            f"max loop lag {result['max_lag'] * 1000:8.1f} ms  "
+            f"ticks {result['ticks']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
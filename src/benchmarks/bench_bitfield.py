@@ -0,0 +1,81 @@
+# bench_bitfield.py
+"""
+Arcana skill bitfield decoding: full scans vs. set-bit iteration, and
+per-character decoding vs. the NumPy batch decoder.
+
+    python src/benchmarks/bench_bitfield.py --characters 10000
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import random  # noqa: E402
+import time  # noqa: E402
+
+import click  # noqa: E402
+import numpy as np  # noqa: E402
+
+from models.arcana import ArcanaSkillEnum  # noqa: E402
+from services.arcana_service import (  # noqa: E402
+    ARCANA_SKILL_COUNT,
+    decode_arcana_skills,
+    get_arcana_skill_ids,
+    get_arcana_skills,
+)
+
+
+def scan_skill_ids(bitfield: int):
+    """The previous implementation, testing all 54 positions."""
+    return [i for i in range(54) if (bitfield & (1 << i)) != 0]
+
+
+def scan_skills(bitfield: int):
+    """The previous implementation, testing every enum member."""
+    return [skill for skill in ArcanaSkillEnum if (bitfield & skill.value) != 0]
+
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    click.echo(f"{label:<24} {elapsed * 1000:9.2f} ms  {count / elapsed:14,.0f} /s")
+    return result
+
+
+def random_bitfield(rng: random.Random, skills: int) -> int:
+    bitfield = 0
+    for bit in rng.sample(range(ARCANA_SKILL_COUNT), skills):
+        bitfield |= 1 << bit
+    return bitfield
+
+
+@click.command()
+@click.option("--characters", default=10_000, help="Bitfields to decode")
+@click.option("--skills", default=6, help="Skills owned by each character")
+def main(characters: int, skills: int):
+    rng = random.Random(1)
+    bitfields = [random_bitfield(rng, skills) for _ in range(characters)]
+
+    click.echo(f"{characters} characters with {skills} skills each")
+    timed("scan ids", lambda: [scan_skill_ids(b) for b in bitfields], characters)
+    timed(
+        "set-bit ids", lambda: [get_arcana_skill_ids(b) for b in bitfields], characters
+    )
+    timed("scan enum", lambda: [scan_skills(b) for b in bitfields], characters)
+    timed("set-bit enum", lambda: [get_arcana_skills(b) for b in bitfields], characters)
+
+    def per_character_matrix():
+        matrix = np.zeros((len(bitfields), ARCANA_SKILL_COUNT), dtype=bool)
+        for row, bitfield in enumerate(bitfields):
+            matrix[row, get_arcana_skill_ids(bitfield)] = True
+        return matrix
+
+    expected = timed("matrix, per character", per_character_matrix, characters)
+    matrix = timed("matrix, batch", lambda: decode_arcana_skills(bitfields), characters)
+    assert np.array_equal(matrix, expected)
+
+
+if __name__ == "__main__":
+    main()
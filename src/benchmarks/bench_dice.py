@@ -0,0 +1,49 @@
+# bench_dice.py
+"""
+Rolls per second for each path of the dice engine.
+
+    python src/benchmarks/bench_dice.py --seconds 1
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import random  # noqa: E402
+import time  # noqa: E402
+
+import click  # noqa: E402
+
+from services.dice_service import (  # noqa: E402
+    DICE_DETAIL_LIMIT,
+    DICE_EXACT_LIMIT,
+    DICE_MAX_COUNT,
+    DICE_MAX_SIDES,
+    roll_dice,
+)
+
+CASES = [
+    ("1d20", 1, 20),
+    (f"{DICE_DETAIL_LIMIT}d6 (per die)", DICE_DETAIL_LIMIT, 6),
+    (f"{DICE_EXACT_LIMIT}d6 (exact)", DICE_EXACT_LIMIT, 6),
+    (f"{DICE_MAX_COUNT}d{DICE_MAX_SIDES} (approx.)", DICE_MAX_COUNT, DICE_MAX_SIDES),
+]
+
+
+@click.command()
+@click.option("--seconds", default=1.0, help="Time spent on each case")
+def main(seconds: float):
+    rng = random.Random(1)
+    for label, count, sides in CASES:
+        rolls = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            roll_dice(count, sides, rng)
+            rolls += 1
+        elapsed = time.perf_counter() - start
+        click.echo(f"{label:<28} {rolls / elapsed:12,.0f} rolls/s")
+
+
+if __name__ == "__main__":
+    main()
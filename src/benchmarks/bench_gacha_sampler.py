@@ -0,0 +1,102 @@
+# bench_gacha_sampler.py
+"""
+Linear tier picker vs. alias-table sampler.
+
+    python src/benchmarks/bench_gacha_sampler.py --draws 1000000
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import random  # noqa: E402
+import time  # noqa: E402
+from collections import Counter  # noqa: E402
+
+import click  # noqa: E402
+
+from models.arcana import Arcana, ArcanaSkill, ArcanaTier  # noqa: E402
+from models.gacha import GachaResult  # noqa: E402
+from services.arcana_service import (  # noqa: E402
+    create_arcana_data,
+    pick_skill_with_probability,
+)
+from services.gacha_service import ArcanaSampler  # noqa: E402
+
+TIER_PROBABILITIES = [0.5, 0.25, 0.15, 0.07, 0.03]
+
+
+def build_arcana_data(skills_per_tier: int):
+    tiers = [
+        ArcanaTier(
+            id=level,
+            tier_name=f"Tier {level}",
+            tier_level=level,
+            probability=probability,
+            color="ffffff",
+        )
+        for level, probability in enumerate(TIER_PROBABILITIES, start=1)
+    ]
+    arcanas = [Arcana(id=1, name="Destruição", icon_url="")]
+    skills = []
+    # Leave tier 2 empty to show the skipped-tier distortion of the linear picker
+    for tier in tiers:
+        if tier.tier_level == 2:
+            continue
+        for _ in range(skills_per_tier):
+            skill_id = len(skills) + 1
+            skills.append(
+                ArcanaSkill(
+                    id=skill_id,
+                    name=f"Skill {skill_id}",
+                    description="",
+                    arcana_id=1,
+                    tier_id=tier.id,
+                    tier=tier,
+                )
+            )
+    return create_arcana_data(arcanas, skills, tiers)
+
+
+@click.command()
+@click.option("--draws", default=1_000_000, help="Number of pulls per picker")
+@click.option("--skills-per-tier", default=10)
+def main(draws: int, skills_per_tier: int):
+    arcana_data = build_arcana_data(skills_per_tier)
+    random.seed(1)
+
+    def linear():
+        return pick_skill_with_probability(
+            "Destruição",
+            arcana_data["arcana_name_map"],
+            arcana_data["arcana_skills"],
+            arcana_data["sorted_tiers"],
+            GachaResult,
+        )
+
+    sampler = ArcanaSampler(arcana_data, rng=random.Random(1))
+
+    def alias():
+        return sampler.pick("Destruição")
+
+    click.echo(f"Effective odds: {sampler.effective_odds('Destruição')}")
+    for label, picker in (("linear", linear), ("alias", alias)):
+        tiers = Counter()
+        start = time.perf_counter()
+        for _ in range(draws):
+            result = picker()
+            tiers[result.tier_level if result else None] += 1
+        elapsed = time.perf_counter() - start
+        distribution = {
+            tier: round(count / draws, 4)
+            for tier, count in sorted(tiers.items(), key=lambda item: str(item[0]))
+        }
+        click.echo(
+            f"{label:<7} {elapsed:6.2f} s  {draws / elapsed:12,.0f} draws/s  "
+            f"{distribution}"
+        )
+
+
+if __name__ == "__main__":
+    main()
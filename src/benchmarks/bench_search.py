@@ -0,0 +1,80 @@
+# bench_search.py
+"""
+Linear substring scan vs. the autocomplete search index.
+
+    python src/benchmarks/bench_search.py --entries 20000
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import random  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+
+import click  # noqa: E402
+
+from services.search_service import SearchIndex  # noqa: E402
+
+FIRST_NAMES = [
+    "Ágata", "Álvaro", "Beatriz", "Caio", "Cecília", "Conceição", "Érico",
+    "Fábio", "Glória", "Inês", "João", "Lúcia", "Mônica", "Otávio", "Simão",
+]  # fmt: skip
+TITLES = ["da Chama", "do Vale", "Três Luas", "o Bravo", "de Órion", "Sem Nome"]
+QUERIES = ["j", "jo", "joa", "joão", "luc", "lucia do", "cec", "orion", "bravo", "xyz"]
+
+
+def build_entries(count: int, rng: random.Random):
+    return [
+        (i, f"{rng.choice(FIRST_NAMES)} {rng.choice(TITLES)} {i}")
+        for i in range(1, count + 1)
+    ]
+
+
+def linear_search(entries, query: str):
+    """What the admin autocomplete used to do on every cache miss."""
+    query = query.lower()
+    return [entry for entry in entries if query in entry[1].lower()][:25]
+
+
+def measure(func, queries, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+@click.command()
+@click.option("--entries", default=20_000, help="Number of indexed names")
+@click.option("--repeat", default=20, help="Passes over the query set")
+def main(entries: int, repeat: int):
+    rng = random.Random(1)
+    data = build_entries(entries, rng)
+
+    start = time.perf_counter()
+    index = SearchIndex(data, cache_size=1)
+    click.echo(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def indexed(query):
+        # Skip the result cache to time the index itself
+        index.results.clear()
+        return index.search(query)
+
+    cached = SearchIndex(data)
+    for label, func in (
+        ("linear", lambda query: linear_search(data, query)),
+        ("index", indexed),
+        ("cached", cached.search),
+    ):
+        p50, p99 = measure(func, QUERIES, repeat)
+        click.echo(f"{label:<7} p50 {p50:7.3f} ms  p99 {p99:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_seed.py
+"""
+Seeding time for a large characters.json, first run (inserts) and rerun
+(updates in place, nothing duplicated).
+
+    python src/benchmarks/bench_seed.py --characters 100000
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCH_DIR = tempfile.mkdtemp(prefix="ggm-bench-")
+os.environ.setdefault("LOG_DIR", BENCH_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+
+import json  # noqa: E402
+import shutil  # noqa: E402
+import time  # noqa: E402
+
+import click  # noqa: E402
+from sqlmodel import Session, func, select  # noqa: E402
+
+from config.database import engine, init_db  # noqa: E402
+from models.character import Character  # noqa: E402
+from seeds.seeder import DATA_PATH, Seeder  # noqa: E402
+
+
+def write_characters(path: Path, count: int, players: int) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        for i in range(count):
+            row = {
+                "discord_id": str(i % players),
+                "name": f"Personagem {i}",
+                "age": 20 + i % 50,
+                "level": 1 + i % 30,
+                "race": "Humano",
+                "mana_nature": "Neutra",
+                "story": "Uma história qualquer.",
+            }
+            file.write(("," if i else "") + json.dumps(row, ensure_ascii=False) + "\n")
+        file.write("]\n")
+
+
+@click.command()
+@click.option("--characters", default=100_000, help="Characters in the JSON file")
+@click.option("--players", default=20_000, help="Distinct owners")
+@click.option("--batch-size", default=5000, help="Rows per bulk statement")
+def main(characters: int, players: int, batch_size: int):
+    data_path = Path(BENCH_DIR) / "data"
+    data_path.mkdir()
+    for name in ("races.json", "mana_natures.json"):
+        shutil.copy(DATA_PATH / name, data_path / name)
+    write_characters(data_path / "characters.json", characters, players)
+    size = (data_path / "characters.json").stat().st_size / 1e6
+    click.echo(f"{characters} characters, {players} players, {size:.1f}MB of JSON")
+
+    init_db()
+    for run in ("first run", "rerun"):
+        started = time.perf_counter()
+        with Session(engine) as session:
+            results = Seeder(session, data_path, batch_size).seed(
+                ["races", "mana_natures", "characters"]
+            )
+        seconds = time.perf_counter() - started
+        character_result = results[-1]
+        click.echo(
+            f"{run:>9}: {seconds:6.2f}s  characters {character_result.inserted} "
+            f"inserted, {character_result.updated} updated "
+            f"({characters / seconds:,.0f} rows/s)"
+        )
+
+    with Session(engine) as session:
+        total = session.exec(select(func.count()).select_from(Character)).one()
+    click.echo(f"characters in the database: {total}")
+
+
+if __name__ == "__main__":
+    main()
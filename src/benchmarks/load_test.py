@@ -0,0 +1,400 @@
+# load_test.py
+"""
+Load test of the real cogs against a local database.
+
+/gacha, /ficha, dice messages and a few admin commands are invoked through
+stand-in interactions and messages, the way the command tree would call
+them, by a fixed number of concurrent workers. Reports the throughput, the
+latency percentiles and database queries of each command and the lag of
+the event loop.
+
+    python src/benchmarks/load_test.py --players 500 --concurrency 100 --requests 5000
+    python src/benchmarks/load_test.py --mix gacha=1,dice=1 --api-latency-ms 50
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BENCH_DIR = tempfile.mkdtemp(prefix="ggm-bench-")
+os.environ.setdefault("LOG_DIR", BENCH_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DIR}/bench.db")
+# Required by utils.load_env, the bot never logs in
+os.environ.setdefault("DISCORD_TOKEN", "load-test")
+os.environ.setdefault("DISCORD_GUILD_ID", "1")
+os.environ.setdefault("BOT_PREFIX", "!")
+
+import asyncio  # noqa: E402
+import random  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from collections import defaultdict  # noqa: E402
+from typing import Any, Awaitable, Callable, Dict, List, Optional  # noqa: E402
+
+import click  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from client import GardenBot  # noqa: E402
+from config.base_cogs import close_unit_of_work, finish_instrumentation  # noqa: E402
+from config.database import (  # noqa: E402
+    QueryProfile,
+    current_query_profile,
+    engine,
+    get_pool_stats,
+    init_db,
+    run_db,
+)
+from models.arcana import Arcana, ArcanaSkill, ArcanaSkillEnum, ArcanaTier  # noqa: E402
+from models.character import Character  # noqa: E402
+from models.gacha import GachaConfig  # noqa: E402
+from models.mana import ManaNature  # noqa: E402
+from models.race import Race  # noqa: E402
+from seeds.seeder import Seeder  # noqa: E402
+from utils.logger import BotLogger  # noqa: E402
+
+ARCANAS = [
+    "Destruição", "Criação", "Fortificação", "Divinação",
+    "Transformação", "Amarração", "Cura", "Transportação",
+]  # fmt: skip
+TIERS = [("Comum", 1, 0.6, "9e9e9e"), ("Raro", 2, 0.3, "2196f3"), ("Épico", 3, 0.1, "9c27b0")]  # fmt: skip
+DICE_MESSAGES = ["1d20", "2d6+3", "1d20 força", "3d8 des", "1d100", "1d20 vit 1d6"]
+ADMIN_ID = 1
+DEFAULT_MIX = "gacha=4,gacha10=1,ficha=3,dice=4,skill_rarity=1,stats=1,autocomplete=1"
+
+
+def seed(players: int) -> None:
+    """Game data, an enabled gacha and one character per player."""
+    with Session(engine) as session:
+        seeder = Seeder(session)
+        seeder.seed(["races", "mana_natures"])
+
+        arcanas = [Arcana(name=name, icon_url="") for name in ARCANAS]
+        tiers = [
+            ArcanaTier(tier_name=name, tier_level=level, probability=p, color=color)
+            for name, level, p, color in TIERS
+        ]
+        session.add_all(arcanas + tiers)
+        session.flush()
+        # Skill ids index the arcana skill bitfield, so there can't be more
+        session.add_all(
+            ArcanaSkill(
+                name=f"Feitiço {skill_id}",
+                description="",
+                arcana_id=arcanas[skill_id % len(arcanas)].id,
+                tier_id=tiers[skill_id % len(tiers)].id,
+            )
+            for skill_id in range(1, len(ArcanaSkillEnum) + 1)
+        )
+        session.add(
+            GachaConfig(
+                enabled=True,
+                general_pick_price=1,
+                choice_pick_price=1,
+                pity_threshold=10,
+                pity_enabled=False,
+            )
+        )
+
+        race = next(iter(seeder.ids_by_name(Race)))
+        mana_nature = next(iter(seeder.ids_by_name(ManaNature)))
+        rows = (
+            {
+                "discord_id": str(discord_id),
+                "player_name": f"player{discord_id}",
+                "name": f"Personagem {discord_id}",
+                "age": 20,
+                "race": race,
+                "mana_nature": mana_nature,
+            }
+            for discord_id in range(ADMIN_ID + 1, ADMIN_ID + 1 + players)
+        )
+        seeder.upsert(
+            Character, seeder.resolve_characters(rows), keys=("user_id", "name")
+        )
+        session.commit()
+
+
+class FakeUser:
+    def __init__(self, discord_id: int) -> None:
+        self.id = discord_id
+        self.name = self.display_name = f"player{discord_id}"
+        self.mention = f"<@{discord_id}>"
+        self.bot = False
+
+
+class FakeResponse:
+    """Stands in for InteractionResponse, each call takes ``latency`` seconds."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self) -> None:
+        self._done = True
+        await asyncio.sleep(self.latency)
+
+    async def send_message(self, *args, **kwargs) -> None:
+        await self._respond()
+
+    async def defer(self, *args, **kwargs) -> None:
+        await self._respond()
+
+    async def edit_message(self, *args, **kwargs) -> None:
+        await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def send(self, *args, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+
+class FakeInteraction:
+    def __init__(self, bot, user: FakeUser, command, latency: float) -> None:
+        self.client = bot
+        self.user = user
+        self.command = command
+        self.guild_id = int(os.environ["DISCORD_GUILD_ID"])
+        self.extras: Dict[str, Any] = {}
+        self.response = FakeResponse(latency)
+        self.followup = FakeFollowup(latency)
+
+
+class FakeMessage:
+    def __init__(self, author: FakeUser, content: str, latency: float) -> None:
+        self.author = author
+        self.content = content
+        self.latency = latency
+
+    async def reply(self, *args, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+
+class LoadTest:
+    """
+    Invokes the cogs the way GardenCommandTree does: the cog's interaction
+    check, the callback, then the same cleanup as on completion or error.
+    """
+
+    def __init__(self, bot: GardenBot, players: int, latency: float) -> None:
+        self.bot = bot
+        self.players = players
+        self.latency = latency
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # The first exception of each scenario, reported with the results
+        self.failures: Dict[str, Exception] = {}
+
+        gacha = bot.get_cog("GachaCog")
+        character = bot.get_cog("CharacterCog")
+        dice = bot.get_cog("DiceCog")
+        admin = bot.get_cog("AdminCog")
+        admin_group = bot.tree.get_command("admin")
+        self.scenarios: Dict[str, Callable[[], Awaitable[None]]] = {
+            "gacha": lambda: self.command(gacha, gacha.gacha, quantidade=1),
+            "gacha10": lambda: self.command(gacha, gacha.gacha, quantidade=10),
+            "ficha": lambda: self.command(character, character.player),
+            "dice": lambda: dice.on_message(
+                FakeMessage(self.player(), random.choice(DICE_MESSAGES), latency)
+            ),
+            "skill_rarity": lambda: self.command(
+                admin,
+                admin_group.get_command("skill_rarity"),
+                user=FakeUser(ADMIN_ID),
+                tier=random.randint(1, len(TIERS)),
+            ),
+            "stats": lambda: self.command(
+                admin, admin_group.get_command("stats"), user=FakeUser(ADMIN_ID)
+            ),
+            "autocomplete": lambda: admin.character_id_autocomplete(
+                FakeInteraction(bot, FakeUser(ADMIN_ID), None, latency),
+                random.choice(["Pers", "Personagem 1", "gem 4", "xyz"]),
+            ),
+        }
+
+    def player(self) -> FakeUser:
+        return FakeUser(random.randint(ADMIN_ID + 1, ADMIN_ID + self.players))
+
+    async def command(
+        self, cog, command, user: Optional[FakeUser] = None, **kwargs
+    ) -> None:
+        interaction = FakeInteraction(
+            self.bot, user or self.player(), command, self.latency
+        )
+        failed = True
+        try:
+            if await cog.interaction_check(interaction):
+                await command.callback(cog, interaction, **kwargs)
+            failed = False
+        finally:
+            finish_instrumentation(interaction, failed)
+            await close_unit_of_work(interaction)
+
+    async def invoke(self, name: str) -> None:
+        """Run one scenario, counting its statements in a profile of its own."""
+        profile = QueryProfile(name)
+        current_query_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.scenarios[name]()
+        except Exception as e:
+            self.errors[name] += 1
+            self.failures.setdefault(name, e)
+        self.latencies[name].append(time.perf_counter() - started)
+        self.queries[name].append(profile.count)
+
+    async def run(
+        self, mix: Dict[str, float], requests: int, concurrency: int
+    ) -> float:
+        names, weights = list(mix), list(mix.values())
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                name = random.choices(names, weights)[0]
+                # A task per request, so context variables don't leak between them
+                await asyncio.create_task(self.invoke(name))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+class LagMonitor:
+    """Records how late a periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - started - self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def percentiles(values: List[float]) -> tuple[float, float, float]:
+    """p50, p95 and p99 of the values."""
+    if len(values) < 2:
+        return (values[0],) * 3 if values else (0.0,) * 3
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def load_test(
+    players: int, concurrency: int, requests: int, latency: float, mix: str
+) -> None:
+    await run_db(init_db)
+    await run_db(seed, players)
+
+    # Created first, so the bot's logger writes to LOG_DIR but not the console
+    BotLogger("discord", write_to_console=False)
+    bot = GardenBot()
+    bot.owner_id = ADMIN_ID
+    bot.activity_tracker.start()
+    await bot.reload_game_data()
+    for extension in ("admin", "character", "dice", "gacha"):
+        await bot.load_extension(f"cogs.{extension}")
+
+    test = LoadTest(bot, players, latency)
+    weights = parse_mix(mix)
+    unknown = set(weights) - set(test.scenarios)
+    if unknown:
+        raise click.BadParameter(
+            f"unknown scenarios {', '.join(sorted(unknown))}, "
+            f"expected {', '.join(test.scenarios)}",
+            param_hint="--mix",
+        )
+
+    # Warm the caches and indexes, so the run measures the steady state
+    await test.run(weights, min(requests, concurrency), concurrency)
+    test = LoadTest(bot, players, latency)
+    monitor = LagMonitor()
+    monitor.start()
+    elapsed = await test.run(weights, requests, concurrency)
+    await monitor.stop()
+    await bot.activity_tracker.stop()
+
+    click.echo(
+        f"{requests} requests, {concurrency} concurrent, {players} players: "
+        f"{elapsed:.2f}s, {requests / elapsed:.0f} req/s"
+    )
+    click.echo(
+        f"{'command':<14}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'queries':>9}"
+    )
+    for name in sorted(test.latencies):
+        p50, p95, p99 = percentiles(test.latencies[name])
+        click.echo(
+            f"{name:<14}{len(test.latencies[name]):>7}{test.errors[name]:>8}"
+            f"{p50 * 1000:>9.1f}{p95 * 1000:>9.1f}{p99 * 1000:>9.1f}"
+            f"{statistics.mean(test.queries[name]):>9.1f}"
+        )
+    for name, error in sorted(test.failures.items()):
+        click.echo(f"{name} failed: {error!r}")
+    p50, _, p99 = percentiles(monitor.lags)
+    click.echo(
+        f"event loop lag: p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms, "
+        f"max {max(monitor.lags, default=0) * 1000:.1f}ms"
+    )
+    pool = get_pool_stats()
+    if pool is not None:
+        click.echo(
+            f"db pool: {pool.checkouts} checkouts, "
+            f"max wait {pool.max_wait_seconds * 1000:.1f}ms, {pool.timeouts} timeouts"
+        )
+
+
+@click.command()
+@click.option("--players", default=500, help="Players with a character")
+@click.option("--concurrency", default=50, help="Requests in flight at once")
+@click.option("--requests", default=5000, help="Requests to send in total")
+@click.option(
+    "--api-latency-ms", default=0.0, help="Simulated Discord API latency per reply"
+)
+@click.option(
+    "--mix", default=DEFAULT_MIX, help="Weighted scenarios, as name=weight,..."
+)
+@click.option("--seed", "rng_seed", default=0, help="Random seed")
+def main(
+    players: int,
+    concurrency: int,
+    requests: int,
+    api_latency_ms: float,
+    mix: str,
+    rng_seed: int,
+):
+    random.seed(rng_seed)
+    asyncio.run(load_test(players, concurrency, requests, api_latency_ms / 1000, mix))
+
+
+if __name__ == "__main__":
+    main()
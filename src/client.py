@@ -1,14 +1,28 @@
 import asyncio
 import os
+from typing import Optional
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 
+from config.base_cogs import close_unit_of_work, finish_instrumentation
 from config.bot import GardenBot as GardenBotBase
-from config.database import init_db
+from config.database import PoolExhaustedError, db_executor, init_db, run_db
 from models.game_data import GameData
+from repositories.character_repository import on_character_updated
+from services.activity_service import ActivityTracker
+from services.metrics_service import MetricsExporter, instrument_discord_http
+from services.search_service import GameDataSearch
+from services.startup_service import (
+    StartupTimer,
+    command_tree_hash,
+    read_command_tree_hash,
+    write_command_tree_hash,
+)
+from services.watchdog_service import LoopWatchdog
 from utils.load_env import check_required_env, load_env
-from utils.logger import BotLogger
+from utils.logger import BotLogger, stop_logging
 
 
 def get_prefix(bot, message):
@@ -20,6 +34,32 @@ def get_prefix(bot, message):
     return commands.when_mentioned_or(*prefixes)(bot, message)
 
 
+class GardenCommandTree(app_commands.CommandTree):
+    """
+    Command tree that releases per-interaction resources when a command fails.
+    """
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ) -> None:
+        finish_instrumentation(interaction, failed=True)
+        await close_unit_of_work(interaction)
+        if isinstance(getattr(error, "original", None), PoolExhaustedError):
+            await self.send_busy_message(interaction)
+        await super().on_error(interaction, error)
+
+    async def send_busy_message(self, interaction: discord.Interaction) -> None:
+        """Tell the user to retry when no database connection was free."""
+        message = "O servidor está ocupado no momento, tente novamente em instantes."
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException:
+            pass
+
+
 class GardenBot(GardenBotBase):
     """
     The main bot class, responsible for initialization and loading game data.
@@ -28,48 +68,99 @@ class GardenBot(GardenBotBase):
     def __init__(self, *args, **kwargs):
         # For simplicity, we use all intents. Could be refined later.
         intents = discord.Intents.all()
-        # Initialize the database
-        init_db()
-        # Load the game data
-        self.game_data = GameData()
+        # The database and game data are loaded in setup_hook, off the event loop
+        self.game_data = GameData(load=False)
+        # Autocomplete indexes, rebuilt whenever the game data changes
+        self.search = GameDataSearch()
+        self.game_data.subscribe(self.search.on_game_data)
+        on_character_updated(self.search.invalidate_characters)
+        # Keep last_active in memory and write it in batches
+        self.activity_tracker = ActivityTracker()
+        # Periodically writes the command metrics for Prometheus
+        self.metrics_exporter = MetricsExporter()
+        instrument_discord_http()
+        # Logs the stack of anything blocking the event loop
+        self.loop_watchdog = LoopWatchdog()
 
         # Initialize the bot with prefix + intents
-        super().__init__(*args, command_prefix=get_prefix, intents=intents, **kwargs)
+        super().__init__(
+            *args,
+            command_prefix=get_prefix,
+            intents=intents,
+            tree_cls=GardenCommandTree,
+            **kwargs,
+        )
 
         # Use the custom bot logger
         self.logger = BotLogger("discord")
 
     async def setup_hook(self):
         self.logger.info("Starting bot setup...")
+        timer = StartupTimer()
+        self.loop_watchdog.start()
+        self.activity_tracker.start()
+        self.metrics_exporter.start()
 
-        # Load cogs/extensions so slash commands are registered
-        self.logger.info("Beginning extension loading process...")
-        await self.load_extensions()
-        self.logger.info("Extensions loaded successfully")
+        with timer.phase("database"):
+            await run_db(init_db)
 
-        guild_id = os.getenv("DISCORD_GUILD_ID")
-        guild_obj = discord.Object(id=guild_id)
-        self.logger.info(f"Copying global commands to guild {guild_id}")
-        self.tree.copy_global_to(guild=guild_obj)
+        async def load_game_data():
+            with timer.phase("game_data"):
+                await self.reload_game_data()
+
+        async def load_extensions():
+            with timer.phase("extensions"):
+                await self.load_extensions()
+
+        # Game data loads on the database threads while the cogs are loaded
+        await asyncio.gather(load_game_data(), load_extensions())
 
         try:
-            self.logger.info("Syncing command tree with Discord...")
-            await self.tree.sync(guild=guild_obj)
-            self.logger.info("Command tree sync completed successfully")
+            with timer.phase("sync"):
+                synced = await self.sync_commands()
         except Exception as e:
             self.logger.error(f"Failed to sync command tree: {e}")
             raise
+        if synced is None:
+            self.logger.info("Command tree unchanged, skipped sync")
+        else:
+            self.logger.info(f"Synced {synced} commands")
+        self.logger.info(f"Startup timings: {timer}")
 
     async def load_extensions(self):
-        """Load all cogs/extensions from the cogs directory."""
-        for filename in os.listdir("./src/cogs"):
-            if filename.endswith(".py"):
-                ext_name = f"cogs.{filename[:-3]}"
-                try:
-                    await self.load_extension(ext_name)
-                    self.logger.info(f"Loaded extension '{ext_name}' successfully.")
-                except Exception as e:
-                    self.logger.error(f"Failed to load extension '{ext_name}': {e}")
+        """Load all cogs/extensions from the cogs directory concurrently."""
+        names = [
+            f"cogs.{filename[:-3]}"
+            for filename in sorted(os.listdir("./src/cogs"))
+            if filename.endswith(".py")
+        ]
+        results = await asyncio.gather(
+            *(self.load_extension(name) for name in names), return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Failed to load extension '{name}': {result}")
+            else:
+                self.logger.info(f"Loaded extension '{name}' successfully.")
+
+    async def sync_commands(self, force: bool = False) -> Optional[int]:
+        """
+        Copy the global commands to the guild and sync them with Discord,
+        unless the tree is identical to the one synced last time.
+        Returns the number of synced commands, or None when skipped.
+        """
+        guild_id = os.getenv("DISCORD_GUILD_ID")
+        if not guild_id:
+            raise ValueError("DISCORD_GUILD_ID not set in environment.")
+        guild_obj = discord.Object(id=guild_id)
+        self.tree.copy_global_to(guild=guild_obj)
+
+        digest = command_tree_hash(self.tree, guild_obj)
+        if not force and read_command_tree_hash() == digest:
+            return None
+        synced = await self.tree.sync(guild=guild_obj)
+        write_command_tree_hash(digest)
+        return len(synced)
 
     async def on_ready(self):
         self.logger.info(f"Logged in as: {self.user.name} - {self.user.id}")
@@ -78,8 +169,32 @@ class GardenBot(GardenBotBase):
         await self.change_presence(status=discord.Status.online, activity=game)
         self.logger.info("Bot is online and ready!")
 
-    def reload_game_data(self):
-        self.game_data.reload()
+    async def on_app_command_completion(
+        self, interaction: discord.Interaction, command: app_commands.Command
+    ):
+        finish_instrumentation(interaction, failed=False)
+        await close_unit_of_work(interaction)
+
+    async def close(self):
+        self.logger.info("Flushing pending user activity...")
+        try:
+            await self.activity_tracker.stop()
+        except Exception as e:
+            self.logger.error(f"Failed to flush user activity: {e}")
+        try:
+            await self.metrics_exporter.stop()
+        except Exception as e:
+            self.logger.error(f"Failed to write metrics: {e}")
+        await self.loop_watchdog.stop()
+        await super().close()
+        db_executor.shutdown(wait=True)
+        # Write out everything still queued for the log files
+        stop_logging()
+
+    async def reload_game_data(self, full: bool = False):
+        snapshot = await self.game_data.reload_async(full)
+        self.logger.info(f"Game data at version {snapshot.version}")
+        return snapshot
 
 
 async def main():
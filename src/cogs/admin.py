@@ -5,19 +5,32 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from config.base_cogs import BaseCogGroup
-from repositories.arcana_repository import get_arcana_skills
+from config.base_cogs import BaseCogGroup, get_unit_of_work
+from config.database import get_pool_stats, run_db
 from repositories.character_repository import (
+    add_arcana_skills,
+    character_cache,
+    count_skill_owners,
     get_character_by_id,
-    get_character_by_player_id,
-    get_characters,
-    update_character,
+    get_character_stat_columns,
+    get_skill_owners,
+    remove_arcana_skills,
+    set_current_points,
+    skill_owner_index,
 )
-from repositories.user_repository import get_or_create_user
-from services.arcana_service import add_arcana_skill, remove_arcana_skill
+from services.arcana_service import resolve_arcana_skill_mask
 from services.character_service import (
-    restore_character,
+    STAT_CHARACTER_COLUMNS,
+    STAT_RACE_COLUMNS,
+    calculate_restored_points,
 )
+from services.metrics_service import metrics
+from views.character import embed_cache
+from views.pagination import PaginationView
+
+SKILL_OWNERS_PER_PAGE = 15
+SKILL_RARITY_PER_PAGE = 15
+STATS_PER_PAGE = 10
 
 
 @commands.is_owner()
@@ -29,8 +42,8 @@ class AdminCog(BaseCogGroup, group_name="admin"):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.character_cache = {}
-        self.skill_cache = {}
+        # Sampled apart from the bot's other logs, see LOG_SAMPLE_RATES
+        self.turns_logger = bot.logger.child("turns")
 
     def _get_filtered_cogs(self, current: str = None):
         cogs_dir = os.path.normpath(
@@ -54,12 +67,14 @@ class AdminCog(BaseCogGroup, group_name="admin"):
         return [app_commands.Choice(name=cog, value=cog) for cog in filtered_cogs[:25]]
 
     @app_commands.command(name="reload", description="Reload a cog and sync commands")
+    @app_commands.describe(force="Sync even if the commands look unchanged")
     @app_commands.autocomplete(extension_name=extension_name_autocomplete)
     async def reload_cog(
         self,
         interaction: discord.Interaction,
         extension_name: str = None,
         sync: bool = False,
+        force: bool = False,
     ):
         """
         Reload a cog and sync commands.
@@ -80,13 +95,12 @@ class AdminCog(BaseCogGroup, group_name="admin"):
                 await self.bot.reload_extension(full_ext_name)
 
             if sync:
-                guild_id = os.getenv("DISCORD_GUILD_ID")
-                if not guild_id:
-                    raise ValueError("DISCORD_GUILD_ID not set in environment.")
-                guild_obj = discord.Object(id=guild_id)
                 self.bot.logger.debug("Syncing command tree...")
-                synced = await self.bot.tree.sync(guild=guild_obj)
-                self.bot.logger.debug(f"Synced {len(synced)} commands.")
+                synced = await self.bot.sync_commands(force=force)
+                if synced is None:
+                    self.bot.logger.debug("Command tree unchanged, skipped sync.")
+                else:
+                    self.bot.logger.debug(f"Synced {synced} commands.")
 
             # Send final follow-up message
             await interaction.followup.send(
@@ -116,10 +130,10 @@ class AdminCog(BaseCogGroup, group_name="admin"):
         Generates an ordered list of turns for each player in a role.
         """
         players = role.members
-        self.bot.logger.info(
-            f"Generating turns for role: {role.name} with {len(players)} players"
+        self.turns_logger.info(
+            "Generating turns for role: %s with %s players", role.name, len(players)
         )
-        self.bot.logger.info(f"Players: {players}")
+        self.turns_logger.info("Players: %s", players)
         if len(players) == 0:
             await interaction.response.send_message(
                 "No players in the role.", ephemeral=True
@@ -135,68 +149,76 @@ class AdminCog(BaseCogGroup, group_name="admin"):
 
         await interaction.response.send_message("\n".join(turn_list))
 
+    async def _reset_characters(self, interaction: discord.Interaction, discord_ids):
+        """
+        Restore the HP/MP of the characters of ``discord_ids`` to their max
+        values, computed for all of them at once. Returns their names.
+        """
+        unit_of_work = get_unit_of_work(interaction)
+        columns = await unit_of_work.run(
+            get_character_stat_columns,
+            ("name", *STAT_CHARACTER_COLUMNS),
+            STAT_RACE_COLUMNS,
+            discord_ids,
+        )
+        await unit_of_work.run(set_current_points, calculate_restored_points(columns))
+        return columns["name"]
+
     @app_commands.command(
         name="reset_character", description="Reset the character to its max hp and mp"
     )
     async def reset_character(
         self, interaction: discord.Interaction, user: discord.Member
     ):
-        character_user = get_or_create_user(user.id)
-        character = get_character_by_player_id(character_user.id)
+        names = await self._reset_characters(interaction, [user.id])
 
-        if character is None:
+        if not names:
             await interaction.response.send_message(
                 "Character not found", ephemeral=True
             )
             return
 
-        restore_character(character)
-        update_character(character)
         await interaction.response.send_message(
-            f"Character {character.name} has been reset to its max hp and mp",
+            f"Character {names[0]} has been reset to its max hp and mp",
             ephemeral=True,
         )
 
-    async def character_id_autocomplete(
-        self, interaction: discord.Interaction, current: str
-    ):
-        # 1. If we've already computed results for this exact prefix, return them.
-        if current in self.character_cache:
-            return self.character_cache[current]
+    @app_commands.command(
+        name="reset_role",
+        description="Reset the characters of every player in a role to their max hp and mp",
+    )
+    async def reset_role(self, interaction: discord.Interaction, role: discord.Role):
+        names = await self._reset_characters(
+            interaction, [member.id for member in role.members]
+        )
 
-        # 2. Fetch all characters from your data source.
-        characters = get_characters()
+        if not names:
+            await interaction.response.send_message(
+                "No characters in the role.", ephemeral=True
+            )
+            return
 
-        # 3. Filter by the current prefix (case-insensitive).
-        filtered_characters = [
-            c for c in characters if current.lower() in c.name.lower()
-        ]
+        await interaction.response.send_message(
+            f"{len(names)} characters of {role.name} have been reset to their max hp and mp",
+            ephemeral=True,
+        )
 
-        # 4. Convert the first 25 matching entries into app_commands.Choice objects.
-        choices = [
-            app_commands.Choice(name=c.name, value=c.id)
-            for c in filtered_characters[:25]
+    async def character_id_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ):
+        return [
+            app_commands.Choice(name=result.name, value=result.id)
+            for result in await self.bot.search.search_characters(current)
         ]
 
-        # 5. Store them in the cache so if the user re-enters the same prefix, we skip the DB call.
-        self.character_cache[current] = choices
-        return choices
-
     async def skill_id_autocomplete(
         self, interaction: discord.Interaction, current: str
     ):
-        if current in self.skill_cache:
-            return self.skill_cache[current]
-
-        skills = get_arcana_skills()
-        filtered_skills = [s for s in skills if current.lower() in s.name.lower()]
-        choices = [
-            app_commands.Choice(name=s.name, value=s.id) for s in filtered_skills[:25]
+        return [
+            app_commands.Choice(name=result.name, value=result.id)
+            for result in self.bot.search.skills.search(current)
         ]
 
-        self.skill_cache[current] = choices
-        return choices
-
     @app_commands.command(
         name="add_arcana_skill", description="Add a skill to a character"
     )
@@ -205,10 +227,17 @@ class AdminCog(BaseCogGroup, group_name="admin"):
     async def add_arcana_skill(
         self, interaction: discord.Interaction, character: int, skill: int
     ):
-        character_obj = get_character_by_id(character)
-        updated_arcana_skills = add_arcana_skill(character_obj.arcana_skills, skill - 1)
-        character_obj.arcana_skills = updated_arcana_skills
-        update_character(character_obj)
+        unit_of_work = get_unit_of_work(interaction)
+        updated_arcana_skills = await unit_of_work.run(
+            add_arcana_skills, character, resolve_arcana_skill_mask(skill - 1)
+        )
+        if updated_arcana_skills is None:
+            await interaction.response.send_message(
+                "Character not found", ephemeral=True
+            )
+            return
+
+        character_obj = await unit_of_work.run(get_character_by_id, character)
         await interaction.response.send_message(
             f"Skill {skill} added to character {character_obj.name}", ephemeral=True
         )
@@ -221,22 +250,162 @@ class AdminCog(BaseCogGroup, group_name="admin"):
     async def remove_arcana_skill(
         self, interaction: discord.Interaction, character: int, skill: int
     ):
-        character_obj = get_character_by_id(character)
-        self.bot.logger.info(f"Character arcana skills: {character_obj.arcana_skills}")
-        updated_arcana_skills = remove_arcana_skill(
-            character_obj.arcana_skills, skill - 1
+        unit_of_work = get_unit_of_work(interaction)
+        updated_arcana_skills = await unit_of_work.run(
+            remove_arcana_skills, character, resolve_arcana_skill_mask(skill - 1)
         )
+        if updated_arcana_skills is None:
+            await interaction.response.send_message(
+                "Character not found", ephemeral=True
+            )
+            return
+
         self.bot.logger.info(f"Updated arcana skills: {updated_arcana_skills}")
-        character_obj.arcana_skills = updated_arcana_skills
-        update_character(character_obj)
+        character_obj = await unit_of_work.run(get_character_by_id, character)
         await interaction.response.send_message(
             f"Skill {skill} removed from character {character_obj.name}", ephemeral=True
         )
 
+    @app_commands.command(
+        name="skill_owners", description="List the characters that own a skill"
+    )
+    @app_commands.autocomplete(skill=skill_id_autocomplete)
+    async def skill_owners(self, interaction: discord.Interaction, skill: int):
+        skill_name = next(
+            (s.name for s in self.bot.game_data.arcana_skills if s.id == skill),
+            f"Skill {skill}",
+        )
+        total = (await run_db(count_skill_owners, [skill - 1]))[skill - 1]
+        total_pages = max(
+            PaginationView.compute_total_pages(total, SKILL_OWNERS_PER_PAGE), 1
+        )
+
+        async def get_page(page: int) -> tuple[discord.Embed, int]:
+            owners = await run_db(
+                get_skill_owners,
+                skill - 1,
+                (page - 1) * SKILL_OWNERS_PER_PAGE,
+                SKILL_OWNERS_PER_PAGE,
+            )
+            embed = discord.Embed(
+                title=f"Owners of {skill_name}",
+                description="\n".join(
+                    f"`{character_id}` {name}" for character_id, name in owners
+                )
+                or "No character owns this skill",
+            )
+            embed.set_footer(text=f"{total} characters · page {page}/{total_pages}")
+            return embed, total_pages
+
+        await PaginationView(interaction.user, interaction, get_page).navigate()
+
+    @app_commands.command(
+        name="skill_rarity",
+        description="Count how many characters own each skill of a tier",
+    )
+    @app_commands.describe(tier="Tier level, rarest skills are listed first")
+    async def skill_rarity(self, interaction: discord.Interaction, tier: int):
+        skills = [
+            s
+            for s in self.bot.game_data.arcana_skills
+            if s.tier is not None and s.tier.tier_level == tier
+        ]
+        if not skills:
+            await interaction.response.send_message(
+                f"No skills in tier {tier}", ephemeral=True
+            )
+            return
+
+        counts = await run_db(count_skill_owners, [s.id - 1 for s in skills])
+        skills.sort(key=lambda s: (counts[s.id - 1], s.name))
+        lines = [f"**{counts[s.id - 1]}** · {s.name}" for s in skills]
+        total_pages = PaginationView.compute_total_pages(
+            len(lines), SKILL_RARITY_PER_PAGE
+        )
+
+        async def get_page(page: int) -> tuple[discord.Embed, int]:
+            start = (page - 1) * SKILL_RARITY_PER_PAGE
+            embed = discord.Embed(
+                title=f"Skill owners in tier {tier}",
+                description="\n".join(lines[start : start + SKILL_RARITY_PER_PAGE]),
+            )
+            embed.set_footer(text=f"Page {page}/{total_pages}")
+            return embed, total_pages
+
+        await PaginationView(interaction.user, interaction, get_page).navigate()
+
+    @app_commands.command(name="stats", description="Show command latency metrics")
+    async def stats(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "Only the bot owner can see the metrics", ephemeral=True
+            )
+            return
+
+        rows = metrics.summary()
+        pool = get_pool_stats()
+        lag = self.bot.loop_watchdog.summary()
+        lines = [
+            f"`{row.name}` **{row.count}** calls, {row.errors} errors · "
+            f"p50 {row.p50 * 1000:.0f}ms · p95 {row.p95 * 1000:.0f}ms · "
+            f"db {row.db_mean * 1000:.0f}ms · api {row.api_mean * 1000:.0f}ms"
+            for row in rows
+        ]
+        # Without timings there is still one page, for the pool and the loop
+        total_pages = max(
+            PaginationView.compute_total_pages(len(lines), STATS_PER_PAGE), 1
+        )
+
+        async def get_page(page: int) -> tuple[discord.Embed, int]:
+            start = (page - 1) * STATS_PER_PAGE
+            embed = discord.Embed(
+                title="Command metrics",
+                description="\n".join(lines[start : start + STATS_PER_PAGE])
+                or "No commands have been timed yet",
+            )
+            if pool is not None:
+                average_wait = (
+                    pool.wait_seconds / pool.checkouts if pool.checkouts else 0
+                )
+                embed.add_field(
+                    name="Database pool",
+                    value=(
+                        f"{pool.checked_out}/{pool.size} checked out, "
+                        f"{pool.overflow} overflow · "
+                        f"wait avg {average_wait * 1000:.1f}ms, "
+                        f"max {pool.max_wait_seconds * 1000:.0f}ms · "
+                        f"{pool.timeouts} timeouts"
+                    ),
+                )
+            embed.add_field(
+                name="Event loop",
+                value=(
+                    f"lag p50 {lag.p50 * 1000:.1f}ms · p99 {lag.p99 * 1000:.1f}ms · "
+                    f"max {lag.max * 1000:.0f}ms · {lag.blocks} blocks"
+                ),
+            )
+            embed.set_footer(
+                text=f"Page {page}/{total_pages} · sample rate {metrics.sample_rate:g}"
+            )
+            return embed, total_pages
+
+        await PaginationView(interaction.user, interaction, get_page).navigate()
+
     @app_commands.command(name="reload_game_data", description="Reload the game data")
-    async def reload_game_data(self, interaction: discord.Interaction):
-        self.bot.reload_game_data()
-        await interaction.response.send_message("Game data reloaded", ephemeral=True)
+    @app_commands.describe(full="Reload every table, even those that look unchanged")
+    async def reload_game_data(
+        self, interaction: discord.Interaction, full: bool = False
+    ):
+        previous_version = self.bot.game_data.version
+        snapshot = await self.bot.reload_game_data(full)
+        character_cache.clear()
+        skill_owner_index.clear()
+        embed_cache.clear()
+        if snapshot.version == previous_version:
+            message = f"Game data unchanged (version {snapshot.version})"
+        else:
+            message = f"Game data reloaded (version {snapshot.version})"
+        await interaction.response.send_message(message, ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
@@ -4,18 +4,22 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from config.base_cogs import PlayerCog
-from repositories.character_repository import (
-    get_character_by_player_id,
-)
-from repositories.user_repository import get_or_create_user
+from config.base_cogs import PlayerCog, get_unit_of_work
+from models.game_data import GameDataSnapshot
 from views.character import CharacterView
 
 
 class CharacterCog(PlayerCog):
     def __init__(self, bot: commands.Bot) -> None:
         super().__init__(bot)
-        self.arcana_skills = self.bot.game_data.arcana_skills
+        # Rebuild the skill lookup whenever a new game data version is published
+        self.bot.game_data.subscribe(self.on_game_data)
+
+    async def cog_unload(self) -> None:
+        self.bot.game_data.unsubscribe(self.on_game_data)
+
+    def on_game_data(self, snapshot: GameDataSnapshot) -> None:
+        self.skills_by_id = {skill.id: skill for skill in snapshot.arcana_skills}
 
     @app_commands.command(
         name="ficha", description="Mostra a ficha do seu personagem ativo."
@@ -28,10 +32,10 @@ class CharacterCog(PlayerCog):
         ] = None,
         mostrar: bool = False,
     ):
-        user = get_or_create_user(interaction.user.id)
-        character = get_character_by_player_id(user.id)
+        # Already loaded by the interaction check
+        character = await get_unit_of_work(interaction).get_character()
         view = CharacterView(
-            character, self.arcana_skills, interaction.user, page=pagina
+            character, self.skills_by_id, interaction.user, page=pagina
         )
 
         initial_embeds = view.get_embeds_for_option(view.current_option)
@@ -1,12 +1,23 @@
-import random
 import re
 
 import discord
 from discord.ext import commands
 
 from config.base_cogs import BaseCog
-from repositories.character_repository import get_character_by_player_id
-from repositories.user_repository import get_or_create_user
+from config.database import PROFILE_QUERIES, profile_queries, run_db
+from repositories.character_repository import (
+    character_cache,
+    get_character_attributes_by_discord_id,
+)
+from services.dice_service import (
+    DICE_MAX_COUNT,
+    DICE_MAX_EXPRESSIONS,
+    DICE_MAX_SIDES,
+    format_roll,
+    roll_dice,
+    validate_roll,
+)
+from services.metrics_service import metrics
 
 dice_attr_pattern = re.compile(
     r"(\d+)\s*[dD]\s*(\d+)\s*(?:[+\-]\s*(\d+))?\s*(?:([a-zA-ZçãõáéíóúâêîôûàèìòùäëïöüÇÃÕÁÉÍÓÚÂÊÎÔÛÀÈÌÒÙÄËÏÖÜ]+))?"
@@ -65,28 +76,52 @@ class DiceCog(BaseCog):
         if not matches:
             return
 
-        for match in matches:
-            number_of_dice = int(match[0])
-            sides_per_die = int(match[1])
+        with (
+            metrics.track("dice"),
+            profile_queries("dice", enabled=PROFILE_QUERIES),
+        ):
+            await self.roll_expressions(message, matches[:DICE_MAX_EXPRESSIONS])
+
+    async def roll_expressions(self, message: discord.Message, expressions: list):
+        # Resolve the author's attributes once per message, from memory when
+        # cached, including the absence of a character
+        attributes = None
+        if any(match[3].lower() in ATTRIBUTE_MAPPINGS for match in expressions):
+            await self.bot.activity_tracker.touch(
+                message.author.id, message.author.display_name
+            )
+            attributes = character_cache.get_attributes(message.author.id)
+            if attributes is None and not character_cache.is_missing(message.author.id):
+                attributes = await run_db(
+                    get_character_attributes_by_discord_id, message.author.id
+                )
+
+        for match in expressions:
+            try:
+                number_of_dice = int(match[0])
+                sides_per_die = int(match[1])
+                validate_roll(number_of_dice, sides_per_die)
+            except ValueError:
+                # Covers DiceLimitError and numbers too long to even parse
+                await message.reply(
+                    f"Rolagem inválida! Use de 1 a {DICE_MAX_COUNT} dados "
+                    f"com 1 a {DICE_MAX_SIDES} lados."
+                )
+                continue
 
             # Handle numeric modifier
             modifier = int(match[2]) if match[2] else 0
 
-            # Handle attribute modifier
+            # Handle attribute modifier, ignoring words that are not attributes
             attr_name = match[3].lower() if match[3] else None
+            if attr_name not in ATTRIBUTE_MAPPINGS:
+                attr_name = None
 
-            if attr_name:
-                # Get character's attribute value
-                user = get_or_create_user(message.author.id)
-                character = get_character_by_player_id(user.id)
-
-                if character and attr_name in ATTRIBUTE_MAPPINGS:
-                    attr_value = getattr(character, ATTRIBUTE_MAPPINGS[attr_name])
-                    modifier += attr_value
+            if attr_name and attributes:
+                modifier += getattr(attributes, ATTRIBUTE_MAPPINGS[attr_name])
 
             # Roll the dice
-            rolls = [random.randint(1, sides_per_die) for _ in range(number_of_dice)]
-            total = sum(rolls) + modifier
+            roll = roll_dice(number_of_dice, sides_per_die)
 
             # Build notation string
             notation_str = f"{number_of_dice}d{sides_per_die}"
@@ -98,7 +133,7 @@ class DiceCog(BaseCog):
                 portuguese_attr = PORTUGUESE_MAPPINGS[english_attr]
                 notation_str += f" ({portuguese_attr.capitalize()})"
 
-            await message.reply(f"` {total} ` ⟵ {rolls} {notation_str}")
+            await message.reply(format_roll(roll, modifier, notation_str))
 
 
 async def setup(bot: commands.Bot):
@@ -1,40 +1,39 @@
-import random
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from config.base_cogs import BaseCog
+from config.base_cogs import BaseCog, get_unit_of_work
 from models.gacha import GachaResult
-from repositories.character_repository import (
-    get_character_by_player_id,
-    update_character,
-)
-from repositories.gacha_repository import get_gacha_config
-from repositories.user_repository import get_or_create_user, increment_gacha_count
-from services.arcana_service import (
-    add_arcana_skill,
-    create_arcana_data,
-    pick_skill_with_probability,
-)
+from models.game_data import GameDataSnapshot
+from repositories.gacha_repository import apply_gacha_pulls
+from services.arcana_service import add_arcana_skill, create_arcana_data
+from services.gacha_service import ArcanaSampler
+from views.pagination import PaginationView
+
+MAX_GACHA_PULLS = 10
 
 
 class GachaCog(BaseCog):
     def __init__(self, bot: commands.Bot) -> None:
         super().__init__(bot)
-        self.config = get_gacha_config()
+        # Sampled apart from the bot's other logs, see LOG_SAMPLE_RATES
+        self.logger = bot.logger.child("gacha")
+        # Rebuild the arcana indexes whenever a new game data version is published
+        self.bot.game_data.subscribe(self.on_game_data)
+
+    async def cog_unload(self) -> None:
+        self.bot.game_data.unsubscribe(self.on_game_data)
 
-        game_data = self.bot.game_data
-        arcana_list = game_data.arcana
-        arcana_skills_list = game_data.arcana_skills
-        arcana_tiers_list = game_data.arcana_tiers
+    def on_game_data(self, snapshot: GameDataSnapshot) -> None:
+        self.config = snapshot.gacha_config
 
         # Build all arcana data via the service
         arcana_data = create_arcana_data(
-            arcana_list=arcana_list,
-            arcana_skills_list=arcana_skills_list,
-            arcana_tiers_list=arcana_tiers_list,
+            arcana_list=snapshot.arcana,
+            arcana_skills_list=snapshot.arcana_skills,
+            arcana_tiers_list=snapshot.arcana_tiers,
         )
 
         # Now, store these references as instance variables
@@ -43,6 +42,7 @@ class GachaCog(BaseCog):
         self.tier_config = arcana_data["tier_config"]
         self.arcana_skills = arcana_data["arcana_skills"]
         self.sorted_tiers = arcana_data["sorted_tiers"]
+        self.sampler = ArcanaSampler(arcana_data)
 
     def create_embed(self, skill: GachaResult, arcana_name: str) -> discord.Embed:
         arcana = self.arcana_name_map.get(arcana_name.lower())
@@ -67,8 +67,50 @@ class GachaCog(BaseCog):
         embed.set_footer(text=arcana.name, icon_url=arcana.icon_url)
         return embed
 
+    def create_summary_embed(self, skills: List[GachaResult]) -> discord.Embed:
+        """
+        One embed listing every result of a multi-pull, best tiers first.
+        """
+        best = max(skills, key=lambda skill: skill.tier_level)
+        embed = discord.Embed(
+            title=f"{len(skills)} feitiços rolados",
+            color=self.tier_config[best.tier_level]["color"],
+        )
+        lines = [
+            f"**{skill.name}** · {skill.tier_name} · {skill.arcana_name}"
+            for skill in sorted(skills, key=lambda skill: -skill.tier_level)
+        ]
+        embed.add_field(name="Resultados", value="\n".join(lines), inline=False)
+        embed.set_footer(text="Use os botões para ver cada feitiço")
+        return embed
+
+    async def send_results(
+        self, interaction: discord.Interaction, skills: List[GachaResult]
+    ) -> None:
+        """
+        A single pull gets its skill embed. A multi-pull gets one paginated
+        message: the summary first, then one page per skill.
+        """
+        if len(skills) == 1:
+            skill = skills[0]
+            await interaction.response.send_message(
+                embed=self.create_embed(skill, skill.arcana_name)
+            )
+            return
+
+        pages = [self.create_summary_embed(skills)]
+        pages.extend(self.create_embed(skill, skill.arcana_name) for skill in skills)
+
+        async def get_page(page: int) -> tuple[discord.Embed, int]:
+            return pages[page - 1], len(pages)
+
+        await PaginationView(interaction.user, interaction, get_page).navigate()
+
     @app_commands.command(name="gacha", description="Rola um feitiço elemental")
-    @app_commands.describe(arcana="A arcana de magias que você quer rolar")
+    @app_commands.describe(
+        arcana="A arcana de magias que você quer rolar",
+        quantidade=f"Quantos feitiços rolar de uma vez (até {MAX_GACHA_PULLS})",
+    )
     @commands.guild_only()
     async def gacha(
         self,
@@ -85,64 +127,55 @@ class GachaCog(BaseCog):
                 "Transportação",
             ]
         ] = None,
+        quantidade: app_commands.Range[int, 1, MAX_GACHA_PULLS] = 1,
     ):
         try:
-            self.bot.logger.info(f"Executing 'gacha' command. Arcana: {arcana}")
+            self.logger.info(
+                "Executing 'gacha' command. Arcana: %s, pulls: %s", arcana, quantidade
+            )
 
-            if not self.config.enabled:
+            if not self.config or not self.config.enabled:
                 await interaction.response.send_message(
                     "Nossos mercadores ainda não estão prontos para vender novos cancioneiros neste momento. Aguarde mais um pouco!",
                     ephemeral=True,
                 )
                 return
 
-            # If user didn't choose an arcana, pick a random one
-            if arcana is None:
-                chosen_arcana = random.choice(list(self.arcana_name_map.values()))
-                arcana_name = chosen_arcana.name
-            else:
-                arcana_name = arcana
-
-            # Use the refactored probability picker
-            skill = pick_skill_with_probability(
-                arcana_name,
-                self.arcana_name_map,
-                self.arcana_skills,
-                self.sorted_tiers,
-                GachaResult,
-            )
+            # O(1) draws with the renormalized tier odds. Without an arcana,
+            # every pull draws from a random one.
+            skills = self.sampler.pick_many(arcana, quantidade)
 
-            if skill is None:
-                self.bot.logger.info("No skill found. Informing the user.")
+            if not skills:
+                self.logger.info("No skill found. Informing the user.")
                 await interaction.response.send_message(
                     "Nenhum item encontrado. Tente novamente."
                 )
                 return
 
-            # Build the embed
-            skill_embed = self.create_embed(skill, arcana_name)
-
-            # Example: increment user’s gacha count
-            increment_gacha_count(interaction.user.id)
-
-            # If you track arcs for a character:
-            user = get_or_create_user(interaction.user.id)
-            character = get_character_by_player_id(user.id)
-            if character:
-                self.bot.logger.info(
-                    f"Adding skill {skill.skill_id} to user {interaction.user.id}"
-                )
-                new_arcana_skills = add_arcana_skill(
-                    character.arcana_skills, skill.skill_id - 1
-                )
-                character.arcana_skills = new_arcana_skills
-                update_character(character)
+            # Count the pulls and grant every skill in one transaction
+            skill_mask = 0
+            for skill in skills:
+                skill_mask = add_arcana_skill(skill_mask, skill.skill_id - 1)
+            self.logger.info(
+                "Adding skills %s to user %s",
+                [s.skill_id for s in skills],
+                interaction.user.id,
+            )
+            unit_of_work = get_unit_of_work(interaction)
+            character = await unit_of_work.get_character()
+            await unit_of_work.run(
+                apply_gacha_pulls,
+                interaction.user.id,
+                character.id if character else None,
+                skill_mask,
+                len(skills),
+            )
 
-            await interaction.response.send_message(embed=skill_embed)
-            self.bot.logger.info(f"Successfully sent skill: {skill}")
+            await self.send_results(interaction, skills)
+            self.logger.info("Successfully sent skills: %s", skills)
 
         except Exception as e:
-            self.bot.logger.error(f"Error in 'gacha' command: {e}", exc_info=True)
+            self.logger.error(f"Error in 'gacha' command: {e}", exc_info=True)
             await interaction.response.send_message(
                 "Ocorreu um erro ao executar o comando gacha. Por favor, tente novamente mais tarde."
             )
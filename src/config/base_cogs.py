@@ -2,13 +2,62 @@ import discord
 from discord.ext import commands
 
 from config.bot import GardenBot
-from repositories.character_repository import get_character_by_player_id
-from repositories.user_repository import get_or_create_user
+from config.database import PROFILE_QUERIES, QueryProfile, current_query_profile
+from repositories.unit_of_work import UnitOfWork
+from services.metrics_service import metrics
+
+
+def get_unit_of_work(interaction: discord.Interaction) -> UnitOfWork:
+    """
+    Return the unit of work for this interaction, creating it on first use.
+    Checks and the command body share it through ``interaction.extras``.
+    """
+    unit_of_work = interaction.extras.get("unit_of_work")
+    if unit_of_work is None:
+        unit_of_work = UnitOfWork(
+            interaction.user.id,
+            interaction.user.display_name,
+            getattr(interaction.client, "activity_tracker", None),
+        )
+        interaction.extras["unit_of_work"] = unit_of_work
+    return unit_of_work
+
+
+async def close_unit_of_work(interaction: discord.Interaction) -> None:
+    """Close the interaction's unit of work, if one was opened."""
+    unit_of_work = interaction.extras.pop("unit_of_work", None)
+    if unit_of_work is not None:
+        await unit_of_work.close()
+
+
+def start_instrumentation(interaction: discord.Interaction) -> None:
+    """
+    Start timing, and when enabled profiling the queries of, the interaction's
+    command. Runs once even if several checks call it; the state is kept in
+    ``interaction.extras`` until the command finishes.
+    """
+    if "command_timing" in interaction.extras or interaction.command is None:
+        return
+    name = interaction.command.qualified_name
+    interaction.extras["command_timing"] = metrics.begin(name)
+    if PROFILE_QUERIES:
+        profile = QueryProfile(name)
+        interaction.extras["query_profile"] = profile
+        current_query_profile.set(profile)
+
+
+def finish_instrumentation(interaction: discord.Interaction, failed: bool) -> None:
+    """Record the interaction's command timing and query profile, if any."""
+    metrics.finish(interaction.extras.pop("command_timing", None), failed)
+    profile = interaction.extras.pop("query_profile", None)
+    if profile is not None:
+        profile.log_findings()
 
 
 class BaseCog(commands.Cog):
     """
-    Automatically registers the user before each slash command.
+    Automatically registers the user, records their activity and starts
+    timing each slash command.
     """
 
     bot: GardenBot
@@ -21,8 +70,11 @@ class BaseCog(commands.Cog):
         Called before every slash command in this Cog runs.
         Return True to allow the command, False to block it.
         """
+        start_instrumentation(interaction)
         try:
-            get_or_create_user(interaction.user.id, interaction.user.display_name)
+            await self.bot.activity_tracker.touch(
+                interaction.user.id, interaction.user.display_name
+            )
         except Exception as e:
             self.bot.logger.error(f"Error in user registration: {e}", exc_info=True)
         return True
@@ -30,7 +82,8 @@ class BaseCog(commands.Cog):
 
 class BaseCogGroup(commands.GroupCog):
     """
-    Automatically registers the user before each slash command for a cog group.
+    Automatically registers the user and starts timing each slash command
+    for a cog group.
     """
 
     bot: GardenBot
@@ -44,8 +97,11 @@ class BaseCogGroup(commands.GroupCog):
         Called before every slash command in this Cog runs.
         Return True to allow the command, False to block it.
         """
+        start_instrumentation(interaction)
         try:
-            get_or_create_user(interaction.user.id, interaction.user.display_name)
+            await self.bot.activity_tracker.touch(
+                interaction.user.id, interaction.user.display_name
+            )
         except Exception as e:
             self.bot.logger.error(f"Error in user registration: {e}", exc_info=True)
         return True
@@ -74,8 +130,7 @@ class PlayerCog(BaseCog):
             return False
 
         # 2) Now check if the user has a character
-        user = get_or_create_user(interaction.user.id)
-        if not get_character_by_player_id(user.id):
+        if not await get_unit_of_work(interaction).get_character():
             emb = discord.Embed(
                 title="Você não possui um personagem registrado!",
                 description="Entre em contato com <@!149655287744167936> para criar um personagem.",
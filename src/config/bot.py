@@ -1,8 +1,12 @@
-from typing import TypeVar
+from typing import Optional, TypeVar
 
 from discord.ext import commands
 
-from models.game_data import GameData
+from models.game_data import GameData, GameDataSnapshot
+from services.activity_service import ActivityTracker
+from services.metrics_service import MetricsExporter
+from services.search_service import GameDataSearch
+from services.watchdog_service import LoopWatchdog
 from utils.logger import BotLogger
 
 BotT = TypeVar("BotT", bound="GardenBot")
@@ -13,7 +17,15 @@ class GardenBot(commands.Bot):
 
     game_data: GameData
     logger: BotLogger
+    activity_tracker: ActivityTracker
+    metrics_exporter: MetricsExporter
+    search: GameDataSearch
+    loop_watchdog: LoopWatchdog
 
-    def reload_game_data(self) -> None:
-        """Reloads all game data from the database."""
+    async def reload_game_data(self, full: bool = False) -> GameDataSnapshot:
+        """Reloads changed game data from the database."""
+        ...
+
+    async def sync_commands(self, force: bool = False) -> Optional[int]:
+        """Syncs the command tree with Discord if it changed since the last sync."""
         ...
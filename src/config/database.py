@@ -1,6 +1,30 @@
+import asyncio
+import contextvars
+import functools
 import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    TypeVar,
+)
 
-from sqlmodel import SQLModel, create_engine
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlmodel import Session, SQLModel, create_engine
 
 from models.arcana import Arcana, ArcanaSkill, ArcanaTier  # noqa: F401
 from models.character import Character  # noqa: F401
@@ -12,12 +36,21 @@ from models.region import Region  # noqa: F401
 # The following imports are used to create the database tables.
 # They are imported here to avoid circular imports.
 from models.user import User  # noqa: F401
+from services.metrics_service import add_db_time, metrics
 from utils.logger import BotLogger
 
 logger = BotLogger("database", write_to_console=False)
 
+T = TypeVar("T")
+
 
 def get_database_url():
+    # An explicit URL wins, e.g. "sqlite://" for the test suite and benchmarks
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        logger.info(f"Connecting to database at {database_url.split('://')[0]}")
+        return database_url
+
     # Get database connection parameters with fallbacks
     user = os.getenv("MYSQLUSER", "ggm")
     password = os.getenv("MYSQLPASSWORD", "ggm")
@@ -33,10 +66,344 @@ def get_database_url():
 # Get database URL from environment variables
 DATABASE_URL = get_database_url()
 
-engine = create_engine(DATABASE_URL, echo=False)
+
+# Repository functions are blocking, so the cogs run them on this pool
+# instead of on the event loop thread.
+DB_THREADS = int(os.getenv("DB_THREADS", "8"))
+
+# Connections kept open, by default one per database thread
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(DB_THREADS)))
+# Extra connections opened under load and closed once returned
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+# Seconds before a connection is replaced, below MySQL's wait_timeout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection on checkout and reconnect if it died (true/false)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Seconds to wait for a free connection before failing the command
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+
+class PoolExhaustedError(exc.TimeoutError):
+    """Every pooled connection stayed checked out for DB_POOL_TIMEOUT seconds."""
+
+
+class PoolStats(NamedTuple):
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    wait_seconds: float
+    max_wait_seconds: float
+    timeouts: int
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait and turns pool exhaustion
+    into a PoolExhaustedError.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self._stats_lock = threading.Lock()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError as e:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise PoolExhaustedError(
+                f"No database connection free after {self._timeout:g}s "
+                f"({self.checkedout()} checked out)"
+            ) from e
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> PoolStats:
+        with self._stats_lock:
+            return PoolStats(
+                self.size(),
+                self.checkedout(),
+                max(self.overflow(), 0),
+                self.checkouts,
+                self.wait_seconds,
+                self.max_wait_seconds,
+                self.timeouts,
+            )
+
+
+def create_database_engine(database_url: str):
+    """
+    Create the SQLAlchemy engine for the given URL.
+    In-memory SQLite databases share a single connection so every thread
+    (including the repository thread pool) sees the same data.
+    """
+    if database_url in ("sqlite://", "sqlite:///:memory:"):
+        return create_engine(
+            database_url,
+            echo=False,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    return create_engine(
+        database_url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+
+engine = create_database_engine(DATABASE_URL)
+db_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="ggm-db")
+
+
+def get_pool_stats() -> Optional[PoolStats]:
+    """Statistics of the engine's connection pool, None for in-memory SQLite."""
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.stats()
+    return None
+
+
+def _pool_gauge() -> Dict[str, float]:
+    stats = get_pool_stats()
+    if stats is None:
+        return {}
+    return {
+        'state="size"': stats.size,
+        'state="checked_out"': stats.checked_out,
+        'state="overflow"': stats.overflow,
+    }
+
+
+def _pool_wait_gauge() -> Dict[str, float]:
+    stats = get_pool_stats()
+    if stats is None:
+        return {}
+    return {
+        'stat="checkouts"': stats.checkouts,
+        'stat="wait_seconds"': stats.wait_seconds,
+        'stat="max_wait_seconds"': stats.max_wait_seconds,
+        'stat="timeouts"': stats.timeouts,
+    }
+
+
+metrics.register_gauge("ggm_db_pool_connections", "Pooled connections", _pool_gauge)
+metrics.register_gauge(
+    "ggm_db_pool_checkout", "Connection checkouts and waits", _pool_wait_gauge
+)
+
+
+class QueryStats:
+    """
+    Counts the statements executed while it is the current QueryStats.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+current_query_stats: contextvars.ContextVar[Optional[QueryStats]] = (
+    contextvars.ContextVar("current_query_stats", default=None)
+)
+
+
+# Profile the queries of every command and listener (true/false)
+PROFILE_QUERIES = os.getenv("PROFILE_QUERIES", "false").lower() == "true"
+# Profiled statements slower than this are logged with their parameters
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Identical statements repeated this often in one profile are N+1 candidates
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "3"))
+
+
+class SlowQuery(NamedTuple):
+    statement: str
+    parameters: Any
+    seconds: float
+
+
+class QueryProfile:
+    """
+    Collects every statement executed while it is the current QueryProfile,
+    including those run on the database thread pool through ``run_db``.
+
+    Statements are grouped by their SQL text, which keeps the parameters as
+    placeholders, so the same lazy load repeated for several rows shows up
+    as one shape with a high count.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_query_ms: float = SLOW_QUERY_MS,
+        n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD,
+    ) -> None:
+        self.name = name
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.slow: List[SlowQuery] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters: Any, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[statement] += 1
+            if seconds >= self.slow_query_seconds:
+                self.slow.append(SlowQuery(statement, parameters, seconds))
+                logger.warning(
+                    "Slow query in %s (%.1fms): %s | parameters: %.500r",
+                    self.name,
+                    seconds * 1000,
+                    statement,
+                    parameters,
+                )
+
+    def n_plus_one_candidates(self) -> Dict[str, int]:
+        """Statements repeated at least ``n_plus_one_threshold`` times."""
+        with self._lock:
+            return {
+                statement: count
+                for statement, count in self.shapes.most_common()
+                if count >= self.n_plus_one_threshold
+            }
+
+    def log_findings(self) -> None:
+        logger.info(
+            "%s ran %d queries in %.1fms", self.name, self.count, self.seconds * 1000
+        )
+        for statement, count in self.n_plus_one_candidates().items():
+            logger.warning(
+                "Possible N+1 in %s: %d identical queries: %s",
+                self.name,
+                count,
+                statement,
+            )
+
+
+current_query_profile: contextvars.ContextVar[Optional[QueryProfile]] = (
+    contextvars.ContextVar("current_query_profile", default=None)
+)
+
+
+@contextmanager
+def profile_queries(
+    name: str, enabled: bool = True
+) -> Iterator[Optional[QueryProfile]]:
+    """
+    Profile the statements executed inside the block and log the findings.
+    Yields None, without profiling, when ``enabled`` is false.
+    """
+    if not enabled:
+        yield None
+        return
+    profile = QueryProfile(name)
+    token = current_query_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_query_profile.reset(token)
+        profile.log_findings()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_query_profile.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+    profile = current_query_profile.get()
+    if profile is not None and conn.info.get("query_started"):
+        started = conn.info["query_started"].pop()
+        profile.record(statement, parameters, time.perf_counter() - started)
+
+
+@event.listens_for(engine, "handle_error")
+def _drop_query_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+@contextmanager
+def use_session(session: Optional[Session] = None) -> Iterator[Session]:
+    """
+    Yield the given session, or open a new one that is closed afterwards.
+    Lets repository functions take part in a caller's unit of work.
+    """
+    if session is not None:
+        yield session
+        return
+    with Session(engine) as new_session:
+        yield new_session
+
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"
+)
+
+
+def get_migration_heads() -> Set[str]:
+    """The head revisions of the Alembic migrations."""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option(
+        "script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations")
+    )
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def is_schema_at_head() -> bool:
+    """True when the database is stamped with every Alembic head revision."""
+    heads = get_migration_heads()
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return bool(heads) and current == heads
 
 
 def init_db():
-    """Initialize the database by creating all tables"""
+    """
+    Initialize the database by creating all tables, unless the migrations
+    already brought the schema up to date.
+    """
+    if is_schema_at_head():
+        logger.info("Database schema is at the latest migration")
+        return
     logger.info("Creating database tables...")
     SQLModel.metadata.create_all(engine)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking repository call on the database thread pool and await it.
+    The caller's context variables are carried over to the worker thread, and
+    the time spent waiting counts as database time of the current command.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return await loop.run_in_executor(db_executor, call)
+    finally:
+        add_db_time(time.perf_counter() - started)
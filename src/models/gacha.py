@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 from sqlmodel import Field, SQLModel
 
@@ -19,3 +21,4 @@ class GachaResult(BaseModel):
     tier_name: str
     chance: float
     skill_id: int
+    arcana_name: Optional[str] = None
@@ -1,36 +1,170 @@
-from typing import List, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
+from config.database import run_db
 from models.arcana import Arcana, ArcanaSkill, ArcanaTier
-from models.character import Character
 from models.gacha import GachaConfig
 from repositories.arcana_repository import (
     get_arcana_skills,
     get_arcana_tiers,
     get_arcanas,
 )
-from repositories.character_repository import get_characters
+from repositories.character_repository import CharacterDirectory
 from repositories.gacha_repository import get_gacha_config
+from repositories.game_data_repository import get_table_signatures
 
+# Snapshot field -> table model, used to detect which tables changed
+GAME_DATA_TABLES = {
+    "arcana": Arcana,
+    "arcana_tiers": ArcanaTier,
+    "arcana_skills": ArcanaSkill,
+    "gacha_config": GachaConfig,
+}
 
-class GameData(BaseModel):
-    arcana_skills: List[ArcanaSkill] = []
-    arcana_tiers: List[ArcanaTier] = []
-    arcana: List[Arcana] = []
-    characters: List[Character] = []
+# Skills carry their arcana and tier, so they are reloaded when either changes
+GAME_DATA_DEPENDENCIES = {
+    "arcana_skills": ("arcana", "arcana_tiers"),
+}
+
+GAME_DATA_LOADERS = {
+    "arcana": lambda: tuple(get_arcanas()),
+    "arcana_tiers": lambda: tuple(get_arcana_tiers()),
+    "arcana_skills": lambda: tuple(get_arcana_skills()),
+    "gacha_config": get_gacha_config,
+}
+
+
+class GameDataSnapshot(BaseModel):
+    """
+    Immutable view of the game data at one version.
+    Readers should grab a snapshot once and use it for the whole operation.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    version: int = 0
+    arcana_skills: Tuple[ArcanaSkill, ...] = ()
+    arcana_tiers: Tuple[ArcanaTier, ...] = ()
+    arcana: Tuple[Arcana, ...] = ()
     gacha_config: Optional[GachaConfig] = None
+    # Table name -> (row count, max id, max updated_at or checksum) at load time
+    signatures: Dict[str, Tuple] = {}
+
+
+GameDataSubscriber = Callable[[GameDataSnapshot], None]
+
+
+class GameData:
+    """
+    Holds the current GameDataSnapshot and swaps in new versions atomically.
+
+    Reloads only fetch the tables whose signature changed, and subscribers are
+    called with every new snapshot so they can rebuild derived indexes.
+    """
+
+    def __init__(self, load: bool = True) -> None:
+        self._snapshot = GameDataSnapshot()
+        # Newest snapshot built, which may not be published yet
+        self._built = self._snapshot
+        # Characters grow with the player base, so they are never snapshotted
+        self.characters = CharacterDirectory()
+        self._subscribers: List[GameDataSubscriber] = []
+        self._reload_lock = threading.Lock()
+        if load:
+            self.reload()
+
+    @property
+    def snapshot(self) -> GameDataSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def arcana_skills(self) -> Tuple[ArcanaSkill, ...]:
+        return self._snapshot.arcana_skills
+
+    @property
+    def arcana_tiers(self) -> Tuple[ArcanaTier, ...]:
+        return self._snapshot.arcana_tiers
+
+    @property
+    def arcana(self) -> Tuple[Arcana, ...]:
+        return self._snapshot.arcana
+
+    @property
+    def gacha_config(self) -> Optional[GachaConfig]:
+        return self._snapshot.gacha_config
+
+    def subscribe(self, callback: GameDataSubscriber) -> GameDataSubscriber:
+        """
+        Call ``callback`` with the current snapshot now and with every new one.
+        """
+        self._subscribers.append(callback)
+        callback(self._snapshot)
+        return callback
+
+    def unsubscribe(self, callback: GameDataSubscriber) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def build_snapshot(self, full: bool = False) -> GameDataSnapshot:
+        """
+        Build the next snapshot from the database (blocking).
+        Returns the current snapshot when nothing changed.
+
+        Snapshots build on the last one built rather than the published one,
+        so concurrent reloads get increasing versions.
+        """
+        with self._reload_lock:
+            current = self._built
+            signatures = get_table_signatures(GAME_DATA_TABLES)
+            changed = {
+                name
+                for name in GAME_DATA_TABLES
+                if full or signatures[name] != current.signatures.get(name)
+            }
+            for name, dependencies in GAME_DATA_DEPENDENCIES.items():
+                if changed.intersection(dependencies):
+                    changed.add(name)
+
+            if not changed:
+                return current
+
+            updates = {name: GAME_DATA_LOADERS[name]() for name in changed}
+            self._built = current.model_copy(
+                update={
+                    **updates,
+                    "version": current.version + 1,
+                    "signatures": signatures,
+                }
+            )
+            return self._built
+
+    def publish(self, snapshot: GameDataSnapshot) -> GameDataSnapshot:
+        """
+        Swap in a snapshot and notify subscribers if it is newer than the
+        current one. Returns the snapshot in use afterwards.
+        """
+        if snapshot.version <= self._snapshot.version:
+            # Already published, or overtaken by a concurrent reload
+            return self._snapshot
+        self._snapshot = snapshot
+        for callback in list(self._subscribers):
+            callback(snapshot)
+        return snapshot
+
+    def reload(self, full: bool = False) -> GameDataSnapshot:
+        """Reloads changed game data from the database (blocking)."""
+        return self.publish(self.build_snapshot(full))
 
-    def __init__(self, *args, **kwargs):
-        # Initialize with default empty values first
-        super().__init__(*args, **kwargs)
-        # Then load the actual data
-        self.reload()
-
-    def reload(self) -> None:
-        """Reloads all game data from the database."""
-        self.arcana_skills = get_arcana_skills()
-        self.arcana_tiers = get_arcana_tiers()
-        self.arcana = get_arcanas()
-        self.characters = get_characters()
-        self.gacha_config = get_gacha_config()
+    async def reload_async(self, full: bool = False) -> GameDataSnapshot:
+        """
+        Build the next snapshot on the database thread pool and swap it in on
+        the event loop, so subscribers never run concurrently with commands.
+        """
+        snapshot = await run_db(self.build_snapshot, full)
+        return self.publish(snapshot)
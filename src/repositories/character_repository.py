@@ -1,53 +1,615 @@
-from typing import List, Optional
+import os
+import time
+from datetime import datetime
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from sqlalchemy.orm import joinedload
-from sqlmodel import Session, select
+from sqlmodel import BigInteger, Session, case, func, select, update
 
-from config.database import engine
+from config.database import use_session
 from models.character import Character
+from models.race import Race
+from models.user import User
+from utils.bitfield import BitfieldIndex
+from utils.cache import LRUCache
 
+CHARACTER_CACHE_SIZE = int(os.getenv("CHARACTER_CACHE_SIZE", "1024"))
+# Seconds a discord user is remembered as having no character
+CHARACTER_MISSING_TTL = float(os.getenv("CHARACTER_MISSING_TTL", "60"))
+# Rows fetched per query when streaming every character
+CHARACTER_CHUNK_SIZE = int(os.getenv("CHARACTER_CHUNK_SIZE", "500"))
+# Answer skill ownership queries from memory instead of the database
+SKILL_OWNER_INDEX = os.getenv("SKILL_OWNER_INDEX", "false").lower() == "true"
 
-def get_characters() -> List[Character]:
+
+class CharacterAttributes(NamedTuple):
     """
-    Get all characters
+    Compact snapshot of a character's attribute block, used by dice rolls.
     """
-    with Session(engine) as session:
-        statement = select(Character)
-        return session.exec(statement).all()
 
+    character_id: int
+    vitality: int
+    dexterity: int
+    intelligence: int
+    strength: int
+    resistance: int
+    mana: int
+
+    @classmethod
+    def from_character(cls, character: Character) -> "CharacterAttributes":
+        return cls(
+            character.id, *(getattr(character, name) for name in ATTRIBUTE_FIELDS)
+        )
+
+
+ATTRIBUTE_FIELDS = CharacterAttributes._fields[1:]
+CHARACTER_COLUMNS = tuple(column.name for column in Character.__table__.columns)
+CHARACTER_RELATIONSHIPS = ("race", "region", "mana_nature")
+# Columns update_character never writes. arcana_skills only changes through
+# the atomic bitwise updates, which a stale full write would undo.
+UNWRITTEN_COLUMNS = ("id", "arcana_skills")
+# Columns whose change makes the cached relationships stale
+RELATIONSHIP_COLUMNS = ("race_id", "region_id", "mana_nature_id")
 
-def get_character_by_id(character_id: int) -> Optional[Character]:
+
+def _copy_character(character: Character, **values) -> Character:
     """
-    Get a character by id
+    A new detached character with the columns of ``character``, overridden by
+    ``values``, sharing its loaded race, region and mana nature.
     """
-    with Session(engine) as session:
-        statement = select(Character).where(Character.id == character_id)
-        return session.exec(statement).first()
+    columns = {name: getattr(character, name) for name in CHARACTER_COLUMNS}
+    columns.update(values)
+    relationships = {name: getattr(character, name) for name in CHARACTER_RELATIONSHIPS}
+    return Character(**columns, **relationships)
 
 
-def get_character_by_player_id(user_id: int) -> Optional[Character]:
+class CharacterCache:
     """
-    Get a character by player id with all relationships loaded
+    Identity map of fully loaded characters, keyed by character id and by the
+    owner's discord id. Cached characters are detached from any session and
+    always have their race, region and mana nature loaded.
+
+    Cached instances are never handed out: ``put`` stores a copy and the
+    getters return one, so a caller changing its character before committing
+    it is not seen by other readers.
+
+    Attribute snapshots are cached separately by character id, so dice rolls
+    keep working from memory after the full character has been evicted.
+    Discord users found without a character are remembered for
+    ``missing_ttl`` seconds, or until a character is created or changes hands.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CHARACTER_CACHE_SIZE,
+        missing_ttl: float = CHARACTER_MISSING_TTL,
+    ) -> None:
+        self.characters: LRUCache[int, Character] = LRUCache(maxsize)
+        self.character_ids: LRUCache[str, int] = LRUCache(maxsize)
+        self.attributes: LRUCache[int, CharacterAttributes] = LRUCache(maxsize)
+        self.missing_ttl = missing_ttl
+        # Discord id -> when it stops being known to have no character
+        self.missing: LRUCache[str, float] = LRUCache(maxsize)
+
+    @property
+    def hits(self) -> int:
+        return self.characters.hits
+
+    @property
+    def misses(self) -> int:
+        return self.characters.misses
+
+    def get(self, character_id: int) -> Optional[Character]:
+        character = self.characters.get(character_id)
+        return None if character is None else _copy_character(character)
+
+    def get_by_discord_id(self, discord_id: str) -> Optional[Character]:
+        character_id = self.character_ids.get(str(discord_id))
+        if character_id is None:
+            self.characters.misses += 1
+            return None
+        return self.get(character_id)
+
+    def get_attributes(self, discord_id: str) -> Optional[CharacterAttributes]:
+        """
+        Return the attribute snapshot of a discord user's character, deriving
+        it from a cached character if needed. Never touches the database.
+        """
+        character_id = self.character_ids.get(str(discord_id))
+        if character_id is None:
+            return None
+        attributes = self.attributes.get(character_id)
+        if attributes is None:
+            character = self.characters.peek(character_id)
+            if character is not None:
+                attributes = CharacterAttributes.from_character(character)
+                self.attributes.put(character_id, attributes)
+        return attributes
+
+    def put(self, character: Character, discord_id: Optional[str] = None) -> None:
+        self.characters.put(character.id, _copy_character(character))
+        self.attributes.put(character.id, CharacterAttributes.from_character(character))
+        if discord_id is not None:
+            self.character_ids.put(str(discord_id), character.id)
+
+    def is_missing(self, discord_id: str) -> bool:
+        """Whether the discord user was recently found without a character."""
+        expires = self.missing.get(str(discord_id))
+        return expires is not None and expires > time.monotonic()
+
+    def put_missing(self, discord_id: str) -> None:
+        self.missing.put(str(discord_id), time.monotonic() + self.missing_ttl)
+
+    def put_attributes(
+        self, attributes: CharacterAttributes, discord_id: Optional[str] = None
+    ) -> None:
+        self.attributes.put(attributes.character_id, attributes)
+        if discord_id is not None:
+            self.character_ids.put(str(discord_id), attributes.character_id)
+
+    def update(self, character_id: int, **values) -> None:
+        """Replace a cached character by one with already persisted column values."""
+        character = self.characters.peek(character_id)
+        if character is not None:
+            self.put(_copy_character(character, **values))
+
+    def invalidate(self, character_id: int) -> None:
+        self.characters.pop(character_id)
+        self.attributes.pop(character_id)
+
+    def forget_owner(self, character_id: int) -> None:
+        """Drop the discord ids resolving to a character that changed hands."""
+        for discord_id, cached_id in self.character_ids.items():
+            if cached_id == character_id:
+                self.character_ids.pop(discord_id)
+
+    def clear(self) -> None:
+        self.characters.clear()
+        self.character_ids.clear()
+        self.attributes.clear()
+        self.missing.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.characters), "hits": self.hits, "misses": self.misses}
+
+
+character_cache = CharacterCache()
+# Skill exponent -> ids of the characters owning it, when SKILL_OWNER_INDEX is on
+skill_owner_index = BitfieldIndex()
+
+CharacterUpdateListener = Callable[[int], None]
+_update_listeners: List[CharacterUpdateListener] = []
+
+
+def on_character_updated(callback: CharacterUpdateListener) -> CharacterUpdateListener:
+    """
+    Register ``callback`` to be called with a character's id whenever a change
+    to that character is committed, so derived caches can drop it.
+    """
+    _update_listeners.append(callback)
+    return callback
+
+
+def notify_character_updated(character_id: int) -> None:
+    for callback in list(_update_listeners):
+        callback(character_id)
+
+
+def _select_character():
+    return select(Character).options(
+        joinedload(Character.race),
+        joinedload(Character.region),
+        joinedload(Character.mana_nature),
+    )
+
+
+def _cache_character(
+    session: Session, character: Optional[Character], discord_id: Optional[str] = None
+) -> Optional[Character]:
+    """Detach a fully loaded character from the session and cache it."""
+    if character is not None:
+        session.expunge(character)
+        character_cache.put(character, discord_id)
+    return character
+
+
+def _keyset_chunks(
+    columns: Sequence, chunk_size: int, session: Optional[Session]
+) -> Iterator[list]:
+    """
+    Yield the rows of ``select(*columns)`` in character id order, chunk_size at
+    a time. Each chunk is its own query starting after the last id seen, so
+    later chunks cost no more than the first, unlike OFFSET pagination.
+    """
+    last_id = None
+    while True:
+        statement = select(*columns).order_by(Character.id).limit(chunk_size)
+        if last_id is not None:
+            statement = statement.where(Character.id > last_id)
+        with use_session(session) as chunk_session:
+            rows = chunk_session.exec(statement).all()
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+        last_id = last.id if isinstance(last, Character) else last[0]
+
+
+def iter_characters(
+    chunk_size: int = CHARACTER_CHUNK_SIZE, session: Optional[Session] = None
+) -> Iterator[List[Character]]:
+    """
+    Stream every character in chunks, without their relationships.
+    Only one chunk is held in memory at a time.
+    """
+    return _keyset_chunks((Character,), chunk_size, session)
+
+
+def iter_character_names(
+    chunk_size: int = CHARACTER_CHUNK_SIZE, session: Optional[Session] = None
+) -> Iterator[List[Tuple[int, str]]]:
+    """
+    Stream the (id, name) of every character in chunks.
+    """
+    return _keyset_chunks((Character.id, Character.name), chunk_size, session)
+
+
+class CharacterDirectory:
+    """
+    Lazy access to the whole character table, which is never held in memory.
+    Single lookups go through the bounded character cache and operations on
+    every character stream keyset-paginated chunks. All methods are blocking.
+    """
+
+    def get(self, character_id: int) -> Optional[Character]:
+        return get_character_by_id(character_id)
+
+    def chunks(
+        self, chunk_size: int = CHARACTER_CHUNK_SIZE
+    ) -> Iterator[List[Character]]:
+        return iter_characters(chunk_size)
+
+    def names(
+        self, chunk_size: int = CHARACTER_CHUNK_SIZE
+    ) -> Iterator[Tuple[int, str]]:
+        for chunk in iter_character_names(chunk_size):
+            yield from chunk
+
+    def names_of(self, character_ids: Iterable[int]) -> List[Tuple[int, str]]:
+        statement = select(Character.id, Character.name).where(
+            Character.id.in_(list(character_ids))
+        )
+        with use_session(None) as session:
+            return [tuple(row) for row in session.exec(statement).all()]
+
+    def signature(self) -> Tuple:
+        """
+        Row count, max id and total name length of the table. Inserts,
+        deletes and most renames change it, other updates do not.
+        """
+        statement = select(
+            func.count(),
+            func.max(Character.id),
+            func.coalesce(func.sum(func.length(Character.name)), 0),
+        )
+        with use_session(None) as session:
+            return tuple(session.exec(statement).one())
+
+
+def get_character_by_id(
+    character_id: int, session: Optional[Session] = None
+) -> Optional[Character]:
+    """
+    Get a character by id with all relationships loaded, using the cache
+    """
+    character = character_cache.get(character_id)
+    if character is not None:
+        return character
+
+    with use_session(session) as session:
+        statement = _select_character().where(Character.id == character_id)
+        return _cache_character(session, session.exec(statement).first())
+
+
+def get_character_by_discord_id(
+    discord_id: str, session: Optional[Session] = None
+) -> Optional[Character]:
+    """
+    Get the character of a discord user with all relationships loaded, using the cache
     """
-    with Session(engine) as session:
+    character = character_cache.get_by_discord_id(discord_id)
+    if character is not None:
+        return character
+
+    with use_session(session) as session:
         statement = (
-            select(Character)
-            .options(
-                joinedload(Character.race),
-                joinedload(Character.region),
-                joinedload(Character.mana_nature),
+            _select_character()
+            .join(User, Character.user_id == User.id)
+            .where(User.discord_id == str(discord_id))
+        )
+        return _cache_character(session, session.exec(statement).first(), discord_id)
+
+
+def get_character_attributes_by_discord_id(
+    discord_id: str, session: Optional[Session] = None
+) -> Optional[CharacterAttributes]:
+    """
+    Get the attribute block of a discord user's character, using the cache,
+    which also remembers users without a character for a while. A miss only
+    selects the attribute columns.
+    """
+    attributes = character_cache.get_attributes(discord_id)
+    if attributes is not None or character_cache.is_missing(discord_id):
+        return attributes
+
+    with use_session(session) as session:
+        statement = (
+            select(
+                Character.id, *(getattr(Character, name) for name in ATTRIBUTE_FIELDS)
             )
-            .where(Character.user_id == user_id)
+            .join(User, Character.user_id == User.id)
+            .where(User.discord_id == str(discord_id))
         )
-        return session.exec(statement).first()
+        row = session.exec(statement).first()
+
+    if row is None:
+        character_cache.put_missing(discord_id)
+        return None
+    attributes = CharacterAttributes(*row)
+    character_cache.put_attributes(attributes, discord_id)
+    return attributes
+
+
+def get_character_by_player_id(
+    user_id: int, session: Optional[Session] = None
+) -> Optional[Character]:
+    """
+    Get a character by player id with all relationships loaded
+    """
+    with use_session(session) as session:
+        statement = _select_character().where(Character.user_id == user_id)
+        return _cache_character(session, session.exec(statement).first())
 
 
-def update_character(character: Character) -> Character:
+def update_character(
+    character: Character, session: Optional[Session] = None
+) -> Character:
     """
-    Update a character based on its updated model
+    Update a character based on its updated model, except for its arcana
+    skills, which only change through add_arcana_skills, remove_arcana_skills
+    and apply_gacha_pulls. Writes through to the character cache.
     """
-    with Session(engine) as session:
-        session.add(character)
+    with use_session(session) as session:
+        if character.id is None:
+            session.add(character)
+            session.commit()
+            session.refresh(character)
+            skill_owner_index.set(character.id, character.arcana_skills)
+            # Its owner may be remembered as having no character
+            character_cache.missing.clear()
+            notify_character_updated(character.id)
+            return character
+
+        character.updated_at = datetime.utcnow()
+        values = {
+            name: getattr(character, name)
+            for name in CHARACTER_COLUMNS
+            if name not in UNWRITTEN_COLUMNS
+        }
+        statement = select(Character.user_id).where(Character.id == character.id)
+        previous_user_id = session.exec(statement).first()
+        session.exec(
+            update(Character).where(Character.id == character.id).values(**values)
+        )
         session.commit()
-        session.refresh(character)
-        return character
+
+    # Only committed values reach the cache, on top of its arcana skills
+    cached = character_cache.characters.peek(character.id)
+    if previous_user_id != character.user_id:
+        character_cache.invalidate(character.id)
+        character_cache.forget_owner(character.id)
+        character_cache.missing.clear()
+    elif cached is not None and all(
+        getattr(cached, name) == values[name] for name in RELATIONSHIP_COLUMNS
+    ):
+        character_cache.update(character.id, **values)
+    else:
+        character_cache.invalidate(character.id)
+        character_cache.put_attributes(CharacterAttributes.from_character(character))
+    notify_character_updated(character.id)
+    return character
+
+
+def _update_arcana_skills(
+    character_id: int, arcana_skills, session: Optional[Session]
+) -> Optional[int]:
+    with use_session(session) as session:
+        updated_at = datetime.utcnow()
+        statement = (
+            update(Character)
+            .where(Character.id == character_id)
+            .values(arcana_skills=arcana_skills, updated_at=updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if session.exec(statement).rowcount == 0:
+            return None
+        # Read back inside the same transaction, which still holds the row lock
+        statement = select(Character.arcana_skills).where(Character.id == character_id)
+        new_arcana_skills = session.exec(statement).one()
+        session.commit()
+
+    character_cache.update(
+        character_id, arcana_skills=new_arcana_skills, updated_at=updated_at
+    )
+    skill_owner_index.set(character_id, new_arcana_skills)
+    notify_character_updated(character_id)
+    return new_arcana_skills
+
+
+def add_arcana_skills(
+    character_id: int, skill_mask: int, session: Optional[Session] = None
+) -> Optional[int]:
+    """
+    Atomically set the bits of ``skill_mask`` in a character's arcana skills
+    (``arcana_skills = arcana_skills | mask``). Returns the new bitfield, or
+    None if the character does not exist.
+    """
+    arcana_skills = Character.arcana_skills.op("|", return_type=BigInteger)(skill_mask)
+    return _update_arcana_skills(character_id, arcana_skills, session)
+
+
+def remove_arcana_skills(
+    character_id: int, skill_mask: int, session: Optional[Session] = None
+) -> Optional[int]:
+    """
+    Atomically clear the bits of ``skill_mask`` in a character's arcana skills
+    (``arcana_skills = arcana_skills & ~mask``). Returns the new bitfield, or
+    None if the character does not exist.
+    """
+    arcana_skills = Character.arcana_skills.op("&", return_type=BigInteger)(~skill_mask)
+    return _update_arcana_skills(character_id, arcana_skills, session)
+
+
+def get_character_stat_columns(
+    columns: Sequence[str],
+    race_columns: Sequence[str],
+    discord_ids: Optional[Sequence[str]] = None,
+    session: Optional[Session] = None,
+) -> Dict[str, list]:
+    """
+    Get the given Character and Race columns of every character with a race
+    in one query, as lists keyed by column name (plus "id"), ordered by id.
+    ``discord_ids`` limits them to the characters of those users.
+    """
+    selected = [Character.id]
+    selected += [getattr(Character, name) for name in columns]
+    selected += [getattr(Race, name) for name in race_columns]
+    with use_session(session) as session:
+        statement = (
+            select(*selected)
+            .join(Race, Character.race_id == Race.id)
+            .order_by(Character.id)
+        )
+        if discord_ids is not None:
+            statement = statement.join(User, Character.user_id == User.id).where(
+                User.discord_id.in_([str(discord_id) for discord_id in discord_ids])
+            )
+        rows = session.exec(statement).all()
+    names = ["id", *columns, *race_columns]
+    return {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+
+def set_current_points(
+    points: Mapping[int, Tuple[int, int]], session: Optional[Session] = None
+) -> int:
+    """
+    Set the current HP and MP of many characters, given as {id: (hp, mp)},
+    in a single UPDATE statement. Returns the number of updated characters.
+    """
+    if not points:
+        return 0
+
+    updated_at = datetime.utcnow()
+    with use_session(session) as session:
+        statement = (
+            update(Character)
+            .where(Character.id.in_(points.keys()))
+            .values(
+                current_hp=case(
+                    {character_id: hp for character_id, (hp, _) in points.items()},
+                    value=Character.id,
+                ),
+                current_mp=case(
+                    {character_id: mp for character_id, (_, mp) in points.items()},
+                    value=Character.id,
+                ),
+                updated_at=updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        updated = session.exec(statement).rowcount
+        session.commit()
+
+    for character_id, (current_hp, current_mp) in points.items():
+        character_cache.update(
+            character_id,
+            current_hp=current_hp,
+            current_mp=current_mp,
+            updated_at=updated_at,
+        )
+        notify_character_updated(character_id)
+    return updated
+
+
+def _owns_skill(skill: int):
+    """SQL predicate: the character owns the skill with exponent ``skill``."""
+    return Character.arcana_skills.op("&", return_type=BigInteger)(1 << skill) != 0
+
+
+def _loaded_skill_owner_index(session: Session) -> Optional[BitfieldIndex]:
+    if not SKILL_OWNER_INDEX:
+        return None
+    if not skill_owner_index.loaded:
+        statement = select(Character.id, Character.arcana_skills)
+        skill_owner_index.load_once(lambda: session.exec(statement).all())
+    return skill_owner_index
+
+
+def count_skill_owners(
+    skills: Sequence[int], session: Optional[Session] = None
+) -> Dict[int, int]:
+    """
+    Count the characters owning each skill (by exponent) in a single query,
+    with the bitwise test done by the database.
+    """
+    if not skills:
+        return {}
+    with use_session(session) as session:
+        index = _loaded_skill_owner_index(session)
+        if index is not None:
+            return {skill: index.count(skill) for skill in skills}
+
+        statement = select(
+            *(
+                func.coalesce(func.sum(case((_owns_skill(skill), 1), else_=0)), 0)
+                for skill in skills
+            )
+        )
+        counts = session.exec(statement).one()
+        return dict(zip(skills, counts))
+
+
+def get_skill_owners(
+    skill: int,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    session: Optional[Session] = None,
+) -> List[Tuple[int, str]]:
+    """
+    Get the (id, name) of the characters owning a skill (by exponent),
+    ordered by id.
+    """
+    with use_session(session) as session:
+        statement = select(Character.id, Character.name).order_by(Character.id)
+        index = _loaded_skill_owner_index(session)
+        if index is None:
+            statement = statement.where(_owns_skill(skill)).offset(offset)
+            if limit is not None:
+                statement = statement.limit(limit)
+        else:
+            owners = index.ids(skill)
+            end = None if limit is None else offset + limit
+            statement = statement.where(Character.id.in_(owners[offset:end]))
+        return [tuple(row) for row in session.exec(statement).all()]
@@ -1,10 +1,88 @@
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Optional
 
-from config.database import engine
+from sqlmodel import BigInteger, Session, select, update
+
+from config.database import engine, use_session
+from models.character import Character
 from models.gacha import GachaConfig
+from models.user import User
+from repositories.character_repository import (
+    character_cache,
+    notify_character_updated,
+    skill_owner_index,
+)
 
 
 def get_gacha_config() -> GachaConfig:
     with Session(engine) as session:
         statement = select(GachaConfig)
         return session.exec(statement).first()
+
+
+def apply_gacha_pulls(
+    discord_id: str,
+    character_id: Optional[int],
+    skill_mask: int,
+    pulls: int,
+    session: Optional[Session] = None,
+) -> int:
+    """
+    Record a batch of gacha pulls in a single transaction: add ``pulls`` to the
+    user's gacha count and grant every skill in ``skill_mask`` to the given
+    character of theirs, if any. Both changes are applied on the database
+    side, so concurrent pulls never lose updates. Returns the new gacha count
+    (0 if the user does not exist).
+    """
+    with use_session(session) as session:
+        statement = (
+            update(User)
+            .where(User.discord_id == str(discord_id))
+            .values(gacha_count=User.gacha_count + pulls)
+            .execution_options(synchronize_session=False)
+        )
+        if session.exec(statement).rowcount == 0:
+            return 0
+
+        arcana_skills = None
+        if character_id is not None:
+            user_id = (
+                select(User.id)
+                .where(User.discord_id == str(discord_id))
+                .scalar_subquery()
+            )
+            updated_at = datetime.utcnow()
+            statement = (
+                update(Character)
+                .where(Character.id == character_id, Character.user_id == user_id)
+                .values(
+                    arcana_skills=Character.arcana_skills.op(
+                        "|", return_type=BigInteger
+                    )(skill_mask),
+                    updated_at=updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            updated = session.exec(statement).rowcount
+            if updated != 1:
+                raise ValueError(
+                    f"Expected to update character {character_id} of user "
+                    f"{discord_id}, updated {updated}"
+                )
+            # Read back inside the same transaction, which still holds the row lock
+            arcana_skills = session.exec(
+                select(Character.arcana_skills).where(Character.id == character_id)
+            ).one()
+
+        gacha_count = session.exec(
+            select(User.gacha_count).where(User.discord_id == str(discord_id))
+        ).one()
+        session.commit()
+
+    if arcana_skills is not None:
+        character_cache.update(
+            character_id, arcana_skills=arcana_skills, updated_at=updated_at
+        )
+        skill_owner_index.set(character_id, arcana_skills)
+        notify_character_updated(character_id)
+    return gacha_count
@@ -0,0 +1,44 @@
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlmodel import Session, SQLModel
+
+from config.database import use_session
+
+
+def _content_checksum(model: type[SQLModel], session: Session) -> str:
+    """Hash of every column of every row, read as plain tuples."""
+    rows = session.execute(select(*model.__table__.columns).order_by(model.id)).all()
+    return hashlib.sha256(repr([tuple(row) for row in rows]).encode()).hexdigest()
+
+
+def get_table_signatures(
+    models: Dict[str, type[SQLModel]], session: Optional[Session] = None
+) -> Dict[str, Tuple]:
+    """
+    Get the row count, max id and max updated_at of every given table.
+    Tables without an updated_at column get a checksum of their content
+    instead, so an edit that keeps the count and max id is still seen.
+    Tables whose signature did not change do not need to be reloaded.
+    """
+    columns = []
+    for name, model in models.items():
+        columns.append(
+            select(func.count()).select_from(model).scalar_subquery().label(name)
+        )
+        columns.append(select(func.max(model.id)).scalar_subquery())
+        if "updated_at" in model.__table__.columns:
+            columns.append(select(func.max(model.updated_at)).scalar_subquery())
+
+    with use_session(session) as session:
+        row = session.execute(select(*columns)).one()
+        values = iter(row)
+        signatures = {}
+        for name, model in models.items():
+            count, max_id = next(values), next(values)
+            if "updated_at" in model.__table__.columns:
+                signatures[name] = (count, max_id, next(values))
+            else:
+                signatures[name] = (count, max_id, _content_checksum(model, session))
+    return signatures
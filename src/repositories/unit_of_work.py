@@ -0,0 +1,112 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar
+
+from sqlmodel import Session
+
+from config.database import QueryStats, current_query_stats, engine, run_db
+from models.character import Character
+from models.user import User
+from repositories.character_repository import get_character_by_discord_id
+from repositories.user_repository import get_or_create_user
+
+if TYPE_CHECKING:
+    from services.activity_service import ActivityTracker
+
+T = TypeVar("T")
+
+_UNSET: Any = object()
+
+
+class UnitOfWork:
+    """
+    One database session shared by everything that handles a single interaction.
+
+    The checks and the command body resolve the user and their character
+    through the same object, so each is queried at most once. Each ``run``
+    is its own transaction: the connection goes back to the pool when the
+    step returns, and is never held while the command awaits Discord.
+    """
+
+    def __init__(
+        self,
+        discord_id: str,
+        player_name: Optional[str] = None,
+        activity_tracker: Optional["ActivityTracker"] = None,
+    ) -> None:
+        self.discord_id = str(discord_id)
+        self.player_name = player_name
+        self.activity_tracker = activity_tracker
+        self.session = Session(engine, expire_on_commit=False)
+        self.stats = QueryStats()
+        self._lock = asyncio.Lock()
+        self._user_id: Optional[int] = None
+        self._user: Optional[User] = _UNSET
+        self._character: Optional[Character] = _UNSET
+
+    @property
+    def query_count(self) -> int:
+        """Statements executed through this unit of work so far."""
+        return self.stats.count
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a repository function with this unit of work's session, then
+        commit what it left pending and release the connection. The function
+        must accept a ``session`` keyword argument.
+        """
+
+        def call() -> T:
+            token = current_query_stats.set(self.stats)
+            try:
+                result = func(*args, session=self.session, **kwargs)
+                self.session.commit()
+                return result
+            except Exception:
+                # Repositories leave failures to the owner of the session,
+                # so a failed step is never committed by a later one
+                self.session.rollback()
+                raise
+            finally:
+                # Loaded rows stay usable, expire_on_commit is off
+                self.session.close()
+                current_query_stats.reset(token)
+
+        async with self._lock:
+            return await run_db(call)
+
+    async def get_user_id(self) -> int:
+        """Resolve the interaction user's User.id."""
+        if self._user_id is None:
+            if self.activity_tracker is not None:
+                self._user_id = await self.activity_tracker.resolve(
+                    self.discord_id, self.player_name
+                )
+            else:
+                user = await self.get_user()
+                self._user_id = user.id
+        return self._user_id
+
+    async def get_user(self) -> User:
+        """Load the interaction user's row, creating it if needed."""
+        if self._user is _UNSET:
+            self._user = await self.run(
+                get_or_create_user,
+                self.discord_id,
+                self.player_name,
+                update_last_active=False,
+            )
+            self._user_id = self._user.id
+        return self._user
+
+    async def get_character(self) -> Optional[Character]:
+        """Load the interaction user's character with its relationships."""
+        if self._character is _UNSET:
+            self._character = await self.run(
+                get_character_by_discord_id, self.discord_id
+            )
+        return self._character
+
+    async def close(self) -> None:
+        """Release the session and its connection."""
+        async with self._lock:
+            await run_db(self.session.close)
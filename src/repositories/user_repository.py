@@ -1,18 +1,26 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
-from sqlmodel import Session, select
+from sqlmodel import Session, case, select, update
 
-from config.database import engine
+from config.database import engine, use_session
 from models.user import User
 
 
-def get_or_create_user(discord_id: str, player_name: Optional[str] = None) -> User:
-    with Session(engine) as session:
+def get_or_create_user(
+    discord_id: str,
+    player_name: Optional[str] = None,
+    update_last_active: bool = True,
+    session: Optional[Session] = None,
+) -> User:
+    with use_session(session) as session:
         # Try to find existing user
         statement = select(User).where(User.discord_id == discord_id)
         user = session.exec(statement).first()
 
+        if user and not update_last_active:
+            return user
+
         if user:
             # Update last active timestamp
             user.last_active = datetime.utcnow()
@@ -29,20 +37,52 @@ def get_or_create_user(discord_id: str, player_name: Optional[str] = None) -> Us
         return new_user
 
 
-def increment_gacha_count(discord_id: str):
-    with Session(engine) as session:
-        statement = select(User).where(User.discord_id == discord_id)
-        user = session.exec(statement).first()
-        if user:
-            user.gacha_count += 1
-            session.add(user)
-            session.commit()
-            session.refresh(user)
-            return user.gacha_count
-        return 0
+def increment_gacha_count(
+    discord_id: str, pulls: int = 1, session: Optional[Session] = None
+) -> int:
+    """
+    Atomically add ``pulls`` to a user's gacha count on the database side.
+    Returns the new count (0 if the user does not exist).
+    """
+    with use_session(session) as session:
+        statement = (
+            update(User)
+            .where(User.discord_id == str(discord_id))
+            .values(gacha_count=User.gacha_count + pulls)
+            .execution_options(synchronize_session=False)
+        )
+        if session.exec(statement).rowcount == 0:
+            return 0
+        # Read back inside the same transaction, which still holds the row lock
+        statement = select(User.gacha_count).where(User.discord_id == str(discord_id))
+        gacha_count = session.exec(statement).one()
+        session.commit()
+        return gacha_count
 
 
-def get_user_by_discord_id(discord_id: str) -> User | None:
-    with Session(engine) as session:
+def get_user_by_discord_id(
+    discord_id: str, session: Optional[Session] = None
+) -> User | None:
+    with use_session(session) as session:
         statement = select(User).where(User.discord_id == discord_id)
         return session.exec(statement).first()
+
+
+def update_last_active(last_active_by_discord_id: Dict[str, datetime]) -> int:
+    """
+    Write many last_active timestamps in a single UPDATE statement.
+    Returns the number of updated users.
+    """
+    if not last_active_by_discord_id:
+        return 0
+
+    with Session(engine) as session:
+        statement = (
+            update(User)
+            .where(User.discord_id.in_(last_active_by_discord_id.keys()))
+            .values(last_active=case(last_active_by_discord_id, value=User.discord_id))
+            .execution_options(synchronize_session=False)
+        )
+        result = session.exec(statement)
+        session.commit()
+        return result.rowcount
@@ -5,137 +5,333 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-import json
-from typing import Any, Dict
+import os
+import time
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import click
-from sqlmodel import Session
+from pydantic_core import PydanticUndefined
+from sqlalchemy import insert, update
+from sqlmodel import Session, SQLModel, select
 
 from config.database import engine, init_db
 from models.character import Character
-from models.mana import ManaNature
+from models.mana import ManaNature, ManaNatureCompositionLink
 from models.race import Race
 from models.region import Region
+from models.user import User
+from utils.json_stream import iter_json_array
+
+# Rows sent in each bulk INSERT or UPDATE
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "5000"))
+
+DATA_PATH = Path(__file__).parent / "data"
+
+
+class SeedResult(NamedTuple):
+    dataset: str
+    inserted: int
+    updated: int
+    seconds: float
+
+
+def batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def column_defaults(model: type[SQLModel]) -> Callable[[], Dict[str, Any]]:
+    """
+    Return a function building the column defaults SQLModel would apply when
+    constructing ``model``, since bulk inserts skip the model constructor.
+    """
+    columns = set(model.__table__.columns.keys()) - {"id"}
+    values, factories = {}, {}
+    for name, field in model.model_fields.items():
+        if name not in columns:
+            continue
+        if field.default_factory is not None:
+            factories[name] = field.default_factory
+        elif field.default is not PydanticUndefined:
+            values[name] = field.default
+
+    def defaults() -> Dict[str, Any]:
+        return {**values, **{name: factory() for name, factory in factories.items()}}
+
+    return defaults
 
 
 class Seeder:
-    def __init__(self, session: Session):
+    """
+    Idempotent bulk seeding. Rows are matched to existing ones by a natural
+    key (the name, or the owner and name for characters): new rows are
+    inserted and existing ones updated in place, one bulk statement per batch.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        data_path: Path = DATA_PATH,
+        batch_size: int = SEED_BATCH_SIZE,
+    ):
         self.session = session
-        self.data_path = Path(__file__).parent / "data"
-
-    def load_json(self, file_name: str) -> Dict[str, Any]:
-        with open(self.data_path / file_name, "r") as file:
-            return json.load(file)
-
-    def seed_races(self):
-        races_data = self.load_json("races.json")
-        for race_data in races_data:
-            race = Race(**race_data)
-            self.session.add(race)
-        self.session.commit()
-
-    def seed_regions(self):
-        regions_data = self.load_json("regions.json")
-        for region_data in regions_data:
-            region = Region(**region_data)
-            self.session.add(region)
-        self.session.commit()
-
-    def seed_characters(self):
-        characters_data = self.load_json("characters.json")
-        for character_data in characters_data:
-            character = Character(**character_data)
-            self.session.add(character)
-        self.session.commit()
-
-    def seed_mana_natures(self):
+        self.data_path = Path(data_path)
+        self.batch_size = batch_size
+        self.datasets: Dict[str, Callable[[], Tuple[int, int]]] = {
+            "races": self.seed_races,
+            "regions": self.seed_regions,
+            "mana_natures": self.seed_mana_natures,
+            "characters": self.seed_characters,
+        }
+
+    def load_json(self, file_name: str) -> Iterator[Dict[str, Any]]:
+        """Stream the rows of a JSON array file."""
+        with open(self.data_path / file_name, "r", encoding="utf-8") as file:
+            yield from iter_json_array(file)
+
+    def seed(self, datasets: Sequence[str], dry_run: bool = False) -> List[SeedResult]:
+        """
+        Seed each dataset in its own transaction. A dry run seeds them all in
+        one transaction that is rolled back, so later datasets still see the
+        rows of earlier ones.
+        """
+        results = []
+        try:
+            for name in datasets:
+                started = time.perf_counter()
+                inserted, updated = self.datasets[name]()
+                if not dry_run:
+                    self.session.commit()
+                results.append(
+                    SeedResult(name, inserted, updated, time.perf_counter() - started)
+                )
+        finally:
+            # Discards the dry run, or the dataset that failed
+            self.session.rollback()
+        return results
+
+    def upsert(
+        self,
+        model: type[SQLModel],
+        rows: Iterable[Dict[str, Any]],
+        keys: Sequence[str] = ("name",),
+    ) -> Tuple[int, int]:
         """
-        Example of seeding ManaNature (some pure, some composite) from JSON.
+        Insert the rows whose natural key is new and update the others.
+        Returns the number of inserted and updated rows.
         """
-        mana_data = self.load_json("mana_natures.json")
-
-        # 1. Create all mana natures and store them by name
-        name_to_mana = {}
-        for data in mana_data:
-            # No 'components' in constructor, because it's handled separately
-            mana = ManaNature(
-                name=data["name"], description=data["description"], color=data["color"]
+        columns = set(model.__table__.columns.keys()) - {"id"}
+        defaults = column_defaults(model)
+        key_columns = [getattr(model, key) for key in keys]
+        # Updated rows get a fresh updated_at, created_at is left alone
+        touch = (
+            model.model_fields["updated_at"].default_factory
+            if "updated_at" in columns
+            else None
+        )
+        inserted = updated = 0
+
+        for batch in batched(rows, self.batch_size):
+            # A key repeated within the batch keeps its last row
+            by_key = {
+                tuple(row[key] for key in keys): {
+                    name: value for name, value in row.items() if name in columns
+                }
+                for row in batch
+            }
+            statement = select(model.id, *key_columns).where(
+                key_columns[-1].in_({key[-1] for key in by_key})
             )
-            self.session.add(mana)
-            name_to_mana[data["name"]] = mana
+            existing = {
+                tuple(found[1:]): found[0] for found in self.session.exec(statement)
+            }
 
-        # Commit so that 'mana' objects get an ID
-        self.session.commit()
+            new_rows, changed_rows = [], []
+            for key, row in by_key.items():
+                if key in existing:
+                    if touch is not None:
+                        row.setdefault("updated_at", touch())
+                    changed_rows.append({"id": existing[key], **row})
+                else:
+                    new_rows.append({**defaults(), **row})
+            if new_rows:
+                self.session.execute(insert(model), new_rows)
+            if changed_rows:
+                self.session.execute(update(model), changed_rows)
+            inserted += len(new_rows)
+            updated += len(changed_rows)
+        return inserted, updated
 
-        # 2. Second pass: link composites to their components
-        for data in mana_data:
-            mana = name_to_mana[data["name"]]
-            # If it has components, link them
-            component_names = data.get("components", [])
-            for comp_name in component_names:
-                component_mana = name_to_mana[comp_name]
-                mana.components.append(component_mana)
+    def ids_by_name(
+        self, model: type[SQLModel], names: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        statement = select(model.name, model.id)
+        if names is not None:
+            statement = statement.where(model.name.in_(set(names)))
+        return dict(self.session.exec(statement).all())
 
-        # Commit the links
-        self.session.commit()
+    def seed_races(self) -> Tuple[int, int]:
+        return self.upsert(Race, self.load_json("races.json"))
 
+    def seed_regions(self) -> Tuple[int, int]:
+        return self.upsert(Region, self.load_json("regions.json"))
 
-@click.group()
-def cli():
-    """Database seeding commands"""
-    pass
+    def seed_mana_natures(self) -> Tuple[int, int]:
+        """
+        Seed ManaNature (some pure, some composite), then link every composite
+        to its components with a single bulk insert of the missing links.
+        """
+        components: Dict[str, List[str]] = {}
 
+        def natures() -> Iterator[Dict[str, Any]]:
+            for data in self.load_json("mana_natures.json"):
+                components[data["name"]] = data.get("components", [])
+                yield data
 
-@cli.command()
-def seed_all():
-    """Seed all data"""
-    init_db()  # Initialize database tables
-    with Session(engine) as session:
-        seeder = Seeder(session)
-        seeder.seed_races()
-        seeder.seed_regions()
-        seeder.seed_mana_natures()  # seed ManaNature data
-        click.echo("✅ All data seeded successfully!")
+        result = self.upsert(ManaNature, natures())
 
+        ids = self.ids_by_name(ManaNature, set(components).union(*components.values()))
+        links = set()
+        for name, component_names in components.items():
+            for component_name in component_names:
+                if component_name not in ids:
+                    raise ValueError(
+                        f"Unknown component {component_name!r} of mana nature {name!r}"
+                    )
+                links.add((ids[name], ids[component_name]))
 
-@cli.command()
-def seed_races():
-    """Seed only races data"""
-    init_db()
-    with Session(engine) as session:
-        seeder = Seeder(session)
-        seeder.seed_races()
-        click.echo("✅ Races seeded successfully!")
+        if links:
+            composite_ids = {composite for composite, _ in links}
+            statement = select(
+                ManaNatureCompositionLink.composite_mana_id,
+                ManaNatureCompositionLink.component_mana_id,
+            ).where(ManaNatureCompositionLink.composite_mana_id.in_(composite_ids))
+            missing = links - set(self.session.exec(statement).all())
+            if missing:
+                self.session.execute(
+                    insert(ManaNatureCompositionLink),
+                    [
+                        {"composite_mana_id": composite, "component_mana_id": component}
+                        for composite, component in sorted(missing)
+                    ],
+                )
+        return result
 
+    def ensure_users(self, player_names: Dict[str, str]) -> Dict[str, int]:
+        """Map discord ids to user ids, creating the missing users in bulk."""
+        statement = select(User.discord_id, User.id).where(
+            User.discord_id.in_(player_names)
+        )
+        user_ids = dict(self.session.exec(statement).all())
+        missing = [
+            {"discord_id": discord_id, "player_name": player_name}
+            for discord_id, player_name in player_names.items()
+            if discord_id not in user_ids
+        ]
+        if missing:
+            defaults = column_defaults(User)
+            self.session.execute(
+                insert(User), [{**defaults(), **row} for row in missing]
+            )
+            user_ids.update(self.session.exec(statement).all())
+        return user_ids
 
-@cli.command()
-def seed_regions():
-    """Seed only regions data"""
-    init_db()
-    with Session(engine) as session:
-        seeder = Seeder(session)
-        seeder.seed_regions()
-        click.echo("✅ Regions seeded successfully!")
+    def resolve_characters(
+        self, rows: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Replace the owner's ``discord_id`` and the ``race``, ``region`` and
+        ``mana_nature`` names of each character with their ids.
+        """
+        references = {
+            "race": ("race_id", self.ids_by_name(Race)),
+            "region": ("region_id", self.ids_by_name(Region)),
+            "mana_nature": ("mana_nature_id", self.ids_by_name(ManaNature)),
+        }
+        for batch in batched(rows, self.batch_size):
+            owners = {
+                str(row["discord_id"]): row.get("player_name", str(row["discord_id"]))
+                for row in batch
+                if "discord_id" in row
+            }
+            user_ids = self.ensure_users(owners) if owners else {}
+            for row in batch:
+                if "discord_id" in row:
+                    row["user_id"] = user_ids[str(row.pop("discord_id"))]
+                for field, (column, ids) in references.items():
+                    if field in row:
+                        name = row.pop(field)
+                        if name not in ids:
+                            raise ValueError(
+                                f"Unknown {field} {name!r} of {row['name']!r}"
+                            )
+                        row[column] = ids[name]
+                yield row
 
+    def seed_characters(self) -> Tuple[int, int]:
+        rows = self.resolve_characters(self.load_json("characters.json"))
+        return self.upsert(Character, rows, keys=("user_id", "name"))
 
-@cli.command()
-def seed_manas():
-    """Seed only ManaNature data"""
-    init_db()
+
+def run(datasets: Sequence[str], dry_run: bool, data_path: Path) -> None:
+    started = time.perf_counter()
+    init_db()  # Initialize database tables
     with Session(engine) as session:
-        seeder = Seeder(session)
-        seeder.seed_mana_natures()
-        click.echo("✅ Mana natures seeded successfully!")
+        results = Seeder(session, data_path).seed(datasets, dry_run=dry_run)
+    for result in results:
+        click.echo(
+            f"{result.dataset}: {result.inserted} inserted, {result.updated} updated "
+            f"in {result.seconds * 1000:.0f}ms"
+        )
+    if dry_run:
+        click.echo("Dry run, nothing was written.")
+    else:
+        click.echo(f"✅ Seeded in {time.perf_counter() - started:.2f}s")
 
 
-@cli.command()
-def seed_characters():
-    """Seed only characters data"""
-    init_db()
-    with Session(engine) as session:
-        seeder = Seeder(session)
-        seeder.seed_characters()
-        click.echo("✅ Characters seeded successfully!")
+def seed_command(name: str, datasets: Sequence[str], help_text: str):
+    @cli.command(name=name, help=help_text)
+    @click.option("--dry-run", is_flag=True, help="Seed and roll everything back")
+    @click.option(
+        "--data-path",
+        type=click.Path(exists=True, file_okay=False, path_type=Path),
+        default=DATA_PATH,
+        help="Directory holding the JSON files",
+    )
+    def command(dry_run: bool, data_path: Path):
+        run(datasets, dry_run, data_path)
+
+    return command
+
+
+@click.group()
+def cli():
+    """Database seeding commands"""
+    pass
+
+
+seed_all = seed_command(
+    "seed-all", ("races", "regions", "mana_natures"), "Seed all data"
+)
+seed_races = seed_command("seed-races", ("races",), "Seed only races data")
+seed_regions = seed_command("seed-regions", ("regions",), "Seed only regions data")
+seed_manas = seed_command("seed-manas", ("mana_natures",), "Seed only ManaNature data")
+seed_characters = seed_command(
+    "seed-characters", ("characters",), "Seed only characters data"
+)
 
 
 if __name__ == "__main__":
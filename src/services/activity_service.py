@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from config.database import run_db
+from repositories.user_repository import get_or_create_user, update_last_active
+from utils.cache import LRUCache
+from utils.logger import BotLogger
+
+ACTIVITY_FLUSH_SECONDS = float(os.getenv("ACTIVITY_FLUSH_SECONDS", "60"))
+ACTIVITY_FLUSH_BATCH_SIZE = 500
+# Discord id -> User.id mappings kept; evicted users are looked up again
+ACTIVITY_USER_CACHE_SIZE = int(os.getenv("ACTIVITY_USER_CACHE_SIZE", "4096"))
+
+logger = BotLogger("activity", write_to_console=False)
+
+
+class ActivityTracker:
+    """
+    Write-behind tracker for User.last_active.
+
+    Activity is kept in memory and flushed in batched UPDATEs on an interval
+    and at shutdown. The database is only hit synchronously the first time a
+    user is seen, to resolve (or create) their row, or again once they were
+    evicted from the bounded id cache.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = ACTIVITY_FLUSH_SECONDS,
+        user_cache_size: int = ACTIVITY_USER_CACHE_SIZE,
+    ) -> None:
+        self.flush_interval = flush_interval
+        # discord_id -> User.id for recently active users known to exist
+        self._user_ids: LRUCache[str, int] = LRUCache(user_cache_size)
+        # discord_id -> last_active waiting to be written
+        self._pending: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def resolve(self, discord_id: str, player_name: Optional[str] = None) -> int:
+        """
+        Return the User.id for a discord id, creating the user if needed.
+        """
+        key = str(discord_id)
+        user_id = self._user_ids.get(key)
+        if user_id is None:
+            user = await run_db(
+                get_or_create_user, key, player_name, update_last_active=False
+            )
+            user_id = user.id
+            self._user_ids.put(key, user_id)
+        return user_id
+
+    async def touch(self, discord_id: str, player_name: Optional[str] = None) -> int:
+        """
+        Record activity for a user and return their User.id.
+        """
+        user_id = await self.resolve(discord_id, player_name)
+        with self._lock:
+            self._pending[str(discord_id)] = datetime.utcnow()
+        return user_id
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def flush_pending(self) -> int:
+        """
+        Write every pending timestamp to the database (blocking).
+        Returns the number of users written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        items = list(pending.items())
+        written = 0
+        try:
+            for start in range(0, len(items), ACTIVITY_FLUSH_BATCH_SIZE):
+                batch = dict(items[start : start + ACTIVITY_FLUSH_BATCH_SIZE])
+                update_last_active(batch)
+                written += len(batch)
+        except Exception:
+            # Put back whatever was not written, unless a newer touch replaced it
+            with self._lock:
+                for discord_id, last_active in items[written:]:
+                    self._pending.setdefault(discord_id, last_active)
+            raise
+        return written
+
+    async def flush(self) -> int:
+        """
+        Flush pending activity from the database thread pool.
+        """
+        if not self._pending:
+            return 0
+        return await run_db(self.flush_pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                written = await self.flush()
+                if written:
+                    logger.debug(f"Flushed last_active for {written} users")
+            except Exception as e:
+                logger.error(f"Failed to flush user activity: {e}")
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -1,7 +1,19 @@
 import random
-from typing import Dict, List, Union
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
 
 from models.arcana import Arcana, ArcanaSkill, ArcanaSkillEnum, ArcanaTier
+from utils.bitfield import decode_bitfields, iter_set_bits, popcount
+
+# Number of skill bits in use and a mask covering them
+ARCANA_SKILL_COUNT = len(ArcanaSkillEnum)
+ARCANA_SKILL_MASK = (1 << ARCANA_SKILL_COUNT) - 1
+
+# Bit position -> enum member
+_ARCANA_SKILLS_BY_BIT = {
+    skill.value.bit_length() - 1: skill for skill in ArcanaSkillEnum
+}
 
 
 def resolve_arcana_skill_mask(skill: Union[int, ArcanaSkillEnum]) -> int:
@@ -42,14 +54,32 @@ def get_arcana_skills(bitfield: int) -> list[ArcanaSkillEnum]:
     """
     Return a list of ArcanaSkill members set in the bitfield.
     """
-    return [skill for skill in ArcanaSkillEnum if (bitfield & skill.value) != 0]
+    return [
+        _ARCANA_SKILLS_BY_BIT[bit]
+        for bit in iter_set_bits(bitfield & ARCANA_SKILL_MASK)
+    ]
 
 
 def get_arcana_skill_ids(bitfield: int) -> list[int]:
     """
     Returns the *exponents* (0 through 53) of the bits that are set in 'bitfield'.
     """
-    return [i for i in range(54) if (bitfield & (1 << i)) != 0]
+    return list(iter_set_bits(bitfield & ARCANA_SKILL_MASK))
+
+
+def count_arcana_skills(bitfield: int) -> int:
+    """
+    Return how many skills are set in the bitfield.
+    """
+    return popcount(bitfield & ARCANA_SKILL_MASK)
+
+
+def decode_arcana_skills(bitfields: Sequence[int]) -> np.ndarray:
+    """
+    Decode many characters' bitfields into a boolean ownership matrix with one
+    row per bitfield and one column per skill exponent.
+    """
+    return decode_bitfields(bitfields, width=ARCANA_SKILL_COUNT)
 
 
 def create_arcana_data(
@@ -117,6 +147,9 @@ def pick_skill_with_probability(
     """
     Returns a GachaResult (or None) by randomly picking
     a skill from the given arcana based on tier probability.
+
+    Linear reference picker: tiers the arcana has no skills in are skipped
+    without renormalizing. The gacha uses services.gacha_service.ArcanaSampler.
     """
     arcana = arcana_name_map.get(arcana_name.lower())
     if not arcana:
@@ -0,0 +1,121 @@
+import math
+import os
+import random
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+# Largest roll accepted at all
+DICE_MAX_COUNT = int(os.getenv("DICE_MAX_COUNT", "1000000"))
+DICE_MAX_SIDES = int(os.getenv("DICE_MAX_SIDES", "1000000"))
+# Rolls up to this many dice show every die
+DICE_DETAIL_LIMIT = int(os.getenv("DICE_DETAIL_LIMIT", "50"))
+# Rolls up to this many dice are summed exactly, larger ones are sampled
+# from the distribution of the sum
+DICE_EXACT_LIMIT = int(os.getenv("DICE_EXACT_LIMIT", "10000"))
+# Dice expressions answered per message
+DICE_MAX_EXPRESSIONS = int(os.getenv("DICE_MAX_EXPRESSIONS", "10"))
+
+# Dice drawn per batch when summing exactly, which bounds memory use
+_EXACT_CHUNK = 1024
+
+
+class DiceLimitError(ValueError):
+    """Raised when a roll is empty or exceeds the configured caps."""
+
+
+class DiceRoll(BaseModel):
+    count: int
+    sides: int
+    total: int
+    mean: float
+    # Individual dice, only for rolls up to DICE_DETAIL_LIMIT
+    rolls: Optional[List[int]] = None
+    # Lowest and highest die, unknown for approximated rolls
+    lowest: Optional[int] = None
+    highest: Optional[int] = None
+    # True when the total was sampled from the sum's distribution
+    approximate: bool = False
+
+
+def validate_roll(count: int, sides: int) -> None:
+    """
+    Raise DiceLimitError if the roll cannot or should not be made.
+    """
+    if count < 1 or sides < 1:
+        raise DiceLimitError("A roll needs at least one die with at least one side")
+    if count > DICE_MAX_COUNT or sides > DICE_MAX_SIDES:
+        raise DiceLimitError(
+            f"Rolls are limited to {DICE_MAX_COUNT} dice of {DICE_MAX_SIDES} sides"
+        )
+
+
+def roll_dice(count: int, sides: int, rng: random.Random = random) -> DiceRoll:
+    """
+    Roll ``count`` dice of ``sides`` sides using constant memory for large rolls.
+
+    - Up to DICE_DETAIL_LIMIT dice every die is kept.
+    - Up to DICE_EXACT_LIMIT dice the sum is computed exactly in batches.
+    - Beyond that the sum is drawn from its normal approximation
+      (mean n(s+1)/2, variance n(s²-1)/12), clamped to [n, n·s].
+    """
+    validate_roll(count, sides)
+
+    if count <= DICE_DETAIL_LIMIT:
+        rolls = [rng.randint(1, sides) for _ in range(count)]
+        total = sum(rolls)
+        return DiceRoll(
+            count=count,
+            sides=sides,
+            total=total,
+            mean=total / count,
+            rolls=rolls,
+            lowest=min(rolls),
+            highest=max(rolls),
+        )
+
+    if count <= DICE_EXACT_LIMIT:
+        faces = range(1, sides + 1)
+        total, lowest, highest = 0, sides, 1
+        remaining = count
+        while remaining:
+            batch = rng.choices(faces, k=min(remaining, _EXACT_CHUNK))
+            total += sum(batch)
+            lowest = min(lowest, min(batch))
+            highest = max(highest, max(batch))
+            remaining -= len(batch)
+        return DiceRoll(
+            count=count,
+            sides=sides,
+            total=total,
+            mean=total / count,
+            lowest=lowest,
+            highest=highest,
+        )
+
+    expected = count * (sides + 1) / 2
+    deviation = math.sqrt(count * (sides**2 - 1) / 12)
+    total = round(rng.gauss(expected, deviation))
+    total = max(count, min(count * sides, total))
+    return DiceRoll(
+        count=count,
+        sides=sides,
+        total=total,
+        mean=total / count,
+        approximate=True,
+    )
+
+
+def format_roll(roll: DiceRoll, modifier: int, notation: str) -> str:
+    """
+    Format a roll as a chat reply. Only small rolls list every die, so the
+    reply stays well within Discord's message length limit.
+    """
+    total = roll.total + modifier
+    if roll.rolls is not None:
+        details = str(roll.rolls)
+    elif roll.approximate:
+        details = f"[≈ média {roll.mean:.2f}]"
+    else:
+        details = f"[média {roll.mean:.2f}, mín. {roll.lowest}, máx. {roll.highest}]"
+    return f"` {total} ` ⟵ {details} {notation}"
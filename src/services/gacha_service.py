@@ -1,4 +1,8 @@
-from models.gacha import GachaConfig
+import random
+from typing import Dict, List, Optional, Sequence
+
+from models.arcana import Arcana, ArcanaSkill, ArcanaTier
+from models.gacha import GachaConfig, GachaResult
 
 
 def config_gacha(config: GachaConfig) -> GachaConfig:
@@ -6,3 +10,126 @@ def config_gacha(config: GachaConfig) -> GachaConfig:
     Configure the Gacha system
     """
     return config
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table over a discrete distribution.
+    Built in O(n) once, then every sample costs O(1) and a single random draw.
+    """
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        total = float(sum(weights))
+        if not weights or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("Weights must be non-negative and sum to more than 0")
+
+        n = len(weights)
+        self.size = n
+        self.probabilities = [w / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [p * n for p in self.probabilities]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Whatever is left is 1.0 up to floating point error
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        """Return the index of one outcome."""
+        u = rng.random() * self.size
+        column = int(u)
+        return column if u - column < self.prob[column] else self.alias[column]
+
+
+class ArcanaSampler:
+    """
+    Per-arcana gacha sampler built from ``create_arcana_data``.
+
+    Tiers an arcana has no skills in are left out and the configured
+    ArcanaTier.probability of the remaining tiers is renormalized, so the
+    effective odds always add up to 1. A skill is then picked uniformly
+    within the drawn tier.
+    """
+
+    def __init__(self, arcana_data: Dict, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng or random.Random()
+        self.arcana_name_map = arcana_data["arcana_name_map"]
+        self._tiers: Dict[int, List[ArcanaTier]] = {}
+        self._skills: Dict[int, List[List[ArcanaSkill]]] = {}
+        self._tables: Dict[int, AliasTable] = {}
+
+        for arcana_id, arcana_config in arcana_data["arcana_skills"].items():
+            skills_by_tier = arcana_config["skills_by_tier"]
+            tiers = [
+                tier
+                for tier in arcana_data["sorted_tiers"]
+                if tier.probability > 0 and skills_by_tier.get(tier.tier_level)
+            ]
+            if not tiers:
+                continue
+            self._tiers[arcana_id] = tiers
+            self._skills[arcana_id] = [skills_by_tier[t.tier_level] for t in tiers]
+            self._tables[arcana_id] = AliasTable([t.probability for t in tiers])
+
+    def _get_arcana(self, arcana_name: str) -> Optional[Arcana]:
+        arcana = self.arcana_name_map.get(arcana_name.lower())
+        if arcana is None or arcana.id not in self._tables:
+            return None
+        return arcana
+
+    def effective_odds(self, arcana_name: str) -> Dict[int, float]:
+        """
+        Return tier_level -> probability actually used for the given arcana.
+        """
+        arcana = self._get_arcana(arcana_name)
+        if arcana is None:
+            return {}
+        probabilities = self._tables[arcana.id].probabilities
+        return {
+            tier.tier_level: probability
+            for tier, probability in zip(self._tiers[arcana.id], probabilities)
+        }
+
+    def pick(self, arcana_name: str) -> Optional[GachaResult]:
+        """
+        Draw one skill from the given arcana, or None if it has no skills.
+        """
+        arcana = self._get_arcana(arcana_name)
+        if arcana is None:
+            return None
+
+        table = self._tables[arcana.id]
+        index = table.sample(self.rng)
+        tier = self._tiers[arcana.id][index]
+        skills = self._skills[arcana.id][index]
+        skill = skills[int(self.rng.random() * len(skills))]
+        return GachaResult(
+            name=skill.name,
+            tier_level=tier.tier_level,
+            tier_name=tier.tier_name,
+            chance=table.probabilities[index],
+            skill_id=skill.id,
+            arcana_name=arcana.name,
+        )
+
+    def pick_many(self, arcana_name: Optional[str], count: int) -> List[GachaResult]:
+        """
+        Draw ``count`` skills at once. Without an arcana name, every pull draws
+        from a random arcana, like a single pull would.
+        """
+        if arcana_name is not None:
+            results = (self.pick(arcana_name) for _ in range(count))
+        else:
+            names = [arcana.name for arcana in self.arcana_name_map.values()]
+            results = (self.pick(self.rng.choice(names)) for _ in range(count))
+        return [result for result in results if result is not None]
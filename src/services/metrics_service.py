@@ -0,0 +1,327 @@
+import asyncio
+import bisect
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.logger import LOG_DIR, BotLogger
+
+# Fraction of commands and listeners that are timed, 0 turns metrics off
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1"))
+# How often the Prometheus text file is rewritten, 0 never writes it
+METRICS_EXPORT_SECONDS = float(os.getenv("METRICS_EXPORT_SECONDS", "60"))
+METRICS_FILE = os.path.join(LOG_DIR, "metrics.prom")
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+
+logger = BotLogger("metrics", write_to_console=False)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating inside the bucket that holds it.
+        Values in the +Inf bucket are reported as the largest bound.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class CommandMetrics:
+    """Histograms of one command or listener."""
+
+    def __init__(self) -> None:
+        self.total = Histogram()
+        self.db = Histogram()
+        self.api = Histogram()
+        self.errors = 0
+
+
+class CommandSummary(NamedTuple):
+    name: str
+    count: int
+    errors: int
+    p50: float
+    p95: float
+    db_mean: float
+    api_mean: float
+
+
+class CommandTiming:
+    """
+    Timing of one command invocation. DB and Discord API time are added by
+    ``run_db`` and the HTTP hooks while this is the current timing.
+    """
+
+    __slots__ = ("name", "started", "db_seconds", "api_seconds", "finished")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.api_seconds = 0.0
+        self.finished = False
+
+
+current_command_timing: contextvars.ContextVar[Optional[CommandTiming]] = (
+    contextvars.ContextVar("current_command_timing", default=None)
+)
+
+
+class MetricsRegistry:
+    """
+    Per-command latency histograms plus gauges read when exporting.
+    """
+
+    def __init__(self, sample_rate: float = METRICS_SAMPLE_RATE) -> None:
+        self.sample_rate = sample_rate
+        self.commands: Dict[str, CommandMetrics] = {}
+        # Gauge name -> (help text, callback returning {labels: value})
+        self.gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, name: str) -> Optional[CommandTiming]:
+        """
+        Start timing a command and make it the current timing.
+        Returns None, and costs nothing else, for commands that are not sampled.
+        """
+        if self.sample_rate <= 0 or (
+            self.sample_rate < 1 and random.random() >= self.sample_rate
+        ):
+            return None
+        timing = CommandTiming(name)
+        current_command_timing.set(timing)
+        return timing
+
+    def finish(self, timing: Optional[CommandTiming], failed: bool = False) -> None:
+        """Record a timing started with ``begin``. Extra calls are ignored."""
+        if timing is None or timing.finished:
+            return
+        timing.finished = True
+        total = time.perf_counter() - timing.started
+        with self._lock:
+            metrics = self.commands.get(timing.name)
+            if metrics is None:
+                metrics = self.commands[timing.name] = CommandMetrics()
+            metrics.total.observe(total)
+            metrics.db.observe(timing.db_seconds)
+            metrics.api.observe(timing.api_seconds)
+            if failed:
+                metrics.errors += 1
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[Optional[CommandTiming]]:
+        """Time a block, such as a listener, as one command invocation."""
+        timing = self.begin(name)
+        token = current_command_timing.set(timing)
+        try:
+            yield timing
+        except BaseException:
+            self.finish(timing, failed=True)
+            raise
+        else:
+            self.finish(timing)
+        finally:
+            current_command_timing.reset(token)
+
+    def register_gauge(
+        self, name: str, help_text: str, callback: Callable[[], Dict[str, float]]
+    ) -> None:
+        """
+        Export ``callback()`` as gauge samples. Its keys are the label sets,
+        e.g. ``'state="checked_out"'``, or "" for an unlabelled value.
+        """
+        self.gauges[name] = (help_text, callback)
+
+    def summary(self) -> List[CommandSummary]:
+        """Summarize every command, most called first."""
+        with self._lock:
+            rows = [
+                CommandSummary(
+                    name,
+                    m.total.count,
+                    m.errors,
+                    m.total.quantile(0.5),
+                    m.total.quantile(0.95),
+                    m.db.mean,
+                    m.api.mean,
+                )
+                for name, m in self.commands.items()
+            ]
+        return sorted(rows, key=lambda row: (-row.count, row.name))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.commands.clear()
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            commands = sorted(self.commands.items())
+            lines: List[str] = []
+            for metric, help_text, attribute in (
+                ("ggm_command_seconds", "Total command latency", "total"),
+                ("ggm_command_db_seconds", "Time spent waiting on the database", "db"),
+                ("ggm_command_api_seconds", "Time spent in Discord API calls", "api"),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, metrics in commands:
+                    histogram: Histogram = getattr(metrics, attribute)
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*histogram.buckets, "+Inf"), histogram.counts
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f'{metric}_bucket{{command="{name}",le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f'{metric}_sum{{command="{name}"}} {histogram.sum}')
+                    lines.append(
+                        f'{metric}_count{{command="{name}"}} {histogram.count}'
+                    )
+
+            lines += [
+                "# HELP ggm_command_errors_total Commands that raised",
+                "# TYPE ggm_command_errors_total counter",
+            ]
+            lines += [
+                f'ggm_command_errors_total{{command="{name}"}} {metrics.errors}'
+                for name, metrics in commands
+            ]
+
+        for metric, (help_text, callback) in sorted(self.gauges.items()):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for labels, value in callback().items():
+                lines.append(
+                    f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str = METRICS_FILE) -> None:
+        """Write the metrics file atomically, so scrapers never read half of it."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            file.write(self.render_prometheus())
+        os.replace(temporary, path)
+
+
+metrics = MetricsRegistry()
+
+
+def add_db_time(seconds: float) -> None:
+    timing = current_command_timing.get()
+    if timing is not None:
+        timing.db_seconds += seconds
+
+
+def _timed_api_call(request):
+    @functools.wraps(request)
+    async def wrapper(*args, **kwargs):
+        timing = current_command_timing.get()
+        if timing is None:
+            return await request(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            timing.api_seconds += time.perf_counter() - started
+
+    wrapper.timed = True
+    return wrapper
+
+
+def instrument_discord_http() -> None:
+    """
+    Time Discord API requests made while a command is being timed. Covers the
+    bot's HTTP client and the webhook adapter used for interaction responses.
+    """
+    from discord.http import HTTPClient
+    from discord.webhook.async_ import AsyncWebhookAdapter
+
+    for cls in (HTTPClient, AsyncWebhookAdapter):
+        if not getattr(cls.request, "timed", False):
+            cls.request = _timed_api_call(cls.request)
+
+
+class MetricsExporter:
+    """
+    Periodically writes the metrics registry to a Prometheus text file.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = metrics,
+        path: str = METRICS_FILE,
+        interval: float = METRICS_EXPORT_SECONDS,
+    ) -> None:
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def export(self) -> None:
+        await asyncio.to_thread(self.registry.write_prometheus, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.export()
+            except Exception as e:
+                logger.error(f"Failed to write metrics: {e}")
+
+    def start(self) -> None:
+        if self.interval > 0 and self.registry.sample_rate > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.export()
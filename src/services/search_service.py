@@ -0,0 +1,287 @@
+import asyncio
+import bisect
+import heapq
+import os
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from config.database import run_db
+from models.game_data import GameDataSnapshot
+from repositories.character_repository import CharacterDirectory
+from utils.cache import LRUCache
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+# How long the character index is trusted before checking the table again
+SEARCH_CHARACTERS_CHECK_SECONDS = float(
+    os.getenv("SEARCH_CHARACTERS_CHECK_SECONDS", "5")
+)
+# Discord shows at most 25 autocomplete choices
+SEARCH_LIMIT = 25
+
+# Ranks, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, strip accents and collapse whitespace, so that "Poção" and
+    "pocao" compare equal.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of a normalized string, padded so short words still match."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchResult(NamedTuple):
+    id: int
+    name: str
+
+
+class _IndexState(NamedTuple):
+    """Everything built from one set of entries. Replaced as a whole."""
+
+    names: Tuple[str, ...]
+    ids: Tuple[int, ...]
+    normalized: Tuple[str, ...]
+    # Entry positions ordered by name, used for empty queries and tie breaks
+    by_name: Tuple[int, ...]
+    # Sorted (word, position) pairs, for prefix lookups with bisect
+    words: Tuple[Tuple[str, int], ...]
+    # Trigram -> entry positions containing it
+    postings: Dict[str, Tuple[int, ...]]
+
+
+class SearchIndex:
+    """
+    In-memory name index for autocomplete.
+
+    Matches are ranked exact > prefix > word prefix > substring > fuzzy
+    (trigram overlap), then by name length and alphabetically. Queries of
+    one or two characters only use the prefix lookups. Results are kept in a
+    bounded LRU cache that is dropped whenever the index is rebuilt.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[int, str]] = (),
+        cache_size: int = SEARCH_CACHE_SIZE,
+    ) -> None:
+        self.results: LRUCache[Tuple[str, int], List[SearchResult]] = LRUCache(
+            cache_size
+        )
+        self._state = self._build(entries)
+
+    def __len__(self) -> int:
+        return len(self._state.ids)
+
+    @staticmethod
+    def _build(entries: Iterable[Tuple[int, str]]) -> _IndexState:
+        ids, names = [], []
+        for entry_id, name in entries:
+            ids.append(entry_id)
+            names.append(name)
+        normalized = [normalize(name) for name in names]
+
+        words = []
+        postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(normalized):
+            words.extend((word, position) for word in set(text.split()))
+            for gram in trigrams(text):
+                postings.setdefault(gram, []).append(position)
+        words.sort()
+
+        return _IndexState(
+            names=tuple(names),
+            ids=tuple(ids),
+            normalized=tuple(normalized),
+            by_name=tuple(
+                sorted(range(len(names)), key=lambda i: (normalized[i], ids[i]))
+            ),
+            words=tuple(words),
+            postings={gram: tuple(found) for gram, found in postings.items()},
+        )
+
+    def rebuild(self, entries: Iterable[Tuple[int, str]]) -> None:
+        """Replace the indexed entries and drop the cached results."""
+        self._state = self._build(entries)
+        self.results.clear()
+
+    def upsert(self, entries: Iterable[Tuple[int, str]]) -> None:
+        """Add or rename entries, rebuilding only if a name changed."""
+        state = self._state
+        names = dict(zip(state.ids, state.names))
+        changed = {
+            entry_id: name for entry_id, name in entries if names.get(entry_id) != name
+        }
+        if changed:
+            names.update(changed)
+            self.rebuild(names.items())
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[SearchResult]:
+        """
+        Return up to ``limit`` entries matching ``query``, best matches first.
+        """
+        text = normalize(query)
+        key = (text, limit)
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached
+
+        state = self._state
+        if not text:
+            positions = state.by_name[:limit]
+        else:
+            ranks = self._rank(state, text, limit)
+            positions = heapq.nsmallest(
+                limit,
+                ranks,
+                key=lambda i: (ranks[i], len(state.normalized[i]), state.normalized[i]),
+            )
+
+        results = [SearchResult(state.ids[i], state.names[i]) for i in positions]
+        self.results.put(key, results)
+        return results
+
+    @staticmethod
+    def _rank(state: _IndexState, text: str, limit: int) -> Dict[int, float]:
+        """
+        Rank candidate positions. A weaker rank is only looked for while the
+        stronger ones have found fewer than ``limit`` entries.
+        """
+        ranks: Dict[int, float] = {}
+
+        # Prefixes of any word, which includes prefixes of the whole name
+        start = bisect.bisect_left(state.words, (text,))
+        for word, position in state.words[start:]:
+            if not word.startswith(text):
+                break
+            name = state.normalized[position]
+            if name == text:
+                ranks[position] = EXACT
+            elif name.startswith(text):
+                ranks[position] = PREFIX
+            else:
+                ranks[position] = WORD_PREFIX
+
+        if len(text) < 3 or len(ranks) >= limit:
+            return ranks
+
+        # Substrings contain every trigram of the query itself, so intersect
+        # those postings starting from the rarest
+        inner = sorted(
+            (state.postings.get(text[i : i + 3], ()) for i in range(len(text) - 2)),
+            key=len,
+        )
+        candidates = set(inner[0])
+        for postings in inner[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(postings)
+        for position in candidates:
+            name = state.normalized[position]
+            if position in ranks or text not in name:
+                continue
+            # Multi-word queries never match a single word's prefix above
+            if name == text:
+                ranks[position] = EXACT
+            elif name.startswith(text):
+                ranks[position] = PREFIX
+            else:
+                ranks[position] = SUBSTRING
+
+        if len(ranks) >= limit:
+            return ranks
+
+        # Typos: anything sharing at least half the trigrams, closest first
+        grams = trigrams(text)
+        counts = Counter()
+        for gram in grams:
+            counts.update(state.postings.get(gram, ()))
+        for position, shared in counts.items():
+            if position not in ranks and shared * 2 >= len(grams):
+                ranks[position] = FUZZY + 1 - shared / len(grams)
+        return ranks
+
+
+class GameDataSearch:
+    """
+    Search indexes over the game data. The skill index is rebuilt on every
+    published snapshot that replaced the skills. Characters are not part of
+    the game data: their index is streamed from the database when the
+    table's name signature changed, checked at most every ``check_seconds``.
+    Characters updated by the bot are checked right away, by reading back
+    only their names.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = SEARCH_CACHE_SIZE,
+        check_seconds: float = SEARCH_CHARACTERS_CHECK_SECONDS,
+    ) -> None:
+        self.characters = SearchIndex(cache_size=cache_size)
+        self.skills = SearchIndex(cache_size=cache_size)
+        self.check_seconds = check_seconds
+        self._sources: Dict[str, tuple] = {}
+        self._characters_signature: Optional[tuple] = None
+        self._characters_checked = 0.0
+        self._characters_lock = asyncio.Lock()
+        # Characters updated by the bot whose name may have changed
+        self._updated_characters: Set[int] = set()
+
+    def _changed(self, name: str, rows: tuple) -> bool:
+        # Snapshots share the tuples of tables that were not reloaded
+        if self._sources.get(name) is rows:
+            return False
+        self._sources[name] = rows
+        return True
+
+    def on_game_data(self, snapshot: GameDataSnapshot) -> None:
+        if self._changed("arcana_skills", snapshot.arcana_skills):
+            self.skills.rebuild((s.id, s.name) for s in snapshot.arcana_skills)
+
+    def invalidate_characters(self, character_id: Optional[int] = None) -> None:
+        """
+        Check the character table, and the name of ``character_id``, again
+        before the next search.
+        """
+        if character_id is not None:
+            self._updated_characters.add(character_id)
+        self._characters_checked = 0.0
+
+    def _refresh_characters(self) -> None:
+        """Bring the character index up to date with the table (blocking)."""
+        # Popped one at a time, database threads add to it concurrently
+        updated = set()
+        while self._updated_characters:
+            updated.add(self._updated_characters.pop())
+
+        directory = CharacterDirectory()
+        signature = directory.signature()
+        if signature != self._characters_signature:
+            self.characters.rebuild(directory.names())
+            self._characters_signature = signature
+        elif updated:
+            self.characters.upsert(directory.names_of(updated))
+
+    async def search_characters(
+        self, query: str, limit: int = SEARCH_LIMIT
+    ) -> List[SearchResult]:
+        """Search character names, reindexing them first if the table changed."""
+        async with self._characters_lock:
+            now = time.monotonic()
+            if (
+                self._characters_signature is None
+                or now - self._characters_checked >= self.check_seconds
+            ):
+                # Set first, so an invalidation during the refresh is kept
+                self._characters_checked = now
+                await run_db(self._refresh_characters)
+        return self.characters.search(query, limit)
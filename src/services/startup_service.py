@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from discord import abc, app_commands
+
+from utils.logger import LOG_DIR
+
+# Hash of the last command tree synced with Discord, kept across restarts
+COMMAND_TREE_HASH_FILE = os.getenv(
+    "COMMAND_TREE_HASH_FILE", os.path.join(LOG_DIR, "command_tree.sha256")
+)
+
+
+class StartupTimer:
+    """
+    Wall-clock duration of each startup phase. Phases may overlap when they
+    run concurrently, so their sum can exceed the total.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def __str__(self) -> str:
+        phases = ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items()
+        )
+        return f"{phases} (total {self.total * 1000:.0f}ms)"
+
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: abc.Snowflake) -> str:
+    """
+    Hash the payload ``tree.sync(guild=guild)`` would send to Discord.
+    Commands are sorted, since extensions load concurrently and may register
+    them in any order.
+    """
+    commands = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command["type"], command["name"]),
+    )
+    payload = {"guild": guild.id, "commands": commands}
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def read_command_tree_hash(path: str = COMMAND_TREE_HASH_FILE) -> Optional[str]:
+    try:
+        with open(path) as file:
+            return file.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_command_tree_hash(digest: str, path: str = COMMAND_TREE_HASH_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(digest)
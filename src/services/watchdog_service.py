@@ -0,0 +1,154 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional
+
+from services.metrics_service import MetricsRegistry, current_command_timing, metrics
+from utils.logger import BotLogger
+
+# How often the event loop is pinged, 0 turns the watchdog off
+LOOP_WATCHDOG_INTERVAL_MS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "100"))
+# A callback holding the loop longer than this gets its stack logged
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "500"))
+# Lag samples kept for the percentiles, 10 minutes at the default interval
+LOOP_LAG_WINDOW = 6000
+
+logger = BotLogger("watchdog", write_to_console=False)
+
+
+class LagSummary(NamedTuple):
+    p50: float
+    p99: float
+    max: float
+    blocks: int
+
+
+class LoopWatchdog:
+    """
+    Measures event-loop lag and reports callbacks that block the loop.
+
+    A task on the loop sleeps for ``interval`` and records how late it wakes
+    up. A helper thread checks how overdue that wake-up is; once it is
+    overdue by more than ``threshold``, the loop thread is stuck in a
+    callback, so the helper logs the loop thread's stack and the command
+    being run while the callback is still on it. Each block is reported once.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = metrics,
+        interval_ms: float = LOOP_WATCHDOG_INTERVAL_MS,
+        threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS,
+        window: int = LOOP_LAG_WINDOW,
+    ) -> None:
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.lags: Deque[float] = deque(maxlen=window)
+        self.blocks = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        # When the heartbeat should next wake up, and the last one reported late
+        self._deadline = 0.0
+        self._reported_deadline = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        registry.register_gauge(
+            "ggm_event_loop_lag_seconds",
+            "Event loop lag over the recent window",
+            self.gauge_samples,
+        )
+
+    def summary(self) -> LagSummary:
+        lags = sorted(self.lags)
+        if not lags:
+            return LagSummary(0.0, 0.0, 0.0, self.blocks)
+        return LagSummary(
+            lags[(len(lags) - 1) // 2],
+            lags[int((len(lags) - 1) * 0.99)],
+            lags[-1],
+            self.blocks,
+        )
+
+    def gauge_samples(self) -> Dict[str, float]:
+        summary = self.summary()
+        return {
+            'quantile="0.5"': summary.p50,
+            'quantile="0.99"': summary.p99,
+            'quantile="1"': summary.max,
+            'stat="blocks"': summary.blocks,
+        }
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - self._deadline, 0.0)
+            self.lags.append(lag)
+            if lag >= self.threshold:
+                self.blocks += 1
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+
+    def _watch(self) -> None:
+        # Checking several times per threshold catches blocks while they last
+        while not self._stopping.wait(self.threshold / 4):
+            deadline = self._deadline
+            overdue = time.monotonic() - deadline
+            if overdue >= self.threshold and deadline != self._reported_deadline:
+                self._reported_deadline = deadline
+                self.report_block(overdue)
+
+    def running_command(self) -> str:
+        """
+        Name of the command whose task is running on the loop. Read from the
+        task's context on Python 3.12+, otherwise the task name is used.
+        """
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return "no task"
+        get_context = getattr(task, "get_context", None)
+        if get_context is not None:
+            timing = get_context().get(current_command_timing)
+            if timing is not None:
+                return timing.name
+        return task.get_name()
+
+    def report_block(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(
+            f"Event loop blocked for {overdue * 1000:.0f}ms so far "
+            f"in {self.running_command()}:\n{stack}"
+        )
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.interval
+        self._stopping.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+# The test suite runs against a throwaway SQLite database. These variables must
+# be set before config.database is imported, since the engine is created at
+# import time.
+TEST_DIR = tempfile.mkdtemp(prefix="ggm-tests-")
+os.environ.setdefault("LOG_DIR", TEST_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DIR}/ggm-test.db")
+
+import pytest  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from config.database import engine  # noqa: E402
+from models.character import Character  # noqa: E402
+from models.mana import ManaNature  # noqa: E402
+from models.race import Race  # noqa: E402
+from models.region import Region  # noqa: E402
+from models.user import User  # noqa: E402
+from repositories.character_repository import (  # noqa: E402
+    character_cache,
+    skill_owner_index,
+)
+
+
+@pytest.fixture
+def db():
+    """
+    Create every table before the test and empty them afterwards.
+    """
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    character_cache.clear()
+    skill_owner_index.clear()
+    with Session(engine) as session:
+        for table in SQLModel.metadata.tables.values():
+            session.execute(table.delete())
+        session.commit()
+
+
+@pytest.fixture
+def make_character(db):
+    """
+    Factory that stores a user with a fully related character and returns the character.
+    """
+
+    def factory(discord_id: int = 1, **overrides) -> Character:
+        with Session(engine) as session:
+            race = Race(
+                name="Humano",
+                base_hp=10,
+                hp_per_level=2,
+                base_mp=5,
+                mp_per_level=1,
+                base_resistance=1,
+                base_strength=1,
+                strength_per_level=1,
+                base_speed=2,
+                speed_per_level=1,
+                description="Humanos comuns.",
+            )
+            region = Region(name="Jardim", icon_url="https://example.com/icon.png")
+            mana = ManaNature(name="Neutra", description="Balanceada", color="808080")
+            user = User(discord_id=str(discord_id), player_name=f"player{discord_id}")
+            session.add_all([race, region, mana, user])
+            session.flush()
+
+            fields = {
+                "name": f"Personagem {discord_id}",
+                "age": 20,
+                "user_id": user.id,
+                "race_id": race.id,
+                "region_id": region.id,
+                "mana_nature_id": mana.id,
+            }
+            fields.update(overrides)
+            character = Character(**fields)
+            session.add(character)
+            session.commit()
+            session.refresh(character)
+            return character
+
+    return factory
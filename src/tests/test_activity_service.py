@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from config.database import engine
+from models.user import User
+from services.activity_service import ActivityTracker
+
+
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+
+
+def get_user(discord_id: str) -> User:
+    with Session(engine) as session:
+        return session.exec(select(User).where(User.discord_id == discord_id)).one()
+
+
+def test_touch_only_hits_the_database_for_new_users(db):
+    """
+    Test that repeated activity is kept in memory after the first lookup.
+    """
+    tracker = ActivityTracker()
+    statements, stop = count_statements()
+    try:
+
+        async def main():
+            first = await tracker.touch(10, "Ana")
+            queries_after_first = len(statements)
+            for _ in range(5):
+                assert await tracker.touch(10, "Ana") == first
+            return queries_after_first
+
+        queries_after_first = asyncio.run(main())
+    finally:
+        stop()
+
+    assert queries_after_first > 0
+    assert len(statements) == queries_after_first
+    assert tracker.pending_count == 1
+    assert get_user("10").player_name == "Ana"
+
+
+def test_flush_writes_all_users_in_one_statement(db):
+    """
+    Test that pending activity is written in a single batched UPDATE.
+    """
+    tracker = ActivityTracker()
+
+    async def main():
+        await asyncio.gather(*(tracker.touch(i, f"p{i}") for i in range(20)))
+
+    asyncio.run(main())
+    before = get_user("3").last_active
+
+    statements, stop = count_statements()
+    try:
+        written = tracker.flush_pending()
+    finally:
+        stop()
+
+    assert written == 20
+    assert sum(s.lstrip().upper().startswith("UPDATE") for s in statements) == 1
+    assert tracker.pending_count == 0
+    assert get_user("3").last_active >= before
+
+
+def test_stop_flushes_pending_activity(db):
+    """
+    Test that shutting the tracker down writes what is still in memory.
+    """
+    tracker = ActivityTracker(flush_interval=3600)
+    stale = datetime.utcnow() - timedelta(days=1)
+    with Session(engine) as session:
+        session.add(User(discord_id="7", player_name="Bia", last_active=stale))
+        session.commit()
+
+    async def main():
+        tracker.start()
+        await tracker.touch(7)
+        await tracker.stop()
+
+    asyncio.run(main())
+    assert get_user("7").last_active > stale
+    assert tracker.pending_count == 0
+
+
+def test_user_id_cache_is_bounded(db):
+    """
+    Test that only the most recently seen users keep their id in memory,
+    and that an evicted user is resolved again to the same id.
+    """
+    tracker = ActivityTracker(user_cache_size=2)
+
+    async def main():
+        first = await tracker.touch(1, "Ana")
+        await tracker.touch(2, "Bia")
+        await tracker.touch(3, "Caio")
+        assert len(tracker._user_ids) == 2
+        assert "1" not in tracker._user_ids
+        assert await tracker.touch(1, "Ana") == first
+
+    asyncio.run(main())
+    assert tracker.pending_count == 3
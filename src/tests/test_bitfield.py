@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+import services.arcana_service as ab
+from utils.bitfield import (
+    decode_bitfields,
+    iter_set_bits,
+    popcount,
+    popcount_many,
+    set_bits,
+)
+
+
+def test_set_bits_match_a_full_scan():
+    """
+    Test set-bit iteration against testing every position.
+    """
+    rng = random.Random(12)
+    for _ in range(200):
+        bitfield = rng.getrandbits(rng.randint(0, 63))
+        expected = [i for i in range(64) if bitfield & (1 << i)]
+        assert set_bits(bitfield) == expected
+        assert popcount(bitfield) == len(expected)
+    assert list(iter_set_bits(0)) == []
+
+
+def test_negative_bitfields_are_rejected():
+    """
+    Test that negative values, which have infinitely many set bits, raise.
+    """
+    with pytest.raises(ValueError):
+        set_bits(-1)
+    with pytest.raises(ValueError):
+        popcount(-1)
+
+
+def test_decode_bitfields_matrix():
+    """
+    Test the batch decoder against the scalar one, row by row.
+    """
+    rng = random.Random(7)
+    bitfields = [0, 1, 1 << 53, (1 << 63) | 5] + [
+        rng.getrandbits(54) for _ in range(500)
+    ]
+
+    matrix = decode_bitfields(bitfields)
+
+    assert matrix.shape == (len(bitfields), 64)
+    assert matrix.dtype == np.bool_
+    for row, bitfield in zip(matrix, bitfields):
+        assert np.flatnonzero(row).tolist() == set_bits(bitfield)
+    assert popcount_many(bitfields).tolist() == [popcount(b) for b in bitfields]
+    assert decode_bitfields([]).shape == (0, 64)
+
+
+def test_decode_arcana_skills_width():
+    """
+    Test that the skill matrix has one column per arcana skill.
+    """
+    bitfield = ab.ArcanaSkillEnum.PROJECTILE | ab.ArcanaSkillEnum.PORTAL
+
+    matrix = ab.decode_arcana_skills([bitfield, 0])
+
+    assert matrix.shape == (2, ab.ARCANA_SKILL_COUNT)
+    assert np.flatnonzero(matrix[0]).tolist() == ab.get_arcana_skill_ids(bitfield)
+    assert ab.count_arcana_skills(bitfield) == 2
+    assert not matrix[1].any()
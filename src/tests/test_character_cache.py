@@ -0,0 +1,238 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from config.database import QueryStats, current_query_stats, engine
+from models.character import Character
+from models.user import User
+from repositories.character_repository import (
+    CharacterCache,
+    add_arcana_skills,
+    character_cache,
+    get_character_attributes_by_discord_id,
+    get_character_by_discord_id,
+    get_character_by_id,
+    update_character,
+)
+from utils.cache import LRUCache
+
+
+def count_queries(func, *args):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        return func(*args), stats.count
+    finally:
+        current_query_stats.reset(token)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Test the bounded size and the hit/miss counters.
+    """
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_character_cache_keys():
+    """
+    Test that a character is reachable by id and by discord id.
+    """
+    cache = CharacterCache(maxsize=1)
+    first = Character(id=1, name="A", age=1, user_id=1)
+    second = Character(id=2, name="B", age=1, user_id=2)
+    cache.put(first, discord_id="10")
+    assert cache.get_by_discord_id(10).name == "A"
+    assert cache.get(1).name == "A"
+
+    cache.put(second, discord_id="20")
+    assert cache.get_by_discord_id("10") is None
+    assert cache.get(2).name == "B"
+
+
+def test_cached_characters_are_copies():
+    """
+    Test that changes to a character read from the cache are not seen by
+    other readers until they are written back.
+    """
+    cache = CharacterCache()
+    original = Character(id=1, name="A", age=1, user_id=1, current_hp=5)
+    cache.put(original, discord_id="10")
+
+    character = cache.get_by_discord_id("10")
+    character.current_hp = 1
+    original.current_hp = 2
+
+    assert character is not original
+    assert cache.get(1).current_hp == 5
+
+
+def test_active_character_reads_are_cached(make_character):
+    """
+    Test that repeated reads of a character cost no database round trips.
+    """
+    created = make_character(discord_id=3, name="Nix")
+
+    character, first_queries = count_queries(get_character_by_discord_id, 3)
+    again, second_queries = count_queries(get_character_by_discord_id, 3)
+    by_id, third_queries = count_queries(get_character_by_id, created.id)
+
+    assert character.race.name == "Humano"
+    assert (first_queries, second_queries, third_queries) == (1, 0, 0)
+    assert again.id == character.id == by_id.id
+    assert character_cache.hits == 2
+
+
+def test_update_character_writes_through(make_character):
+    """
+    Test that updates reach both the database and the cached character.
+    """
+    created = make_character(discord_id=4, current_hp=0)
+    character = get_character_by_discord_id(4)
+    character.current_hp = 12
+
+    update_character(character)
+
+    assert get_character_by_discord_id(4).current_hp == 12
+    with Session(engine) as session:
+        assert session.get(Character, created.id).current_hp == 12
+
+
+def test_update_keeps_arcana_skills_granted_meanwhile(make_character):
+    """
+    Test that a full update from an instance read before a skill grant does
+    not take the granted skill away.
+    """
+    created = make_character(discord_id=5, arcana_skills=0b1)
+    character = get_character_by_discord_id(5)
+    add_arcana_skills(created.id, 0b100)
+    character.current_hp = 3
+
+    update_character(character)
+
+    assert get_character_by_discord_id(5).arcana_skills == 0b101
+    with Session(engine) as session:
+        assert session.get(Character, created.id).arcana_skills == 0b101
+
+
+def test_failed_update_leaves_the_cache_untouched(make_character):
+    """
+    Test that changes which failed to commit never reach other readers.
+    """
+    make_character(discord_id=9, current_hp=7)
+    character = get_character_by_discord_id(9)
+    character.current_hp = 1
+    character.name = None
+
+    with pytest.raises(IntegrityError):
+        update_character(character)
+
+    assert get_character_by_discord_id(9).current_hp == 7
+
+
+def test_new_owner_is_resolved_after_a_transfer(make_character):
+    """
+    Test that a character given to another user stops resolving, from the
+    cache, to its previous owner.
+    """
+    created = make_character(discord_id=14)
+    receiver = make_character(discord_id=15)
+    character = get_character_by_discord_id(14)
+    assert get_character_attributes_by_discord_id(14).character_id == created.id
+
+    character.user_id = receiver.user_id
+    update_character(character)
+
+    assert get_character_attributes_by_discord_id(14) is None
+    assert get_character_by_discord_id(14) is None
+
+
+def test_update_from_another_instance_invalidates(make_character):
+    """
+    Test that an update made through a different instance drops the stale entry.
+    """
+    created = make_character(discord_id=6, level=1)
+    cached = get_character_by_discord_id(6)
+
+    with Session(engine) as session:
+        other = session.get(Character, created.id)
+        session.expunge(other)
+    other.level = 2
+    update_character(other)
+
+    fresh = get_character_by_id(created.id)
+    assert fresh is not cached
+    assert fresh.level == 2
+
+
+def test_attribute_reads_are_cached(make_character):
+    """
+    Test that attribute lookups for dice rolls cost no queries once cached.
+    """
+    make_character(discord_id=7, strength=3, mana=5)
+
+    attributes, first_queries = count_queries(get_character_attributes_by_discord_id, 7)
+    again, second_queries = count_queries(get_character_attributes_by_discord_id, 7)
+
+    assert (attributes.strength, attributes.mana) == (3, 5)
+    assert (first_queries, second_queries) == (1, 0)
+    assert again is attributes
+    assert get_character_attributes_by_discord_id(8) is None
+
+
+def test_update_character_refreshes_attributes(make_character):
+    """
+    Test that attribute snapshots follow character updates.
+    """
+    created = make_character(discord_id=9, dexterity=1)
+    get_character_attributes_by_discord_id(9)
+
+    with Session(engine) as session:
+        character = session.get(Character, created.id)
+        session.expunge(character)
+    character.dexterity = 4
+    update_character(character)
+
+    attributes, queries = count_queries(get_character_attributes_by_discord_id, 9)
+    assert (attributes.dexterity, queries) == (4, 0)
+
+
+def test_users_without_a_character_are_cached(make_character):
+    """
+    Test that a user without a character is looked up once, until a
+    character is created for them.
+    """
+    owner = make_character(discord_id=16)
+
+    first, first_queries = count_queries(get_character_attributes_by_discord_id, 17)
+    again, second_queries = count_queries(get_character_attributes_by_discord_id, 17)
+    assert (first, again) == (None, None)
+    assert (first_queries, second_queries) == (1, 0)
+
+    with Session(engine) as session:
+        user = User(discord_id="17", player_name="player17")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+    created = update_character(
+        Character(name="Nova", age=20, user_id=user.id, race_id=owner.race_id)
+    )
+
+    assert get_character_attributes_by_discord_id(17).character_id == created.id
+
+
+def test_missing_characters_expire():
+    """
+    Test that the absence of a character is only trusted for missing_ttl.
+    """
+    cache = CharacterCache(missing_ttl=0)
+    cache.put_missing("18")
+    assert not cache.is_missing("18")
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+from sqlmodel import Session
+
+import services.character_service as cs
+from config.database import QueryStats, current_query_stats, engine
+from models.character import Character
+from models.race import Race
+from repositories.character_repository import (
+    get_character_by_id,
+    get_character_stat_columns,
+    set_current_points,
+)
+
+SCALAR_STATS = {
+    "max_hp": cs.calculate_character_max_hp,
+    "max_mp": cs.calculate_character_max_mp,
+    "ad_modifier": cs.calculate_character_ad_modifier,
+    "ap_modifier": cs.calculate_character_ap_modifier,
+    "damage_reduction": cs.calculate_character_damage_reduction,
+    "actions_per_turn": cs.calculate_character_actions_per_turn,
+    "xp_to_next_level": cs.calculate_character_xp_to_next_level,
+    "remaining_points": cs.calculate_character_remaining_points,
+}
+
+
+def random_character(rng: random.Random) -> Character:
+    """
+    A character with random attributes, zeros included, and a random race.
+    """
+    race = Race(
+        name="Aleatória",
+        description="",
+        base_resistance=0,
+        base_strength=0,
+        strength_per_level=0,
+        **{
+            name: rng.choice([0.0, rng.uniform(0, 50), float(rng.randint(0, 50))])
+            for name in cs.STAT_RACE_COLUMNS
+        },
+    )
+    attributes = {
+        name: rng.choice([0, rng.randint(0, 30)]) for name in cs.STAT_CHARACTER_COLUMNS
+    }
+    attributes["level"] = rng.randint(0, 12)
+    return Character(name="X", age=1, user_id=1, **attributes, race=race)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_stats_match_scalar_functions(seed):
+    """
+    Test that every batch stat equals the scalar function, bit for bit.
+    """
+    rng = random.Random(seed)
+    characters = [random_character(rng) for _ in range(300)]
+
+    stats = cs.calculate_character_stats(cs.get_stat_columns(characters))
+
+    for name, scalar in SCALAR_STATS.items():
+        expected = [scalar(character) for character in characters]
+        assert getattr(stats, name).tolist() == expected, name
+
+
+def test_stat_columns_query(make_character):
+    """
+    Test that the one-query columns give the same stats as loaded characters.
+    """
+    for i in range(1, 4):
+        make_character(discord_id=i, level=i, vitality=i, mana=2 * i, dexterity=i)
+
+    columns = get_character_stat_columns(
+        cs.STAT_CHARACTER_COLUMNS, cs.STAT_RACE_COLUMNS
+    )
+    characters = [get_character_by_id(character_id) for character_id in columns["id"]]
+    stats = cs.calculate_character_stats(columns)
+
+    assert len(characters) == 3
+    for name, scalar in SCALAR_STATS.items():
+        expected = [scalar(character) for character in characters]
+        assert getattr(stats, name).tolist() == expected, name
+
+
+def test_restored_points_match_scalar_restore():
+    """
+    Test that batch restoring matches restoring one character at a time.
+    """
+    rng = random.Random(99)
+    characters = [random_character(rng) for _ in range(50)]
+    columns = cs.get_stat_columns(characters)
+    columns["id"] = list(range(50))
+
+    points = cs.calculate_restored_points(columns)
+
+    for character_id, character in enumerate(characters):
+        cs.restore_character(character)
+        assert points[character_id] == (character.current_hp, character.current_mp)
+
+
+def test_set_current_points_of_some_players(make_character):
+    """
+    Test restoring the characters of a few players in one query, through
+    the database and the character cache.
+    """
+    first = make_character(discord_id=1, level=2, vitality=3, mana=4)
+    make_character(discord_id=2, level=3, vitality=1)
+    untouched = make_character(discord_id=3)
+    get_character_by_id(first.id)
+
+    columns = get_character_stat_columns(
+        cs.STAT_CHARACTER_COLUMNS, cs.STAT_RACE_COLUMNS, discord_ids=[1, 2]
+    )
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        updated = set_current_points(cs.calculate_restored_points(columns))
+    finally:
+        current_query_stats.reset(token)
+
+    assert (updated, stats.count) == (2, 1)
+    for character_id in columns["id"]:
+        with Session(engine) as session:
+            expected = cs.restore_character(session.get(Character, character_id))
+            points = (expected.current_hp, expected.current_mp)
+        character = get_character_by_id(character_id)
+        assert (character.current_hp, character.current_mp) == points
+        assert points != (0, 0)
+    assert get_character_by_id(untouched.id).current_hp == 0
@@ -0,0 +1,128 @@
+import asyncio
+
+import discord
+
+from models.arcana import Arcana, ArcanaSkill, ArcanaTier
+from models.character import Character
+from models.mana import ManaNature
+from models.race import Race
+from views.character import SKILLS_PER_PAGE, CharacterView
+
+
+def build_skills():
+    """
+    Two arcanas, two tiers and 30 skills with ids 1..30.
+    """
+    arcanas = [Arcana(id=1, name="Cura", icon_url=""), Arcana(id=2, name="Fogo")]
+    tiers = [
+        ArcanaTier(id=1, tier_name="Comum", tier_level=1, probability=1, color="1"),
+        ArcanaTier(id=2, tier_name="Raro", tier_level=2, probability=1, color="2"),
+    ]
+    return {
+        skill_id: ArcanaSkill(
+            id=skill_id,
+            name=f"Skill {skill_id:02d}",
+            description="",
+            arcana=arcanas[skill_id % 2],
+            tier=tiers[skill_id % 3 == 0],
+        )
+        for skill_id in range(1, 31)
+    }
+
+
+def build_view(arcana_skills: int, skills_by_id):
+    character = Character(
+        id=None,
+        name="Nix",
+        age=1,
+        user_id=1,
+        arcana_skills=arcana_skills,
+        mana_nature=ManaNature(name="Neutra", description="", color="808080"),
+    )
+
+    async def create():
+        return CharacterView(character, skills_by_id, discord.Object(id=1))
+
+    return asyncio.run(create())
+
+
+def test_skill_bits_map_to_skill_ids():
+    """
+    Test that bit i is the skill with id i + 1, grouped by arcana and tier.
+    """
+    # Skills 1, 3 and 4
+    view = build_view(0b1101, build_skills())
+
+    embed = view.skills_embed()
+
+    assert [(field.name, field.value) for field in embed.fields] == [
+        ("Cura · Comum", "**Skill 04**"),
+        ("Fogo · Raro", "**Skill 03**"),
+        ("Fogo · Comum", "**Skill 01**"),
+    ]
+    assert view.get_embeds_for_option("arcana_skills") == [embed]
+
+
+def test_skill_pages_are_built_once():
+    """
+    Test paging through every skill without rebuilding the page list.
+    """
+    view = build_view((1 << 30) - 1, build_skills())
+    pages = view.skill_pages
+
+    seen = []
+    for page in (1, 2, 3, 2, 1):
+        embed, total_pages = asyncio.run(view.get_skills_page(page))
+        seen.append(sum(field.value.count("**") // 2 for field in embed.fields))
+
+    assert view.skill_pages is pages
+    assert total_pages == 3
+    assert seen == [SKILLS_PER_PAGE] * 5
+    assert sum(len(names) for page in pages for _, names in page) == 30
+
+
+def test_empty_skills_tab():
+    """
+    Test the single placeholder page of a character without skills.
+    """
+    view = build_view(0, build_skills())
+
+    embed, total_pages = asyncio.run(view.get_skills_page(1))
+
+    assert total_pages == 1
+    assert "Nenhuma habilidade" in embed.description
+
+
+def test_seeded_character_renders():
+    """
+    Test that a "#"-prefixed mana color and a missing region, as the seeder
+    writes them, still render every page.
+    """
+    character = Character(
+        id=None,
+        name="Nix",
+        age=1,
+        user_id=1,
+        race=Race(
+            name="Humano",
+            base_hp=10,
+            hp_per_level=2,
+            base_mp=5,
+            mp_per_level=1,
+            base_resistance=1,
+            base_strength=1,
+            strength_per_level=1,
+            base_speed=2,
+            speed_per_level=1,
+            description="",
+        ),
+        mana_nature=ManaNature(name="Água", description="", color="#0077FF"),
+    )
+
+    async def create():
+        return CharacterView(character, {}, discord.Object(id=1))
+
+    view = asyncio.run(create())
+
+    for option in ("info", "attributes", "story", "arcana_skills"):
+        assert view.get_embeds_for_option(option)[0].color.value == 0x0077FF
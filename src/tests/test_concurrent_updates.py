@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session, select
+
+from config.database import engine
+from models.character import Character
+from models.user import User
+from repositories.character_repository import (
+    add_arcana_skills,
+    get_character_by_id,
+    remove_arcana_skills,
+)
+from repositories.gacha_repository import apply_gacha_pulls
+from repositories.user_repository import increment_gacha_count
+
+THREADS = 8
+
+
+def hammer(func, calls):
+    """
+    Run every call from a pool of threads at the same time.
+    """
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(func, *args) for args in calls]
+        return [future.result() for future in futures]
+
+
+def load_state(discord_id: str, character_id: int):
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.discord_id == discord_id)).one()
+        return user.gacha_count, session.get(Character, character_id).arcana_skills
+
+
+def test_increment_gacha_count_never_loses_updates(make_character):
+    """
+    Test that concurrent increments all land on the database side.
+    """
+    character = make_character(discord_id=21)
+
+    results = hammer(increment_gacha_count, [(21, 1)] * 200)
+
+    assert load_state("21", character.id)[0] == 200
+    # Every call read back a distinct count
+    assert sorted(results) == list(range(1, 201))
+    assert increment_gacha_count(404) == 0
+
+
+def test_concurrent_skill_grants_and_removals(make_character):
+    """
+    Test that skills added and removed from many threads are all applied.
+    """
+    character = make_character(discord_id=22, arcana_skills=0)
+    get_character_by_id(character.id)
+
+    hammer(add_arcana_skills, [(character.id, 1 << bit) for bit in range(54)])
+    assert load_state("22", character.id)[1] == (1 << 54) - 1
+
+    hammer(remove_arcana_skills, [(character.id, 1 << bit) for bit in range(0, 54, 2)])
+    expected = sum(1 << bit for bit in range(1, 54, 2))
+    assert load_state("22", character.id)[1] == expected
+    assert get_character_by_id(character.id).arcana_skills == expected
+    assert add_arcana_skills(character.id + 1000, 1) is None
+
+
+def test_concurrent_gacha_pulls(make_character):
+    """
+    Test that interleaved multi-pulls keep both the counter and the skills.
+    """
+    character = make_character(discord_id=23, arcana_skills=0)
+
+    hammer(apply_gacha_pulls, [(23, character.id, 1 << bit, 10) for bit in range(40)])
+
+    gacha_count, arcana_skills = load_state("23", character.id)
+    assert gacha_count == 400
+    assert arcana_skills == (1 << 40) - 1
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from config.database import InstrumentedQueuePool, PoolExhaustedError
+from services.metrics_service import metrics
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+        pool_pre_ping=True,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_exhaustion_fails_fast(small_engine):
+    """
+    Test that waiting on a full pool raises a PoolExhaustedError after the timeout.
+    """
+    with small_engine.connect(), small_engine.connect():
+        stats = small_engine.pool.stats()
+        assert (stats.checked_out, stats.overflow) == (2, 1)
+
+        with pytest.raises(PoolExhaustedError, match="2 checked out"):
+            small_engine.connect()
+
+    stats = small_engine.pool.stats()
+    assert (stats.checked_out, stats.timeouts, stats.checkouts) == (0, 1, 3)
+    assert stats.max_wait_seconds >= 0.05
+
+
+def test_pool_stats_track_checkouts(small_engine):
+    """
+    Test that checkouts are counted and connections are reused.
+    """
+    for _ in range(3):
+        with small_engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+
+    stats = small_engine.pool.stats()
+    assert (stats.size, stats.checked_out, stats.checkouts) == (1, 0, 3)
+    assert stats.wait_seconds >= stats.max_wait_seconds > 0
+
+
+def test_pool_gauges_are_exported(db):
+    """
+    Test that the application engine's pool shows up in the metrics file.
+    """
+    lines = metrics.render_prometheus().splitlines()
+
+    assert "# TYPE ggm_db_pool_connections gauge" in lines
+    assert any(
+        line.startswith('ggm_db_pool_checkout{stat="timeouts"}') for line in lines
+    )
@@ -0,0 +1,54 @@
+import asyncio
+import contextvars
+import threading
+
+from config.database import run_db
+from repositories.character_repository import get_character_by_player_id
+from repositories.user_repository import get_or_create_user
+
+request_name = contextvars.ContextVar("request_name", default=None)
+
+
+def test_run_db_uses_the_database_thread_pool():
+    """
+    Test that blocking calls are moved off the event loop thread.
+    """
+
+    async def main():
+        return await run_db(lambda: threading.current_thread().name)
+
+    assert asyncio.run(main()).startswith("ggm-db")
+
+
+def test_run_db_carries_context_variables():
+    """
+    Test that context variables set in the coroutine are visible to the worker thread.
+    """
+
+    async def main():
+        request_name.set("ficha")
+        return await run_db(request_name.get)
+
+    assert asyncio.run(main()) == "ficha"
+
+
+def test_repositories_through_run_db(make_character):
+    """
+    Test the awaited repository calls against the SQLite test database.
+    """
+    make_character(discord_id=42, name="Lira")
+
+    async def main():
+        user = await run_db(get_or_create_user, 42)
+        character = await run_db(get_character_by_player_id, user.id)
+        new_user = await run_db(get_or_create_user, 43, "Novato")
+        return user, character, new_user
+
+    user, character, new_user = asyncio.run(main())
+    assert user.discord_id == "42"
+    # Relationships are loaded before the session closes
+    assert character.name == "Lira"
+    assert character.race.name == "Humano"
+    assert character.mana_nature.color == "808080"
+    assert new_user.player_name == "Novato"
+    assert new_user.id != user.id
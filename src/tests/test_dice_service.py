@@ -0,0 +1,61 @@
+import random
+import tracemalloc
+
+import pytest
+
+import services.dice_service as dice
+from services.dice_service import DiceLimitError, format_roll, roll_dice
+
+
+def test_small_rolls_keep_every_die():
+    """
+    Test that small rolls list each die and add up.
+    """
+    roll = roll_dice(5, 6, random.Random(1))
+    assert len(roll.rolls) == 5
+    assert all(1 <= value <= 6 for value in roll.rolls)
+    assert roll.total == sum(roll.rolls)
+    assert format_roll(roll, 2, "5d6 +2").startswith(f"` {roll.total + 2} ` ⟵ [")
+
+
+def test_medium_rolls_are_exact_without_dice_list():
+    """
+    Test the exact streaming path.
+    """
+    roll = roll_dice(dice.DICE_EXACT_LIMIT, 6, random.Random(2))
+    assert roll.rolls is None
+    assert roll.approximate is False
+    assert 1 <= roll.lowest <= roll.highest <= 6
+    assert roll.total == pytest.approx(dice.DICE_EXACT_LIMIT * 3.5, rel=0.05)
+
+
+def test_huge_rolls_use_constant_memory():
+    """
+    Test that the largest allowed roll neither allocates per die nor leaves bounds.
+    """
+    count, sides = dice.DICE_MAX_COUNT, dice.DICE_MAX_SIDES
+    tracemalloc.start()
+    roll = roll_dice(count, sides, random.Random(3))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert roll.approximate is True
+    assert count <= roll.total <= count * sides
+    assert roll.total == pytest.approx(count * (sides + 1) / 2, rel=0.01)
+    assert peak < 100_000
+    assert len(format_roll(roll, 0, f"{count}d{sides}")) < 2000
+
+
+@pytest.mark.parametrize(
+    "count, sides",
+    [(0, 6), (1, 0), (dice.DICE_MAX_COUNT + 1, 6), (1, dice.DICE_MAX_SIDES + 1)],
+)
+def test_rolls_outside_the_caps_are_rejected(count, sides):
+    with pytest.raises(DiceLimitError):
+        roll_dice(count, sides)
+
+
+def test_rolls_are_reproducible():
+    assert roll_dice(20_000, 20, random.Random(9)) == roll_dice(
+        20_000, 20, random.Random(9)
+    )
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import timedelta
+
+import discord
+
+from models.character import Character
+from repositories.character_repository import (
+    add_arcana_skills,
+    get_character_by_discord_id,
+    update_character,
+)
+from views.character import CharacterView, EmbedCache, embed_cache
+
+
+def test_embed_cache_is_versioned():
+    """
+    Test that pages are reused until the character's version changes.
+    """
+    cache = EmbedCache(maxsize=2)
+    character = Character(id=1, name="Nix", age=1, user_id=1)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return discord.Embed(title=str(len(renders)))
+
+    first = cache.get_or_render(character, "info", render)
+    assert cache.get_or_render(character, "info", render) is first
+    assert cache.get_or_render(character, "story", render) is not first
+
+    character.updated_at += timedelta(seconds=1)
+    assert cache.get_or_render(character, "info", render) is not first
+    assert len(renders) == 3
+
+    cache.invalidate(1)
+    cache.get_or_render(character, "info", render)
+    assert len(renders) == 4
+
+
+def test_sheet_pages_are_cached_until_updated(make_character):
+    """
+    Test that switching tabs reuses embeds and that updates drop them.
+    """
+    make_character(discord_id=5, vitality=2)
+    character = get_character_by_discord_id(5)
+
+    async def render(option):
+        view = CharacterView(character, [], discord.Object(id=5))
+        return view.get_embeds_for_option(option)[0]
+
+    attributes = asyncio.run(render("attributes"))
+    assert asyncio.run(render("attributes")) is attributes
+    assert asyncio.run(render("unknown")) is asyncio.run(render("info"))
+
+    character.vitality = 3
+    update_character(character)
+    updated = asyncio.run(render("attributes"))
+    assert updated is not attributes
+    assert updated.fields[0].value == "+3"
+
+    info = asyncio.run(render("info"))
+    add_arcana_skills(character.id, 0b1)
+    assert character.id not in embed_cache.pages
+    assert asyncio.run(render("info")) is not info
@@ -0,0 +1,76 @@
+import pytest
+from sqlmodel import Session, select
+
+from config.database import QueryStats, current_query_stats, engine
+from models.character import Character
+from models.user import User
+from repositories.character_repository import get_character_by_discord_id
+from repositories.gacha_repository import apply_gacha_pulls
+
+
+def test_apply_gacha_pulls_in_one_transaction(make_character):
+    """
+    Test that a multi-pull updates the counter and the skills together.
+    """
+    created = make_character(discord_id=11, arcana_skills=0b1)
+    get_character_by_discord_id(11)
+
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        gacha_count = apply_gacha_pulls(11, created.id, 0b110, 10)
+    finally:
+        current_query_stats.reset(token)
+
+    assert gacha_count == 10
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.discord_id == "11")).one()
+        assert user.gacha_count == 10
+        assert session.get(Character, created.id).arcana_skills == 0b111
+    # The cached character follows the write
+    assert get_character_by_discord_id(11).arcana_skills == 0b111
+    # SELECT user, SELECT character, UPDATE user, UPDATE character
+    assert stats.count == 4
+
+
+def test_apply_gacha_pulls_for_unknown_user(db):
+    assert apply_gacha_pulls(404, None, 0b1, 1) == 0
+
+
+def test_apply_gacha_pulls_touches_one_character(make_character):
+    """
+    Test that only the given character gets the skills, even when the user
+    owns several, and that a character of another user is refused.
+    """
+    first = make_character(discord_id=12, arcana_skills=0)
+    with Session(engine) as session:
+        second = Character(
+            name="Segundo", age=20, user_id=first.user_id, arcana_skills=0
+        )
+        session.add(second)
+        session.commit()
+        session.refresh(second)
+    other = make_character(discord_id=13, arcana_skills=0)
+
+    assert apply_gacha_pulls(12, second.id, 0b1, 1) == 1
+    with pytest.raises(ValueError):
+        apply_gacha_pulls(12, other.id, 0b10, 1)
+
+    with Session(engine) as session:
+        assert session.get(Character, first.id).arcana_skills == 0
+        assert session.get(Character, second.id).arcana_skills == 0b1
+        assert session.get(Character, other.id).arcana_skills == 0
+        user = session.exec(select(User).where(User.discord_id == "12")).one()
+        # The refused pull was rolled back with its counter
+        assert user.gacha_count == 1
+
+
+def test_apply_gacha_pulls_without_character(db):
+    """
+    Test that a user without a character still has their pulls counted.
+    """
+    with Session(engine) as session:
+        session.add(User(discord_id="15", player_name="semficha"))
+        session.commit()
+
+    assert apply_gacha_pulls(15, None, 0b1, 3) == 3
@@ -0,0 +1,113 @@
+import random
+from collections import Counter
+
+import pytest
+
+from models.arcana import Arcana, ArcanaSkill, ArcanaTier
+from services.arcana_service import create_arcana_data
+from services.gacha_service import AliasTable, ArcanaSampler
+
+
+def build_arcana_data():
+    """
+    Two arcanas over three tiers. "Cura" has no skills in the middle tier.
+    """
+    tiers = [
+        ArcanaTier(id=1, tier_name="Comum", tier_level=1, probability=0.6, color="1"),
+        ArcanaTier(id=2, tier_name="Raro", tier_level=2, probability=0.3, color="2"),
+        ArcanaTier(
+            id=3, tier_name="Lendário", tier_level=3, probability=0.1, color="3"
+        ),
+    ]
+    arcanas = [
+        Arcana(id=1, name="Destruição", icon_url=""),
+        Arcana(id=2, name="Cura", icon_url=""),
+    ]
+    skills = []
+    layout = {1: [1, 1, 2, 3], 2: [1, 3]}
+    for arcana_id, tier_ids in layout.items():
+        for tier_id in tier_ids:
+            skill_id = len(skills) + 1
+            skills.append(
+                ArcanaSkill(
+                    id=skill_id,
+                    name=f"Skill {skill_id}",
+                    description="",
+                    arcana_id=arcana_id,
+                    tier_id=tier_id,
+                    tier=tiers[tier_id - 1],
+                )
+            )
+    return create_arcana_data(arcanas, skills, tiers)
+
+
+def test_alias_table_matches_weights():
+    """
+    Test that sampled frequencies follow the weights.
+    """
+    table = AliasTable([5, 3, 2, 0])
+    rng = random.Random(1)
+    draws = Counter(table.sample(rng) for _ in range(100_000))
+
+    assert draws[3] == 0
+    for index, expected in enumerate([0.5, 0.3, 0.2]):
+        assert draws[index] / 100_000 == pytest.approx(expected, abs=0.01)
+
+
+def test_alias_table_rejects_empty_weights():
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_effective_odds_are_renormalized():
+    """
+    Test that tiers without skills are removed and the rest scaled to 1.
+    """
+    sampler = ArcanaSampler(build_arcana_data())
+
+    assert sampler.effective_odds("Destruição") == pytest.approx(
+        {1: 0.6, 2: 0.3, 3: 0.1}
+    )
+    assert sampler.effective_odds("cura") == pytest.approx({1: 0.6 / 0.7, 3: 0.1 / 0.7})
+    assert sampler.effective_odds("Inexistente") == {}
+
+
+def test_sampler_follows_effective_odds():
+    """
+    Test the empirical distribution of an arcana with an empty tier.
+    """
+    sampler = ArcanaSampler(build_arcana_data(), rng=random.Random(7))
+    draws = Counter(sampler.pick("Cura").tier_level for _ in range(50_000))
+
+    assert set(draws) == {1, 3}
+    assert draws[3] / 50_000 == pytest.approx(0.1 / 0.7, abs=0.01)
+
+
+def test_sampler_is_reproducible_with_injected_rng():
+    """
+    Test that the same seed yields the same pulls.
+    """
+    first = ArcanaSampler(build_arcana_data(), rng=random.Random(42))
+    second = ArcanaSampler(build_arcana_data(), rng=random.Random(42))
+
+    pulls = [first.pick("Destruição") for _ in range(20)]
+    assert pulls == [second.pick("Destruição") for _ in range(20)]
+    assert pulls[0].chance == pytest.approx(
+        first.effective_odds("Destruição")[pulls[0].tier_level]
+    )
+    assert first.pick("Inexistente") is None
+
+
+def test_pick_many_draws_every_pull():
+    """
+    Test that a multi-pull returns one result per pull with its arcana.
+    """
+    sampler = ArcanaSampler(build_arcana_data(), rng=random.Random(3))
+
+    pulls = sampler.pick_many("Cura", 10)
+    assert len(pulls) == 10
+    assert {pull.arcana_name for pull in pulls} == {"Cura"}
+
+    random_pulls = sampler.pick_many(None, 50)
+    assert len(random_pulls) == 50
+    assert {pull.arcana_name for pull in random_pulls} == {"Destruição", "Cura"}
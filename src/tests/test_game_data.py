@@ -0,0 +1,231 @@
+import asyncio
+import gc
+import tracemalloc
+
+import pytest
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+import models.game_data as game_data_module
+from config.database import QueryStats, current_query_stats, engine
+from models.arcana import Arcana, ArcanaSkill, ArcanaTier
+from models.character import Character
+from models.gacha import GachaConfig
+from models.game_data import GameData
+from services.search_service import GameDataSearch
+
+
+@pytest.fixture
+def loaded_tables(db, monkeypatch):
+    """
+    Seed a minimal arcana tree and record which tables each reload fetches.
+    """
+    with Session(engine) as session:
+        arcana = Arcana(name="Destruição", icon_url="")
+        tier = ArcanaTier(tier_name="Comum", tier_level=1, probability=1, color="fff")
+        session.add_all([arcana, tier])
+        session.flush()
+        session.add(
+            ArcanaSkill(
+                name="Projétil", description="", arcana_id=arcana.id, tier_id=tier.id
+            )
+        )
+        session.add(
+            GachaConfig(
+                enabled=True,
+                general_pick_price=1,
+                choice_pick_price=1,
+                pity_threshold=10,
+                pity_enabled=False,
+            )
+        )
+        session.commit()
+
+    loaded = []
+    loaders = {
+        name: (lambda name=name, loader=loader: loaded.append(name) or loader())
+        for name, loader in game_data_module.GAME_DATA_LOADERS.items()
+    }
+    monkeypatch.setattr(game_data_module, "GAME_DATA_LOADERS", loaders)
+    return loaded
+
+
+def test_initial_load_builds_version_one(loaded_tables):
+    """
+    Test that the first load fetches every table once.
+    """
+    game_data = GameData()
+    assert game_data.version == 1
+    assert sorted(loaded_tables) == sorted(game_data_module.GAME_DATA_TABLES)
+    assert game_data.arcana_skills[0].tier.tier_level == 1
+    assert game_data.gacha_config.enabled is True
+
+
+def test_unchanged_tables_are_not_reloaded(loaded_tables):
+    """
+    Test that a reload with no changes keeps the same snapshot.
+    """
+    game_data = GameData()
+    snapshot = game_data.snapshot
+    loaded_tables.clear()
+
+    assert game_data.reload() is snapshot
+    assert loaded_tables == []
+
+
+def test_only_changed_tables_are_reloaded(loaded_tables):
+    """
+    Test the incremental reload and the skills' dependency on their tiers.
+    """
+    game_data = GameData()
+    old_snapshot = game_data.snapshot
+    loaded_tables.clear()
+
+    with Session(engine) as session:
+        session.add(
+            ArcanaTier(tier_name="Raro", tier_level=2, probability=0.1, color="000")
+        )
+        session.commit()
+
+    snapshot = game_data.reload()
+    assert snapshot.version == 2
+    assert sorted(loaded_tables) == ["arcana_skills", "arcana_tiers"]
+    # Unchanged tables are shared with the previous version
+    assert snapshot.arcana is old_snapshot.arcana
+    # The previous snapshot is left untouched
+    assert len(old_snapshot.arcana_tiers) == 1
+    assert len(snapshot.arcana_tiers) == 2
+
+
+def test_edits_in_place_are_reloaded(loaded_tables):
+    """
+    Test that an edit keeping the row count and max id is still picked up,
+    although the tier table has no updated_at column.
+    """
+    game_data = GameData()
+    loaded_tables.clear()
+
+    with Session(engine) as session:
+        tier = session.exec(select(ArcanaTier)).one()
+        tier.probability = 0.5
+        session.add(tier)
+        session.commit()
+
+    snapshot = game_data.reload()
+    assert snapshot.version == 2
+    assert sorted(loaded_tables) == ["arcana_skills", "arcana_tiers"]
+    assert snapshot.arcana_tiers[0].probability == 0.5
+
+
+def test_full_reload_fetches_everything(loaded_tables):
+    """
+    Test that a full reload ignores the table signatures.
+    """
+    game_data = GameData()
+    loaded_tables.clear()
+    assert game_data.reload(full=True).version == 2
+    assert sorted(loaded_tables) == sorted(game_data_module.GAME_DATA_TABLES)
+
+
+def test_stale_snapshots_are_not_published(loaded_tables):
+    """
+    Test that of two overlapping reloads, the one built last wins even when
+    it is published first.
+    """
+    game_data = GameData()
+    versions = []
+    game_data.subscribe(lambda snapshot: versions.append(snapshot.version))
+
+    older = game_data.build_snapshot(full=True)
+    newer = game_data.build_snapshot(full=True)
+
+    assert game_data.publish(newer) is newer
+    assert game_data.publish(older) is newer
+    assert game_data.snapshot is newer
+    assert (older.version, newer.version) == (2, 3)
+    assert versions == [1, 3]
+
+
+def test_subscribers_receive_new_versions(loaded_tables):
+    """
+    Test that subscribers see the current snapshot and every later one.
+    """
+    game_data = GameData()
+    versions = []
+    game_data.subscribe(lambda snapshot: versions.append(snapshot.version))
+
+    with Session(engine) as session:
+        session.add(Arcana(name="Cura", icon_url=""))
+        session.commit()
+
+    asyncio.run(game_data.reload_async())
+    asyncio.run(game_data.reload_async())
+    assert versions == [1, 2]
+
+
+def test_snapshots_are_immutable(loaded_tables):
+    """
+    Test that published snapshots cannot be modified in place.
+    """
+    game_data = GameData()
+    with pytest.raises(Exception):
+        game_data.snapshot.version = 10
+
+
+def add_characters(start: int, count: int) -> None:
+    with Session(engine) as session:
+        session.execute(
+            insert(Character),
+            [
+                {"id": i, "name": f"Personagem {i}", "age": 20, "user_id": i}
+                for i in range(start, start + count)
+            ],
+        )
+        session.commit()
+
+
+def test_characters_stream_in_keyset_chunks(db):
+    """
+    Test that streaming visits every character once, one query per chunk.
+    """
+    add_characters(1, 23)
+    game_data = GameData(load=False)
+
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        chunks = [[c.id for c in chunk] for chunk in game_data.characters.chunks(10)]
+        names = list(game_data.characters.names(10))
+    finally:
+        current_query_stats.reset(token)
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert sum(chunks, []) == list(range(1, 24))
+    assert names[-1] == (23, "Personagem 23")
+    assert stats.count == 6
+    assert game_data.characters.get(7).name == "Personagem 7"
+
+
+def test_boot_memory_is_flat(loaded_tables):
+    """
+    Test that loading the game data costs the same with 10 or 5000 characters.
+    """
+
+    def boot_memory() -> int:
+        gc.collect()
+        tracemalloc.start()
+        game_data = GameData()
+        search = GameDataSearch()
+        game_data.subscribe(search.on_game_data)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return size
+
+    add_characters(1, 10)
+    boot_memory()  # Warm up SQLAlchemy's statement caches
+    small = boot_memory()
+    add_characters(11, 5000)
+    large = boot_memory()
+
+    # A snapshot holding 5000 characters would take megabytes
+    assert large - small < 64 * 1024
@@ -0,0 +1,46 @@
+import io
+import json
+
+import pytest
+
+from utils.json_stream import iter_json_array
+
+ITEMS = [{"name": "Fogo], {", "components": ["Ar", "Terra"]}, [1, [2]], "s", 123, None]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 7, 4096])
+def test_items_split_across_reads(read_size):
+    """
+    Test that items are rebuilt whatever the read boundaries are.
+    """
+    text = json.dumps(ITEMS, indent=2)
+
+    assert list(iter_json_array(io.StringIO(text), read_size)) == ITEMS
+
+
+def test_items_are_yielded_before_the_end_is_read():
+    """
+    Test that the first item is available after reading only the first block.
+    """
+    file = io.StringIO(json.dumps([{"i": i} for i in range(10_000)]))
+    items = iter_json_array(file, read_size=64)
+
+    assert next(items) == {"i": 0}
+    assert file.tell() < 200
+
+
+@pytest.mark.parametrize("text", ["", "  \n", "[]", " [ ] "])
+def test_empty_inputs(text):
+    """
+    Test that empty files and arrays yield nothing.
+    """
+    assert list(iter_json_array(io.StringIO(text))) == []
+
+
+@pytest.mark.parametrize("text", ["{}", "[1,", "[1 2]", "[1,]", '["a'])
+def test_malformed_inputs(text):
+    """
+    Test that malformed arrays raise instead of stopping early.
+    """
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), read_size=2))
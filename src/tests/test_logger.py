@@ -0,0 +1,127 @@
+import json
+import logging
+
+import pytest
+
+from utils.logger import BotLogger, parse_sample_rates, stop_logging
+
+
+def read_log(directory, name):
+    stop_logging()
+    return (directory / f"{name}.log").read_text().splitlines()
+
+
+def test_handlers_are_set_up_once(tmp_path):
+    """
+    Test that creating the same logger twice does not duplicate output.
+    """
+    first = BotLogger("test-idempotent", log_file_path=tmp_path, write_to_console=False)
+    second = BotLogger("test-idempotent", log_file_path=tmp_path)
+
+    first.info("hello %s", "world")
+
+    assert len(second.logger.handlers) == 1
+    assert read_log(tmp_path, "test-idempotent")[0].endswith(": hello world")
+
+
+def test_json_lines_and_exc_info(tmp_path):
+    """
+    Test the JSON line format and that the traceback gets its own field.
+    """
+    logger = BotLogger(
+        "test-json", log_file_path=tmp_path, write_to_console=False, log_format="json"
+    )
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.error("failed: %s", "gacha", exc_info=True)
+
+    entry = json.loads(read_log(tmp_path, "test-json")[0])
+    assert (entry["level"], entry["logger"]) == ("ERROR", "test-json")
+    assert entry["message"] == "failed: gacha"
+    assert entry["exc_info"].startswith("Traceback (most recent call last)")
+    assert "RuntimeError: boom" in entry["exc_info"]
+
+
+def test_text_lines_keep_the_traceback(tmp_path):
+    """
+    Test that the text format still prints the traceback after the message.
+    """
+    logger = BotLogger("test-text-exc", log_file_path=tmp_path, write_to_console=False)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.error("failed", exc_info=True)
+
+    lines = read_log(tmp_path, "test-text-exc")
+    assert lines[0].endswith(": failed")
+    assert lines[1] == "Traceback (most recent call last):"
+    assert lines[-1] == "RuntimeError: boom"
+
+
+def test_sampling_never_drops_warnings(tmp_path):
+    """
+    Test that sampled levels are dropped before formatting, warnings are not.
+    """
+    logger = BotLogger(
+        "test-sampling",
+        log_file_path=tmp_path,
+        write_to_console=False,
+        sample_rates=parse_sample_rates("info=0, warning=0"),
+    )
+
+    class Explodes:
+        def __str__(self):
+            raise AssertionError("sampled records must not be formatted")
+
+    for _ in range(100):
+        logger.info("%s", Explodes())
+    logger.warning("kept")
+
+    lines = read_log(tmp_path, "test-sampling")
+    assert len(lines) == 1 and lines[0].endswith(": kept")
+
+
+def test_parse_sample_rates():
+    """
+    Test parsing and clamping of LOG_SAMPLE_RATES.
+    """
+    assert parse_sample_rates("debug=0.01, INFO=2,error=0") == {
+        logging.DEBUG: 0.01,
+        logging.INFO: 1.0,
+    }
+    with pytest.raises(ValueError):
+        parse_sample_rates("loud=1")
+
+
+def test_sample_rates_per_logger():
+    """
+    Test that rates naming a logger override the shared ones for it only.
+    """
+    value = "info=0.5, discord:info=0.1, discord:debug=0, database:info=1"
+
+    assert parse_sample_rates(value, "discord") == {
+        logging.INFO: 0.1,
+        logging.DEBUG: 0.0,
+    }
+    assert parse_sample_rates(value, "database") == {logging.INFO: 1.0}
+    assert parse_sample_rates(value, "activity") == {logging.INFO: 0.5}
+
+
+def test_child_loggers_are_sampled_apart(tmp_path):
+    """
+    Test that a child logger writes through its parent's handlers with its
+    own sample rates, leaving the parent's records alone.
+    """
+    parent = BotLogger("test-parent", log_file_path=tmp_path, write_to_console=False)
+    child = parent.child("gacha", sample_rates=parse_sample_rates("info=0"))
+
+    child.info("sampled out")
+    child.warning("kept")
+    parent.info("parent")
+
+    lines = read_log(tmp_path, "test-parent")
+    assert len(lines) == 2
+    assert lines[0].endswith(":WARNING:test-parent.gacha: kept")
+    assert lines[1].endswith(":INFO:test-parent: parent")
+    assert not (tmp_path / "test-parent.gacha.log").exists()
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from config.database import run_db
+from services.metrics_service import (
+    Histogram,
+    MetricsRegistry,
+    current_command_timing,
+)
+
+
+def test_histogram_quantiles():
+    """
+    Test bucket placement and quantile interpolation.
+    """
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 0.5, 20.0):
+        histogram.observe(value)
+
+    # Bounds are inclusive, values past the last bound go to +Inf
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(20.565)
+    # Rank 2.5 is halfway through the second bucket
+    assert histogram.quantile(0.5) == pytest.approx(0.055)
+    assert histogram.quantile(1.0) == 1.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_track_records_db_time_and_errors():
+    """
+    Test that database waits count towards the tracked command only.
+    """
+    registry = MetricsRegistry(sample_rate=1)
+
+    async def command():
+        with registry.track("roll"):
+            await run_db(time.sleep, 0.02)
+        await run_db(time.sleep, 0.02)
+        with pytest.raises(RuntimeError):
+            with registry.track("roll"):
+                raise RuntimeError
+
+    asyncio.run(command())
+
+    [summary] = registry.summary()
+    assert (summary.name, summary.count, summary.errors) == ("roll", 2, 1)
+    assert registry.commands["roll"].db.sum == pytest.approx(0.02, abs=0.015)
+    assert current_command_timing.get() is None
+
+
+def test_sampling_off_records_nothing():
+    """
+    Test that a zero sample rate skips timing entirely.
+    """
+    registry = MetricsRegistry(sample_rate=0)
+
+    with registry.track("roll") as timing:
+        assert timing is None and current_command_timing.get() is None
+
+    assert registry.commands == {}
+
+
+def test_prometheus_file(tmp_path):
+    """
+    Test the exported text format, including registered gauges.
+    """
+    registry = MetricsRegistry(sample_rate=1)
+    registry.finish(registry.begin("admin stats"))
+    registry.register_gauge("ggm_test_gauge", "A test gauge", lambda: {"": 3})
+    path = tmp_path / "metrics" / "metrics.prom"
+
+    registry.write_prometheus(str(path))
+
+    lines = path.read_text().splitlines()
+    assert "# TYPE ggm_command_seconds histogram" in lines
+    assert 'ggm_command_seconds_bucket{command="admin stats",le="+Inf"} 1' in lines
+    assert 'ggm_command_seconds_count{command="admin stats"} 1' in lines
+    assert 'ggm_command_errors_total{command="admin stats"} 0' in lines
+    assert "ggm_test_gauge 3" in lines
@@ -0,0 +1,70 @@
+import asyncio
+
+from sqlmodel import Session, select
+
+from config.database import engine, profile_queries, run_db
+from models.character import Character
+from repositories.character_repository import get_character_by_discord_id
+
+
+def load_races():
+    with Session(engine) as session:
+        return [character.race.name for character in session.exec(select(Character))]
+
+
+def test_lazy_loads_are_flagged_as_n_plus_one(make_character):
+    """
+    Test that a lazy relationship loaded per row shows up as one repeated shape.
+    """
+    for discord_id in (1, 2, 3):
+        make_character(discord_id)
+
+    with profile_queries("races") as profile:
+        races = load_races()
+
+    assert races == ["Humano"] * 3
+    assert profile.count == 4
+    [(statement, count)] = profile.n_plus_one_candidates().items()
+    assert count == 3
+    assert "FROM race" in statement
+
+
+def test_eager_loading_is_not_flagged(make_character):
+    """
+    Test that the repository's eager loads take one query, even through run_db.
+    """
+    make_character(1)
+
+    async def load():
+        with profile_queries("ficha") as profile:
+            character = await run_db(get_character_by_discord_id, "1")
+        return character, profile
+
+    character, profile = asyncio.run(load())
+
+    assert (character.race.name, character.region.name) == ("Humano", "Jardim")
+    assert profile.count == 1
+    assert profile.n_plus_one_candidates() == {}
+
+
+def test_slow_statements_keep_their_parameters(make_character):
+    """
+    Test that statements over the threshold are kept with parameters and timing.
+    """
+    make_character(42)
+
+    with profile_queries("slow") as profile:
+        profile.slow_query_seconds = 0
+        get_character_by_discord_id("42")
+
+    assert len(profile.slow) == profile.count
+    assert any("42" in map(str, query.parameters) for query in profile.slow)
+    assert all(query.seconds >= 0 for query in profile.slow)
+
+
+def test_profiling_disabled():
+    """
+    Test that a disabled profile collects nothing.
+    """
+    with profile_queries("off", enabled=False) as profile:
+        assert profile is None
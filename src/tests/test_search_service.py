@@ -0,0 +1,154 @@
+import asyncio
+
+from models.arcana import ArcanaSkill
+from models.game_data import GameDataSnapshot
+from repositories.character_repository import (
+    CharacterDirectory,
+    on_character_updated,
+    update_character,
+)
+from services.search_service import GameDataSearch, SearchIndex, normalize
+
+ENTRIES = [
+    (1, "Bola de Fogo"),
+    (2, "Fogo Fátuo"),
+    (3, "Poção de Cura"),
+    (4, "Fogo"),
+    (5, "Escudo de Gelo"),
+    (6, "Cura Maior"),
+]
+
+
+def names(results):
+    return [result.name for result in results]
+
+
+def test_normalize_strips_accents():
+    """
+    Test that accents, case and extra spaces are ignored.
+    """
+    assert normalize("  Poção   de CURA ") == "pocao de cura"
+    assert normalize("Fátuo") == normalize("fatuo")
+
+
+def test_search_ranks_matches():
+    """
+    Test the ranking: exact, prefix, word prefix, then substring.
+    """
+    index = SearchIndex(ENTRIES)
+
+    assert names(index.search("fogo")) == ["Fogo", "Fogo Fátuo", "Bola de Fogo"]
+    assert names(index.search("cura")) == ["Cura Maior", "Poção de Cura"]
+    assert names(index.search("ogo")) == ["Fogo", "Fogo Fátuo", "Bola de Fogo"]
+
+
+def test_search_is_accent_insensitive_and_fuzzy():
+    """
+    Test that unaccented queries and small typos still find a name.
+    """
+    index = SearchIndex(ENTRIES)
+
+    assert names(index.search("pocao")) == ["Poção de Cura"]
+    assert names(index.search("fatuo")) == ["Fogo Fátuo"]
+    assert names(index.search("escudo de gleo"))[0] == "Escudo de Gelo"
+
+
+def test_search_limits_and_empty_query():
+    """
+    Test that an empty query lists names alphabetically, up to the limit.
+    """
+    index = SearchIndex(ENTRIES)
+
+    assert names(index.search("", limit=2)) == ["Bola de Fogo", "Cura Maior"]
+    assert len(index.search("o", limit=3)) <= 3
+
+
+def test_rebuild_drops_cached_results():
+    """
+    Test that results cached before a rebuild are not served afterwards.
+    """
+    index = SearchIndex(ENTRIES, cache_size=4)
+    assert names(index.search("gelo")) == ["Escudo de Gelo"]
+    assert index.search("gelo") is index.search("gelo")
+
+    index.rebuild([(7, "Lança de Gelo")])
+
+    assert names(index.search("gelo")) == ["Lança de Gelo"]
+    assert len(index.results) == 1
+
+
+def test_game_data_search_rebuilds_changed_tables():
+    """
+    Test that the skill index is only rebuilt when a snapshot replaces the skills.
+    """
+    search = GameDataSearch()
+    snapshot = GameDataSnapshot(
+        version=1,
+        arcana_skills=(ArcanaSkill(id=1, name="Projétil", description=""),),
+    )
+    search.on_game_data(snapshot)
+    skills = search.skills._state
+
+    search.on_game_data(snapshot.model_copy(update={"version": 2}))
+
+    assert search.skills._state is skills
+    assert names(search.skills.search("projetil")) == ["Projétil"]
+
+
+def test_character_index_is_built_lazily(make_character):
+    """
+    Test that characters are indexed on first search and reindexed once the
+    table changed and the check interval passed.
+    """
+    make_character(1, name="Nix")
+    search = GameDataSearch(check_seconds=3600)
+    assert len(search.characters) == 0
+
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nix"]
+
+    make_character(2, name="Nina")
+    # Still within the check interval
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nix"]
+    search.check_seconds = 0
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nix", "Nina"]
+
+
+def test_character_updates_invalidate_the_index(make_character):
+    """
+    Test that a rename committed by the bot reaches the autocomplete at once.
+    """
+    character = make_character(1, name="Nix")
+    search = GameDataSearch(check_seconds=3600)
+    on_character_updated(search.invalidate_characters)
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nix"]
+
+    character.name = "Nina"
+    update_character(character)
+
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nina"]
+
+
+def test_updates_that_keep_names_do_not_reindex(make_character, monkeypatch):
+    """
+    Test that updates committed by the bot only read back the updated names,
+    and that a rename keeping the name length still reaches the index.
+    """
+    character = make_character(1, name="Nix")
+    make_character(2, name="Nina")
+    search = GameDataSearch(check_seconds=3600)
+    on_character_updated(search.invalidate_characters)
+    assert len(asyncio.run(search.search_characters("ni"))) == 2
+
+    streamed = []
+    monkeypatch.setattr(
+        CharacterDirectory, "names", lambda self: streamed.append(1) or []
+    )
+    character.current_hp = 5
+    update_character(character)
+    assert len(asyncio.run(search.search_characters("ni"))) == 2
+
+    character.name = "Max"
+    update_character(character)
+    assert names(asyncio.run(search.search_characters("ma"))) == ["Max"]
+    assert names(asyncio.run(search.search_characters("ni"))) == ["Nina"]
+    assert streamed == []
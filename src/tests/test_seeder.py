@@ -0,0 +1,127 @@
+import json
+import shutil
+
+import pytest
+from sqlmodel import Session, func, select
+
+from config.database import QueryStats, current_query_stats, engine
+from models.character import Character
+from models.mana import ManaNature, ManaNatureCompositionLink
+from models.race import Race
+from models.user import User
+from seeds.seeder import DATA_PATH, Seeder
+
+
+@pytest.fixture
+def data_path(db, tmp_path):
+    for name in ("races.json", "regions.json", "mana_natures.json"):
+        shutil.copy(DATA_PATH / name, tmp_path / name)
+    characters = [
+        {
+            "discord_id": str(i % 4),
+            "name": f"Personagem {i}",
+            "age": 20,
+            "race": "Humano",
+            "mana_nature": "Neutra",
+        }
+        for i in range(50)
+    ]
+    (tmp_path / "characters.json").write_text(json.dumps(characters))
+    return tmp_path
+
+
+def seed(data_path, dry_run=False, batch_size=20):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        with Session(engine) as session:
+            results = Seeder(session, data_path, batch_size).seed(
+                ["races", "regions", "mana_natures", "characters"], dry_run
+            )
+    finally:
+        current_query_stats.reset(token)
+    return {r.dataset: (r.inserted, r.updated) for r in results}, stats.count
+
+
+def count(model):
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(model)).one()
+
+
+def test_seeding_twice_updates_in_place(data_path):
+    """
+    Test that a rerun matches rows by natural key instead of duplicating them.
+    """
+    first, _ = seed(data_path)
+    second, _ = seed(data_path)
+
+    assert first == {
+        "races": (3, 0),
+        "regions": (0, 0),
+        "mana_natures": (8, 0),
+        "characters": (50, 0),
+    }
+    assert second == {
+        "races": (0, 3),
+        "regions": (0, 0),
+        "mana_natures": (0, 8),
+        "characters": (0, 50),
+    }
+    assert (count(Race), count(ManaNature), count(Character), count(User)) == (
+        3,
+        8,
+        50,
+        4,
+    )
+    assert count(ManaNatureCompositionLink) == 4
+
+
+def test_characters_resolve_their_references(data_path):
+    """
+    Test that owners are created and race and mana names become ids.
+    """
+    seed(data_path)
+
+    with Session(engine) as session:
+        character = session.exec(
+            select(Character).where(Character.name == "Personagem 5")
+        ).one()
+        assert character.user.discord_id == "1"
+        assert character.race.name == "Humano"
+        assert character.mana_nature.name == "Neutra"
+        assert character.created_at is not None
+
+
+def test_statements_do_not_grow_per_row(data_path):
+    """
+    Test that characters are written with a few bulk statements per batch.
+    """
+    _, statements = seed(data_path, batch_size=1000)
+
+    # Far fewer than one statement per character
+    assert statements < 30
+
+
+def test_dry_run_writes_nothing(data_path):
+    """
+    Test that a dry run reports the counts and rolls everything back.
+    """
+    results, _ = seed(data_path, dry_run=True)
+
+    assert results["characters"] == (50, 0)
+    assert (count(Race), count(Character), count(User)) == (0, 0, 0)
+
+
+def test_unknown_reference_rolls_back_the_dataset(data_path):
+    """
+    Test that a character naming a missing race fails without partial writes.
+    """
+    (data_path / "characters.json").write_text(
+        json.dumps([{"discord_id": "1", "name": "Nix", "age": 1, "race": "Elfo"}])
+    )
+
+    with pytest.raises(ValueError, match="Elfo"):
+        seed(data_path)
+
+    assert count(Race) == 3
+    assert (count(Character), count(User)) == (0, 0)
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+import repositories.character_repository as character_repository
+from repositories.character_repository import (
+    add_arcana_skills,
+    count_skill_owners,
+    get_skill_owners,
+    remove_arcana_skills,
+    skill_owner_index,
+)
+from repositories.gacha_repository import apply_gacha_pulls
+from utils.bitfield import BitfieldIndex
+
+
+@pytest.fixture(params=[False, True], ids=["sql", "index"])
+def use_index(request, monkeypatch):
+    """
+    Run a test against the SQL predicates and against the inverted index.
+    """
+    monkeypatch.setattr(character_repository, "SKILL_OWNER_INDEX", request.param)
+    return request.param
+
+
+def test_bitfield_index_applies_changed_bits():
+    """
+    Test that updates only move the bits that changed.
+    """
+    index = BitfieldIndex()
+    index.set(1, 0b1)
+    assert index.ids(0) == []
+
+    index.load([(1, 0b011), (2, 0b110)])
+    index.set(1, 0b101)
+    index.set(3, 0b100)
+
+    assert (index.ids(0), index.ids(1), index.ids(2)) == ([1], [2], [1, 2, 3])
+    assert index.count(2) == 3
+
+
+def test_set_during_the_first_load_is_kept():
+    """
+    Test that a grant recorded while the rows are being fetched is applied
+    on top of them, instead of being overwritten by the older row.
+    """
+    index = BitfieldIndex()
+    granting = threading.Thread(target=index.set, args=(1, 0b11))
+
+    def fetch():
+        granting.start()
+        # The grant must wait for the load
+        granting.join(timeout=0.05)
+        assert granting.is_alive()
+        return [(1, 0b01)]
+
+    index.load_once(fetch)
+    granting.join()
+    index.load_once(lambda: [(1, 0)])
+
+    assert index.ids(1) == [1]
+
+
+def test_skill_owner_queries(make_character, use_index):
+    """
+    Test ownership counts and pages, both before and after skill changes.
+    """
+    first = make_character(discord_id=1, arcana_skills=0b011)
+    second = make_character(discord_id=2, arcana_skills=0b110)
+    third = make_character(discord_id=3, arcana_skills=0)
+
+    assert count_skill_owners([0, 1, 2, 40]) == {0: 1, 1: 2, 2: 1, 40: 0}
+    assert get_skill_owners(1) == [(first.id, first.name), (second.id, second.name)]
+    assert get_skill_owners(1, offset=1, limit=1) == [(second.id, second.name)]
+    assert skill_owner_index.loaded is use_index
+
+    add_arcana_skills(third.id, 0b010)
+    remove_arcana_skills(first.id, 0b010)
+    apply_gacha_pulls(2, second.id, 1 << 40, 1)
+
+    assert count_skill_owners([0, 1, 40]) == {0: 1, 1: 2, 40: 1}
+    assert [owner_id for owner_id, _ in get_skill_owners(1)] == [second.id, third.id]
+    assert get_skill_owners(40) == [(second.id, second.name)]
@@ -0,0 +1,83 @@
+import discord
+from discord import app_commands
+from sqlalchemy import text
+
+from config.database import (
+    engine,
+    get_migration_heads,
+    init_db,
+    is_schema_at_head,
+)
+from services.startup_service import (
+    command_tree_hash,
+    read_command_tree_hash,
+    write_command_tree_hash,
+)
+
+GUILD = discord.Object(id=1234)
+
+
+def build_tree(*names: str, describe: str = "Roll") -> app_commands.CommandTree:
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+    for name in names:
+
+        async def callback(interaction: discord.Interaction, sides: int):
+            pass
+
+        tree.add_command(
+            app_commands.Command(name=name, description=describe, callback=callback),
+            guild=GUILD,
+        )
+    return tree
+
+
+def test_command_tree_hash_ignores_registration_order(tmp_path):
+    """
+    Test that only a change to the synced payload changes the hash.
+    """
+    digest = command_tree_hash(build_tree("roll", "ficha"), GUILD)
+
+    assert command_tree_hash(build_tree("ficha", "roll"), GUILD) == digest
+    assert (
+        command_tree_hash(build_tree("roll", "ficha", describe="Dice"), GUILD) != digest
+    )
+    assert (
+        command_tree_hash(build_tree("roll", "ficha"), discord.Object(id=5)) != digest
+    )
+
+    path = str(tmp_path / "state" / "tree.sha256")
+    assert read_command_tree_hash(path) is None
+    write_command_tree_hash(digest, path)
+    assert read_command_tree_hash(path) == digest
+
+
+def test_init_db_skips_create_all_at_head(db, monkeypatch):
+    """
+    Test that create_all only runs while the schema is not stamped at head.
+    """
+    heads = get_migration_heads()
+    calls = []
+    monkeypatch.setattr(
+        "config.database.SQLModel.metadata.create_all",
+        lambda bind: calls.append(bind),
+    )
+
+    assert not is_schema_at_head()
+    init_db()
+    assert calls == [engine]
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE alembic_version (version_num VARCHAR(32))")
+        )
+        for head in heads:
+            connection.execute(
+                text("INSERT INTO alembic_version VALUES (:head)"), {"head": head}
+            )
+    try:
+        assert is_schema_at_head()
+        init_db()
+        assert calls == [engine]
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
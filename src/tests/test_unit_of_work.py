@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.base_cogs import close_unit_of_work, get_unit_of_work
+from config.database import get_pool_stats
+from models.user import User
+from repositories.character_repository import add_arcana_skills, get_character_by_id
+from repositories.gacha_repository import apply_gacha_pulls
+from repositories.user_repository import (
+    get_user_by_discord_id,
+    increment_gacha_count,
+)
+from services.activity_service import ActivityTracker
+
+
+def make_interaction(discord_id: int, tracker: ActivityTracker):
+    user = SimpleNamespace(id=discord_id, display_name=f"player{discord_id}")
+    client = SimpleNamespace(activity_tracker=tracker)
+    return SimpleNamespace(user=user, client=client, extras={})
+
+
+def test_unit_of_work_is_shared_per_interaction(db):
+    """
+    Test that checks and command body receive the same unit of work.
+    """
+    interaction = make_interaction(1, ActivityTracker())
+    assert get_unit_of_work(interaction) is get_unit_of_work(interaction)
+
+    asyncio.run(close_unit_of_work(interaction))
+    assert "unit_of_work" not in interaction.extras
+
+
+def test_character_is_memoized(make_character):
+    """
+    Test the round-trip budget of a /ficha style interaction: the check and
+    the command body both ask for the character, but it is loaded once.
+    """
+    make_character(discord_id=5, name="Aurora")
+    tracker = ActivityTracker()
+    interaction = make_interaction(5, tracker)
+
+    async def main():
+        # The base check registers the user before anything else
+        await tracker.touch(5)
+        unit_of_work = get_unit_of_work(interaction)
+
+        # PlayerCog.interaction_check
+        assert await unit_of_work.get_character() is not None
+        # CharacterCog.player
+        character = await get_unit_of_work(interaction).get_character()
+        count = unit_of_work.query_count
+        await close_unit_of_work(interaction)
+        return character, count
+
+    character, query_count = asyncio.run(main())
+    assert character.name == "Aurora"
+    assert character.region.name == "Jardim"
+    assert query_count == 1
+
+
+def test_user_is_memoized_without_tracker(make_character):
+    """
+    Test that the user row is loaded once when no tracker is available.
+    """
+    make_character(discord_id=9)
+    interaction = make_interaction(9, None)
+
+    async def main():
+        unit_of_work = get_unit_of_work(interaction)
+        user = await unit_of_work.get_user()
+        assert await unit_of_work.get_user() is user
+        assert await unit_of_work.get_character() is not None
+        count = unit_of_work.query_count
+        await close_unit_of_work(interaction)
+        return user, count
+
+    user, query_count = asyncio.run(main())
+    assert user.discord_id == "9"
+    assert query_count == 2
+
+
+def test_connection_is_released_between_steps(make_character):
+    """
+    Test that no connection is held while the command awaits Discord between
+    two steps, and that each step's writes are committed by then.
+    """
+    make_character(discord_id=4)
+    interaction = make_interaction(4, None)
+
+    async def main():
+        unit_of_work = get_unit_of_work(interaction)
+        await unit_of_work.get_character()
+        checked_out = get_pool_stats().checked_out
+        await unit_of_work.run(increment_gacha_count, "4")
+        in_transaction = unit_of_work.session.in_transaction()
+        await close_unit_of_work(interaction)
+        return checked_out, in_transaction
+
+    checked_out, in_transaction = asyncio.run(main())
+    assert (checked_out, in_transaction) == (0, False)
+    assert get_user_by_discord_id("4").gacha_count == 1
+
+
+def test_missing_rows_keep_earlier_writes(make_character):
+    """
+    Test that an update matching no row leaves the interaction's pending
+    writes in the shared session for its owner to commit.
+    """
+    character = make_character(discord_id=6)
+    interaction = make_interaction(6, ActivityTracker())
+
+    async def main():
+        unit_of_work = get_unit_of_work(interaction)
+        unit_of_work.session.add(User(discord_id="60", player_name="pendente"))
+
+        assert await unit_of_work.run(add_arcana_skills, character.id + 1, 1) is None
+        assert await unit_of_work.run(apply_gacha_pulls, 404, None, 1, 1) == 0
+        await unit_of_work.run(lambda session: session.commit())
+        await close_unit_of_work(interaction)
+
+    asyncio.run(main())
+    assert get_user_by_discord_id("60") is not None
+
+
+def test_failed_step_is_rolled_back(make_character):
+    """
+    Test that a failing step is discarded, so a later commit cannot persist it.
+    """
+    character = make_character(discord_id=7)
+    other = make_character(discord_id=8)
+    interaction = make_interaction(7, ActivityTracker())
+
+    async def main():
+        unit_of_work = get_unit_of_work(interaction)
+        # Counts the pull, then refuses a character of another user
+        with pytest.raises(ValueError):
+            await unit_of_work.run(apply_gacha_pulls, 7, other.id, 1, 1)
+        await unit_of_work.run(add_arcana_skills, character.id, 0b10)
+        await close_unit_of_work(interaction)
+
+    asyncio.run(main())
+    assert get_user_by_discord_id("7").gacha_count == 0
+    assert get_character_by_id(character.id).arcana_skills == 0b10
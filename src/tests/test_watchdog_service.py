@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import sys
+import time
+
+import pytest
+
+from services.metrics_service import MetricsRegistry
+from services.watchdog_service import LoopWatchdog
+
+
+def blocking_helper():
+    time.sleep(0.2)
+
+
+def run_with_watchdog(command, registry=None, name: str = "worker") -> LoopWatchdog:
+    registry = registry or MetricsRegistry(sample_rate=1)
+    watchdog = LoopWatchdog(registry, interval_ms=10, threshold_ms=50)
+
+    async def main():
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(command(registry), name=name)
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    asyncio.run(main())
+    return watchdog
+
+
+def block_warnings(caplog) -> list:
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == "watchdog" and "blocked for" in record.getMessage()
+    ]
+
+
+def test_blocking_callback_is_reported_with_its_stack(caplog):
+    """
+    Test that a callback blocking the loop is logged, while it still blocks,
+    with a stack pointing at the blocking call.
+    """
+
+    async def command(registry):
+        blocking_helper()
+
+    with caplog.at_level(logging.WARNING, logger="watchdog"):
+        watchdog = run_with_watchdog(command)
+
+    captured, finished = block_warnings(caplog)
+    assert "so far in worker" in captured
+    assert "in blocking_helper" in captured
+    assert "time.sleep(0.2)" in captured
+    assert finished.startswith("Event loop was blocked for")
+    assert watchdog.blocks == 1
+    assert watchdog.summary().max >= 0.15
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="needs Task.get_context")
+def test_block_is_attributed_to_the_running_command(caplog):
+    """
+    Test that the report names the command timed in the blocking task.
+    """
+
+    async def command(registry):
+        with registry.track("admin reload_game_data"):
+            blocking_helper()
+
+    with caplog.at_level(logging.WARNING, logger="watchdog"):
+        run_with_watchdog(command)
+
+    assert "so far in admin reload_game_data" in block_warnings(caplog)[0]
+
+
+def test_lag_percentiles_are_exported(caplog):
+    """
+    Test that an idle loop reports no blocks and exports its lag percentiles.
+    """
+
+    async def command(registry):
+        await asyncio.sleep(0.1)
+
+    registry = MetricsRegistry(sample_rate=1)
+    watchdog = run_with_watchdog(command, registry)
+
+    summary = watchdog.summary()
+    assert len(watchdog.lags) >= 10
+    assert summary.blocks == 0
+    assert 0 <= summary.p50 <= summary.p99 <= summary.max < 0.05
+    assert block_warnings(caplog) == []
+
+    lines = registry.render_prometheus().splitlines()
+    assert "# TYPE ggm_event_loop_lag_seconds gauge" in lines
+    assert any(
+        line.startswith('ggm_event_loop_lag_seconds{quantile="0.99"}') for line in lines
+    )
+    assert 'ggm_event_loop_lag_seconds{stat="blocks"} 0' in lines
@@ -0,0 +1,118 @@
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+import numpy as np
+
+# Bitfields are stored in signed 64-bit columns
+BITFIELD_WIDTH = 64
+
+
+def iter_set_bits(bitfield: int) -> Iterator[int]:
+    """
+    Yield the positions of the set bits, lowest first.
+    Costs one step per set bit instead of one per possible bit.
+    """
+    if bitfield < 0:
+        raise ValueError("Bitfields must not be negative")
+    while bitfield:
+        lowbit = bitfield & -bitfield
+        yield lowbit.bit_length() - 1
+        bitfield ^= lowbit
+
+
+def set_bits(bitfield: int) -> List[int]:
+    """Return the positions of the set bits, lowest first."""
+    return list(iter_set_bits(bitfield))
+
+
+def popcount(bitfield: int) -> int:
+    """Return the number of set bits."""
+    if bitfield < 0:
+        raise ValueError("Bitfields must not be negative")
+    return bitfield.bit_count()
+
+
+def decode_bitfields(
+    bitfields: Sequence[int], width: int = BITFIELD_WIDTH
+) -> np.ndarray:
+    """
+    Decode many bitfields at once into a (len(bitfields), width) boolean
+    matrix, where ``matrix[row, bit]`` tells whether ``bit`` is set in row.
+    """
+    if not 0 < width <= BITFIELD_WIDTH:
+        raise ValueError(f"width must be between 1 and {BITFIELD_WIDTH}")
+    # Little-endian bytes unpacked little-endian give bit 0 first
+    octets = np.asarray(bitfields, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    bits = np.unpackbits(octets, axis=1, bitorder="little")
+    return bits[:, :width].view(bool)
+
+
+def popcount_many(bitfields: Sequence[int]) -> np.ndarray:
+    """Return the number of set bits of every bitfield."""
+    return np.bitwise_count(np.asarray(bitfields, dtype=np.uint64)).astype(np.int64)
+
+
+class BitfieldIndex:
+    """
+    Inverted index from bit position to the ids whose bitfield has it set.
+
+    Starts unloaded. Once loaded, ``set`` applies only the bits that changed,
+    so keeping it current costs one step per changed bit.
+    """
+
+    def __init__(self) -> None:
+        self.loaded = False
+        self._ids: Dict[int, Set[int]] = {}
+        self._bitfields: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, rows: Iterable[Tuple[int, int]]) -> None:
+        ids: Dict[int, Set[int]] = {}
+        bitfields: Dict[int, int] = {}
+        for row_id, bitfield in rows:
+            bitfields[row_id] = bitfield
+            for bit in iter_set_bits(bitfield):
+                ids.setdefault(bit, set()).add(row_id)
+        self._ids, self._bitfields = ids, bitfields
+        self.loaded = True
+
+    def load(self, rows: Iterable[Tuple[int, int]]) -> None:
+        """Replace the contents with (id, bitfield) rows."""
+        with self._lock:
+            self._load(rows)
+
+    def load_once(self, fetch: Callable[[], Iterable[Tuple[int, int]]]) -> None:
+        """
+        Load the (id, bitfield) rows returned by ``fetch``, unless already
+        loaded. The lock is held while fetching, so a ``set`` made meanwhile
+        waits and is applied on top of the rows instead of being lost.
+        """
+        with self._lock:
+            if not self.loaded:
+                self._load(fetch())
+
+    def set(self, row_id: int, bitfield: int) -> None:
+        """Record the current bitfield of a row. Ignored until loaded."""
+        with self._lock:
+            if not self.loaded:
+                return
+            previous = self._bitfields.get(row_id, 0)
+            self._bitfields[row_id] = bitfield
+            for bit in iter_set_bits(bitfield & ~previous):
+                self._ids.setdefault(bit, set()).add(row_id)
+            for bit in iter_set_bits(previous & ~bitfield):
+                self._ids[bit].discard(row_id)
+
+    def ids(self, bit: int) -> List[int]:
+        """Return the ids with ``bit`` set, in ascending order."""
+        with self._lock:
+            return sorted(self._ids.get(bit, ()))
+
+    def count(self, bit: int) -> int:
+        with self._lock:
+            return len(self._ids.get(bit, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids, self._bitfields = {}, {}
+            self.loaded = False
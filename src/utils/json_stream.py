@@ -0,0 +1,64 @@
+import json
+from typing import Any, Iterator, TextIO
+
+READ_SIZE = 64 * 1024
+
+
+def iter_json_array(file: TextIO, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array one at a time, reading the file
+    in blocks so only the current item is held in memory.
+    An empty file yields nothing.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+
+    def read() -> bool:
+        nonlocal buffer
+        block = file.read(read_size)
+        if not block:
+            return False
+        buffer += block
+        return True
+
+    def peek() -> str:
+        """Drop leading whitespace and return the next character, "" at the end."""
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip()
+            if buffer:
+                return buffer[0]
+            if not read():
+                return ""
+
+    first = peek()
+    if not first:
+        return
+    if first != "[":
+        raise ValueError(f"Expected a JSON array, got {first!r}")
+    buffer = buffer[1:]
+    if peek() == "]":
+        return
+
+    while True:
+        if not peek():
+            raise ValueError("Unterminated JSON array")
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if not read():
+                    raise
+                continue
+            # A value that ends the buffer may continue in the next block
+            if end < len(buffer) or not read():
+                break
+        yield item
+
+        buffer = buffer[end:]
+        separator = peek()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {separator!r}")
+        buffer = buffer[1:]
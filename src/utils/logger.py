@@ -1,33 +1,230 @@
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
 
 LOG_DIR = os.getenv("LOG_DIR") or "/var/log/ggm"
+# "text" or "json" (one JSON object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Fraction of records kept per level, for every logger or one of them, e.g.
+# "debug=0.01,discord:info=0.25". Warnings and errors are never sampled.
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+
+def parse_sample_rates(
+    value: str, logger_name: Optional[str] = None
+) -> Dict[int, float]:
+    """
+    Parse "[logger:]level=rate" pairs into the {levelno: rate} of one logger,
+    for levels below WARNING. Pairs naming the logger override the pairs
+    without a name, and pairs naming other loggers are ignored.
+    """
+    shared, own = {}, {}
+    for pair in filter(None, (part.strip() for part in value.split(","))):
+        key, _, rate = pair.partition("=")
+        name, _, level_name = key.strip().rpartition(":")
+        level = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in LOG_SAMPLE_RATES: {level_name}")
+        if level >= logging.WARNING:
+            continue
+        if not name:
+            shared[level] = min(max(float(rate), 0.0), 1.0)
+        elif name == logger_name:
+            own[level] = min(max(float(rate), 0.0), 1.0)
+    return {**shared, **own}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Rendered by _RouteQueueHandler.prepare on the logging thread
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def create_formatter(log_format: str = LOG_FORMAT) -> logging.Formatter:
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s:%(levelname)s:%(name)s: %(message)s")
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Runs on the listener thread and hands each record to the file and console
+    handlers of the BotLogger that queued it.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self.routes.get(getattr(record, "route", record.name), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def flush(self) -> None:
+        for handlers in self.routes.values():
+            for handler in handlers:
+                handler.flush()
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _RouteQueueHandler(QueueHandler):
+    """Queues records tagged with the name of the BotLogger they belong to."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, route: str) -> None:
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the arguments into the message and render the traceback into
+        ``exc_text``, but unlike QueueHandler leave them apart, so each
+        formatter decides where the traceback goes.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        # Traceback objects keep every frame alive until the record is written
+        record.exc_info = None
+        record.route = self.route
+        return record
+
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_router = _RoutingHandler()
+_listener: Optional[QueueListener] = None
+_queue_handlers: Dict[str, _RouteQueueHandler] = {}
+_lock = threading.Lock()
+
+
+def start_logging() -> None:
+    """Start the background thread that writes queued records, if needed."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, _router)
+            _listener.start()
+
+
+def stop_logging() -> None:
+    """Write every queued record and stop the background thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        # Records queued while no listener was running
+        while True:
+            try:
+                record = _queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                _router.handle(record)
+        _router.flush()
+
+
+atexit.register(stop_logging)
 
 
 class BotLogger:
+    """
+    Logger whose records are written by a single background listener, so
+    logging from the event loop never waits on disk I/O or file rotation.
+
+    Creating several BotLoggers with the same name shares one set of handlers.
+    Records below WARNING can be sampled per level, and are dropped before
+    any formatting work is done.
+    """
+
     def __init__(
-        self, name, log_level=logging.INFO, log_file_path=LOG_DIR, write_to_console=True
+        self,
+        name,
+        log_level=logging.INFO,
+        log_file_path=LOG_DIR,
+        write_to_console=True,
+        sample_rates: Optional[Dict[int, float]] = None,
+        log_format: str = LOG_FORMAT,
     ):
         self.log_file_path = log_file_path
         self.logger = logging.getLogger(name)
         self.logger.setLevel(log_level)
+        self.sample_rates = (
+            parse_sample_rates(LOG_SAMPLE_RATES, name)
+            if sample_rates is None
+            else sample_rates
+        )
+
+        with _lock:
+            if name not in _queue_handlers:
+                _router.routes[name] = self._create_handlers(
+                    name, write_to_console, log_format
+                )
+                _queue_handlers[name] = _RouteQueueHandler(_queue, name)
+            if _queue_handlers[name] not in self.logger.handlers:
+                self.logger.addHandler(_queue_handlers[name])
+        start_logging()
 
-        # Ensure logs directory exists
-        os.makedirs(self.log_file_path, exist_ok=True)
+    def child(
+        self, suffix: str, sample_rates: Optional[Dict[int, float]] = None
+    ) -> "BotLogger":
+        """
+        Logger named "<name>.<suffix>" whose records are written by this
+        logger's handlers, with sample rates of its own, so one kind of event
+        can be sampled apart from the rest, e.g. "discord.gacha:info=0.1".
+        """
+        child = copy.copy(self)
+        child.logger = self.logger.getChild(suffix)
+        child.sample_rates = (
+            parse_sample_rates(LOG_SAMPLE_RATES, child.logger.name)
+            if sample_rates is None
+            else sample_rates
+        )
+        return child
 
+    def _create_handlers(
+        self, name: str, write_to_console: bool, log_format: str
+    ) -> List[logging.Handler]:
+        handlers: List[logging.Handler] = []
         # Define the format once for all handlers
-        formatter = logging.Formatter("%(asctime)s:%(levelname)s:%(name)s: %(message)s")
+        formatter = create_formatter(log_format)
 
         # File Handler with rotation
         try:
+            # Ensure logs directory exists
+            os.makedirs(self.log_file_path, exist_ok=True)
             file_handler = RotatingFileHandler(
                 filename=os.path.join(self.log_file_path, f"{name}.log"),
                 maxBytes=5 * 1024 * 1024,
                 backupCount=5,
             )
             file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
 
         except Exception as e:
             print(f"Failed to create file handler: {e}")
@@ -37,19 +234,29 @@ class BotLogger:
         if write_to_console:
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
+        return handlers
+
+    def _log(self, level: int, message, *args, **kwargs) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = self.sample_rates.get(level)
+        if rate is not None and random.random() >= rate:
+            return
+        kwargs.setdefault("stacklevel", 3)
+        self.logger.log(level, message, *args, **kwargs)
 
-    def info(self, message):
-        self.logger.info(message)
+    def info(self, message, *args, **kwargs):
+        self._log(logging.INFO, message, *args, **kwargs)
 
-    def debug(self, message):
-        self.logger.debug(message)
+    def debug(self, message, *args, **kwargs):
+        self._log(logging.DEBUG, message, *args, **kwargs)
 
-    def warning(self, message):
-        self.logger.warning(message)
+    def warning(self, message, *args, **kwargs):
+        self._log(logging.WARNING, message, *args, **kwargs)
 
-    def error(self, message):
-        self.logger.error(message)
+    def error(self, message, *args, **kwargs):
+        self._log(logging.ERROR, message, *args, **kwargs)
 
-    def critical(self, message):
-        self.logger.critical(message)
+    def critical(self, message, *args, **kwargs):
+        self._log(logging.CRITICAL, message, *args, **kwargs)
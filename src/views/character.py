@@ -1,33 +1,99 @@
-from typing import TYPE_CHECKING, Literal
+import os
+from datetime import datetime
+from itertools import groupby
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 import discord
 
 from models.character import Character
+from repositories.character_repository import on_character_updated
 from services.arcana_service import get_arcana_skill_ids
 from services.character_service import (
     calculate_character_max_hp,
     calculate_character_max_mp,
     calculate_character_remaining_points,
 )
+from utils.cache import LRUCache
 from views.pagination import OwnerView, PaginationView
 
 if TYPE_CHECKING:
     from models.arcana import ArcanaSkill
 
+# Characters whose rendered sheet pages are kept in memory
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "512"))
+SKILLS_PER_PAGE = 10
+
+# One page of the skills tab: (arcana · tier heading, skill names) per group
+SkillPage = List[Tuple[str, List[str]]]
+
+
+class EmbedCache:
+    """
+    Rendered CharacterView pages, keyed by character id, version and page.
+
+    The version is the character's ``updated_at``. Only pages of the latest
+    version seen are kept, and committed updates drop the character outright.
+    """
+
+    def __init__(self, maxsize: int = EMBED_CACHE_SIZE) -> None:
+        self.pages: LRUCache[
+            int, Tuple[Optional[datetime], Dict[str, discord.Embed]]
+        ] = LRUCache(maxsize)
+
+    def get_or_render(
+        self, character: Character, page: str, render: Callable[[], discord.Embed]
+    ) -> discord.Embed:
+        if character.id is None:
+            return render()
+
+        entry = self.pages.get(character.id)
+        if entry is None or entry[0] != character.updated_at:
+            entry = (character.updated_at, {})
+            self.pages.put(character.id, entry)
+        embed = entry[1].get(page)
+        if embed is None:
+            embed = entry[1][page] = render()
+        return embed
+
+    def invalidate(self, character_id: int) -> None:
+        self.pages.pop(character_id)
+
+    def clear(self) -> None:
+        self.pages.clear()
+
+
+embed_cache = EmbedCache()
+on_character_updated(embed_cache.invalidate)
+
 
 class CharacterView(OwnerView):
     def __init__(
         self,
         character: Character,
-        arcana_skills: list["ArcanaSkill"],
+        skills_by_id: Mapping[int, "ArcanaSkill"],
         user: discord.Member,
         page: Literal["info", "attributes", "story", "arcana_skills"] = None,
     ):
         super().__init__(user)
         self.character = character
-        self.arcana_skills = arcana_skills
+        self.skills_by_id = skills_by_id
         self.current_option = page or "info"
         self.pagination_view = None
+        self._skill_pages: Optional[List[SkillPage]] = None
+
+    @property
+    def embed_color(self) -> int:
+        # Seeded colors are written as "#0077FF", older rows as "0077FF"
+        return int(self.character.mana_nature.color.lstrip("#"), 16)
 
     def format_character_title(self):
         title = f", {self.character.title}" if self.character.title else ""
@@ -39,14 +105,17 @@ class CharacterView(OwnerView):
             filled = int(ratio * total_hearts)
             return "♥" * filled + "♡" * (total_hearts - filled)
 
-        embed_color = int(self.character.mana_nature.color, 16)
         embed = discord.Embed(
             title=self.format_character_title(),
             description="*Visão Geral*",
-            color=embed_color,
+            color=self.embed_color,
         )
         embed.add_field(name="Idade", value=self.character.age, inline=True)
-        embed.add_field(name="Origem", value=self.character.region.name, inline=True)
+        embed.add_field(
+            name="Origem",
+            value=self.character.region.name if self.character.region else "-",
+            inline=True,
+        )
         embed.add_field(name="Raça", value=self.character.race.name, inline=True)
         embed.add_field(name="Mana", value=self.character.mana_nature.name, inline=True)
         embed.add_field(
@@ -69,16 +138,16 @@ class CharacterView(OwnerView):
             inline=True,
         )
         embed.set_image(url=self.character.image_url)
-        embed.set_footer(
-            text=f"{self.character.region.name}",
-            icon_url=self.character.region.icon_url,
-        )
+        if self.character.region:
+            embed.set_footer(
+                text=f"{self.character.region.name}",
+                icon_url=self.character.region.icon_url,
+            )
         return embed
 
     def attributes_embed(self):
         remaining_points = calculate_character_remaining_points(self.character)
-        embed_color = int(self.character.mana_nature.color, 16)
-        embed = discord.Embed(title="Atributos", color=embed_color)
+        embed = discord.Embed(title="Atributos", color=self.embed_color)
 
         embed.add_field(
             name="Vitalidade", value=f"+{self.character.vitality}", inline=True
@@ -108,50 +177,77 @@ class CharacterView(OwnerView):
         return embed
 
     def story_embed(self):
-        embed_color = int(self.character.mana_nature.color, 16)
         embed = discord.Embed(
             title="História",
             description=self.character.story or "Nenhuma história disponível",
-            color=embed_color,
+            color=self.embed_color,
         )
         return embed
 
-    async def get_skills_page(self, page: int) -> tuple[discord.Embed, int]:
-        """Returns (embed, total_pages) for the skills pagination"""
-        skill_ids = get_arcana_skill_ids(self.character.arcana_skills)
-        if not skill_ids:
-            embed = discord.Embed(
+    @property
+    def skill_pages(self) -> List[SkillPage]:
+        """
+        The owned skills grouped by arcana and tier (best tier first), split
+        into pages once per view.
+        """
+        if self._skill_pages is None:
+            # Bit i of the bitfield is the skill with id i + 1
+            skills = [
+                self.skills_by_id[bit + 1]
+                for bit in get_arcana_skill_ids(self.character.arcana_skills)
+                if bit + 1 in self.skills_by_id
+            ]
+            skills.sort(key=lambda s: (s.arcana.name, -s.tier.tier_level, s.name))
+
+            pages: List[SkillPage] = []
+            for start in range(0, len(skills), SKILLS_PER_PAGE):
+                chunk = skills[start : start + SKILLS_PER_PAGE]
+                pages.append(
+                    [
+                        (heading, [f"**{skill.name}**" for skill in group])
+                        for heading, group in groupby(
+                            chunk, key=lambda s: f"{s.arcana.name} · {s.tier.tier_name}"
+                        )
+                    ]
+                )
+            self._skill_pages = pages
+        return self._skill_pages
+
+    def render_skills_page(self, page: int) -> discord.Embed:
+        """Render one page of the skills tab, in O(page size)."""
+        color = self.embed_color
+        pages = self.skill_pages
+        if not pages:
+            return discord.Embed(
                 title="Arcana",
                 description="Nenhuma habilidade desbloqueada\nTente treinar mais!",
-                color=int(self.character.mana_nature.color, 16),
+                color=color,
             )
-            return embed, 1
-
-        # Calculate pagination
-        items_per_page = 5
-        total_pages = (len(skill_ids) + items_per_page - 1) // items_per_page
-        start_idx = (page - 1) * items_per_page
-        end_idx = start_idx + items_per_page
-        current_page_skills = skill_ids[start_idx:end_idx]
 
-        # Create embed for current page
         embed = discord.Embed(
             title="Arcana",
             description="Habilidades de arcana desbloqueadas pelo personagem",
-            color=int(self.character.mana_nature.color, 16),
+            color=color,
         )
+        for heading, names in pages[page - 1]:
+            embed.add_field(name=heading, value="\n".join(names), inline=False)
+        embed.set_footer(text=f"Página {page}/{len(pages)}")
+        return embed
 
-        lines = []
-        for skill_id in current_page_skills:
-            skill = self.arcana_skills[skill_id]
-            lines.append(f"**{skill.name}**")
+    async def get_skills_page(self, page: int) -> tuple[discord.Embed, int]:
+        """Returns (embed, total_pages) for the skills pagination"""
+        embed = embed_cache.get_or_render(
+            self.character,
+            f"arcana_skills:{page}",
+            lambda: self.render_skills_page(page),
+        )
+        return embed, max(len(self.skill_pages), 1)
 
-        embed.add_field(
-            name=f"Habilidades (Página {page}/{total_pages}):",
-            value="\n".join(lines),
-            inline=False,
+    def skills_embed(self) -> discord.Embed:
+        """First page of the skills tab"""
+        return embed_cache.get_or_render(
+            self.character, "arcana_skills:1", lambda: self.render_skills_page(1)
         )
-        return embed, total_pages
 
     async def handle_skills_view(self, interaction: discord.Interaction):
         """Creates and manages the paginated skills view"""
@@ -166,16 +262,19 @@ class CharacterView(OwnerView):
             )
 
     def get_embeds_for_option(self, option: str) -> list[discord.Embed]:
-        if option == "info":
-            return [self.overview_embed()]
-        elif option == "attributes":
-            return [self.attributes_embed()]
-        elif option == "story":
-            return [self.story_embed()]
-        elif option == "arcana_skills":
+        if option == "arcana_skills":
             return [self.skills_embed()]
+
+        renderers = {
+            "info": self.overview_embed,
+            "attributes": self.attributes_embed,
+            "story": self.story_embed,
+        }
         # Default/fallback
-        return [self.overview_embed()]
+        if option not in renderers:
+            option = "info"
+        # Cached until the character changes, so the embed must not be modified
+        return [embed_cache.get_or_render(self.character, option, renderers[option])]
 
     @discord.ui.select(
         placeholder="Selecione uma categoria",